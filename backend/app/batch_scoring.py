@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable
+
+import numpy as np
+
+from .models import PolicyToolResult
+from .records import ProductRecord
+from .scoring import BAND_THRESHOLDS, GRADE_THRESHOLDS, policy_penalty
+
+FOOD_COLUMNS = ("sugars_100g", "salt_100g", "saturated-fat_100g", "proteins_100g")
+
+
+@dataclass(frozen=True)
+class FoodScoreBatch:
+    sugar_score: np.ndarray
+    salt_score: np.ndarray
+    sat_fat_score: np.ndarray
+    protein_score: np.ndarray
+    total_score: np.ndarray
+    grade: np.ndarray
+    sugar_band: np.ndarray
+    salt_band: np.ndarray
+    sat_fat_band: np.ndarray
+    protein_band: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.total_score)
+
+
+def _column(values: Iterable[float] | np.ndarray) -> np.ndarray:
+    # Missing nutrients score as zero, exactly like ProductRecord.nutrient() does on the scalar path.
+    return np.nan_to_num(np.asarray(values, dtype=np.float64), nan=0.0)
+
+
+def _sub_score(values: np.ndarray, reference: float) -> np.ndarray:
+    # Same operation order as min(100, int((value / reference) * 100)); trunc matches int().
+    return np.minimum(100, np.trunc((values / reference) * 100)).astype(np.int64)
+
+
+def _bands(scores: np.ndarray, reverse: bool = False) -> np.ndarray:
+    effective = 100 - scores if reverse else scores
+    conditions = [effective >= threshold for threshold, _ in BAND_THRESHOLDS]
+    return np.select(conditions, [band for _, band in BAND_THRESHOLDS], default="green")
+
+
+def _grades(scores: np.ndarray) -> np.ndarray:
+    conditions = [scores >= threshold for threshold, _ in GRADE_THRESHOLDS]
+    return np.select(conditions, [grade for _, grade in GRADE_THRESHOLDS], default="E")
+
+
+def score_food_batch(
+    sugar: Iterable[float] | np.ndarray,
+    salt: Iterable[float] | np.ndarray,
+    sat_fat: Iterable[float] | np.ndarray,
+    protein: Iterable[float] | np.ndarray,
+    policy_penalties: Iterable[int] | np.ndarray,
+) -> FoodScoreBatch:
+    sugar_score = _sub_score(_column(sugar), 22.5)
+    salt_score = _sub_score(_column(salt), 1.5)
+    sat_fat_score = _sub_score(_column(sat_fat), 5.0)
+    protein_score = _sub_score(_column(protein), 12.0)
+    penalties = np.asarray(policy_penalties, dtype=np.int64)
+
+    weighted = (sugar_score * 0.45) + (salt_score * 0.25) + (sat_fat_score * 0.3)
+    nutrition_component = np.maximum(0, 100 - np.trunc(weighted).astype(np.int64))
+    protein_bonus = np.trunc(protein_score * 0.1).astype(np.int64)
+    total_score = np.clip(nutrition_component - penalties + protein_bonus, 0, 100)
+
+    return FoodScoreBatch(
+        sugar_score=sugar_score,
+        salt_score=salt_score,
+        sat_fat_score=sat_fat_score,
+        protein_score=protein_score,
+        total_score=total_score,
+        grade=_grades(total_score),
+        sugar_band=_bands(sugar_score),
+        salt_band=_bands(salt_score),
+        sat_fat_band=_bands(sat_fat_score),
+        protein_band=_bands(protein_score, reverse=True),
+    )
+
+
+def food_columns(records: Iterable[ProductRecord]) -> tuple[np.ndarray, ...]:
+    rows = np.array([[record.nutrient(key) for key in FOOD_COLUMNS] for record in records], dtype=np.float64)
+    if rows.size == 0:
+        return tuple(np.empty(0, dtype=np.float64) for _ in FOOD_COLUMNS)
+    return tuple(rows[:, index] for index in range(len(FOOD_COLUMNS)))
+
+
+def policy_penalty_column(policy_results: Iterable[PolicyToolResult], domain: str = "food") -> np.ndarray:
+    return np.fromiter((policy_penalty(result, domain) for result in policy_results), dtype=np.int64)
+
+
+def score_food_records(
+    records: list[ProductRecord],
+    policy_results: list[PolicyToolResult],
+) -> FoodScoreBatch:
+    sugar, salt, sat_fat, protein = food_columns(records)
+    return score_food_batch(sugar, salt, sat_fat, protein, policy_penalty_column(policy_results))
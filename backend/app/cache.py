@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import random
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Generic, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+def approx_size(value: Any, _seen: set[int] | None = None) -> int:
+    seen = _seen if _seen is not None else set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    size = sys.getsizeof(value)
+    if isinstance(value, BaseModel):
+        return size + approx_size(value.__dict__, seen) + approx_size(value.__pydantic_private__, seen)
+    if isinstance(value, dict):
+        return size + sum(approx_size(key, seen) + approx_size(item, seen) for key, item in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(approx_size(item, seen) for item in value)
+    slots = getattr(type(value), "__slots__", ())
+    if slots and not isinstance(value, (str, bytes)):
+        return size + sum(approx_size(getattr(value, name, None), seen) for name in slots)
+    return size
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    stale_hits: int = 0
+    early_refreshes: int = 0
+
+
+@dataclass
+class _Entry(Generic[T]):
+    expires_at: float
+    fresh_until: float
+    compute_seconds: float
+    size: int
+    value: T
+
+
+class TTLCache(Generic[T]):
+    def __init__(
+        self,
+        *,
+        max_entries: int,
+        max_bytes: int,
+        sweep_interval_seconds: float = 60.0,
+        refresh_beta: float = 0.0,
+    ) -> None:
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max(1, max_bytes)
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self.refresh_beta = refresh_beta
+        self.stats = CacheStats()
+        self._entries: OrderedDict[str, _Entry[T]] = OrderedDict()
+        self._bytes = 0
+        self._next_sweep_at = time.monotonic() + sweep_interval_seconds
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: str) -> T | None:
+        value, _ = self.lookup(key)
+        return value
+
+    def lookup(self, key: str) -> tuple[T | None, bool]:
+        now = time.monotonic()
+        self._maybe_sweep(now)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None, False
+        if entry.expires_at <= now:
+            self._remove(key)
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None, False
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return entry.value, self._needs_refresh(entry, now)
+
+    def set(
+        self,
+        key: str,
+        value: T,
+        ttl_seconds: float,
+        *,
+        stale_seconds: float = 0.0,
+        compute_seconds: float = 0.0,
+    ) -> None:
+        now = time.monotonic()
+        self._maybe_sweep(now)
+        if key in self._entries:
+            self._remove(key)
+        size = approx_size(value)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = _Entry(
+            expires_at=now + ttl_seconds + max(0.0, stale_seconds),
+            fresh_until=now + ttl_seconds,
+            compute_seconds=max(0.0, compute_seconds),
+            size=size,
+            value=value,
+        )
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.stats.evictions += 1
+
+    def pop(self, key: str) -> T | None:
+        entry = self._remove(key)
+        return entry.value if entry is not None else None
+
+    def pop_prefix(self, prefix: str) -> int:
+        keys = [key for key in self._entries if key.startswith(prefix)]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def sweep(self) -> int:
+        now = time.monotonic()
+        self._next_sweep_at = now + self.sweep_interval_seconds
+        expired = [key for key, entry in self._entries.items() if entry.expires_at <= now]
+        for key in expired:
+            self._remove(key)
+        self.stats.expirations += len(expired)
+        return len(expired)
+
+    def snapshot(self) -> dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.stats.hits,
+            "misses": self.stats.misses,
+            "evictions": self.stats.evictions,
+            "expirations": self.stats.expirations,
+            "stale_hits": self.stats.stale_hits,
+            "early_refreshes": self.stats.early_refreshes,
+        }
+
+    def _needs_refresh(self, entry: _Entry[T], now: float) -> bool:
+        if now >= entry.fresh_until:
+            self.stats.stale_hits += 1
+            return True
+        if self.refresh_beta <= 0 or entry.compute_seconds <= 0:
+            return False
+        # XFetch-style early refresh: the closer to expiry and the slower the recompute,
+        # the likelier a hit volunteers to refresh, so hot keys do not expire in lockstep.
+        head_start = -entry.compute_seconds * self.refresh_beta * math.log(max(random.random(), 1e-12))
+        if now + head_start >= entry.fresh_until:
+            self.stats.early_refreshes += 1
+            return True
+        return False
+
+    def _maybe_sweep(self, now: float) -> None:
+        if now >= self._next_sweep_at:
+            self.sweep()
+
+    def _remove(self, key: str) -> _Entry[T] | None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+        return entry
+
+
+class SingleFlight(Generic[T]):
+    def __init__(self) -> None:
+        self._inflight: dict[str, asyncio.Task[T]] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._inflight
+
+    def start(self, key: str, factory: Callable[[], Awaitable[T]]) -> asyncio.Task[T]:
+        # Registers the flight before returning, so a caller can publish several keys before awaiting any.
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done, key=key: self._finish(key, done))
+        return task
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[T]]) -> T:
+        # Shielded so one waiter giving up does not cancel the lookup for everyone else.
+        return await asyncio.shield(self.start(key, factory))
+
+    def _finish(self, key: str, task: asyncio.Task[T]) -> None:
+        if self._inflight.get(key) is task:
+            self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()
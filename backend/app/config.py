@@ -10,7 +10,61 @@ class Settings(BaseSettings):
     locale_language: str = "de"
     request_timeout_seconds: float = 5.0
     cache_ttl_seconds: int = 300
+    cache_stale_ttl_seconds: int = 1800
+    cache_refresh_beta: float = 1.0
+    cache_max_entries: int = 2000
+    cache_max_bytes: int = 64 * 1024 * 1024
+    cache_sweep_interval_seconds: float = 60.0
+    score_memo_max_entries: int = 4096
+    score_memo_ttl_seconds: int = 6 * 3600
+    negative_cache_ttl_seconds: int = 120
+    negative_cache_error_ttl_seconds: int = 10
+    product_store_path: str | None = None
+    off_search_fallback_enabled: bool = True
+    local_search_min_match_ratio: float = 0.6
+    redis_url: str | None = None
+    redis_max_connections: int = 20
+    redis_timeout_seconds: float = 0.25
+    redis_retry_after_seconds: float = 30.0
+    shared_cache_ttl_seconds: int = 3600
+    shared_cache_key_prefix: str = "nutrivision:v1:"
+    disk_cache_path: str | None = None
+    disk_cache_max_bytes: int = 256 * 1024 * 1024
+    disk_cache_flush_interval_seconds: float = 2.0
+    disk_cache_restore_entries: int = 2000
     off_user_agent: str = "NutriVisionLive/0.1 (contact: hackathon@nutrivision.local)"
+    off_http2: bool = True
+    off_max_connections: int = 20
+    off_max_keepalive_connections: int = 10
+    off_keepalive_expiry_seconds: float = 30.0
+    off_preconnect_on_startup: bool = True
+    search_max_in_flight: int = 3
+    breaker_failure_rate_threshold: float = 0.5
+    breaker_min_calls: int = 6
+    breaker_window_seconds: float = 30.0
+    breaker_open_seconds: float = 15.0
+    adaptive_timeout_min_seconds: float = 0.8
+    adaptive_timeout_multiplier: float = 3.0
+    search_hedge_delay_seconds: float = 0.35
+    upstream_turn_budget_seconds: float = 4.0
+    upstream_retry_attempts: int = 3
+    upstream_retry_base_delay_seconds: float = 0.1
+    upstream_retry_max_delay_seconds: float = 1.0
+    upstream_retry_min_budget_seconds: float = 0.5
+    off_product_rate_per_minute: float = 100.0
+    off_product_burst: int = 20
+    off_search_rate_per_minute: float = 10.0
+    off_search_burst: int = 10
+    off_rate_limit_max_wait_seconds: float = 2.0
+    off_batch_max_codes: int = 50
+    off_batch_max_in_flight: int = 2
+    batch_max_barcodes: int = 200
+    warmup_manifest_path: str | None = None
+    warmup_requests_per_second: float = 4.0
+    policy_version: str = "v1"
+    policy_ruleset_dir: str | None = None
+    policy_reload_interval_seconds: float = 0.0
+    admin_token: str | None = None
 
     gemini_use_vertex: bool = True
     gcp_project_id: str | None = None
@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, TypeVar
+
+from pydantic import BaseModel
+
+from .config import settings
+
+logger = logging.getLogger("nutrivision")
+M = TypeVar("M", bound=BaseModel)
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    key TEXT PRIMARY KEY,
+    payload BLOB NOT NULL,
+    expires_at REAL NOT NULL,
+    written_at REAL NOT NULL,
+    size INTEGER NOT NULL
+) WITHOUT ROWID
+"""
+
+CACHE_INDEX = "CREATE INDEX IF NOT EXISTS cache_entries_written_at ON cache_entries (written_at)"
+
+
+class DiskCache:
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        max_bytes: int,
+        ttl_seconds: int,
+        compact_ratio: float = 0.9,
+    ) -> None:
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.compact_ratio = compact_ratio
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.errors = 0
+        self.compactions = 0
+        self._pending: dict[str, tuple[bytes, float]] = {}
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # Losing the last few write-behind batches on a crash only costs a few upstream calls.
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(CACHE_SCHEMA)
+        self._conn.execute(CACHE_INDEX)
+        self._conn.commit()
+
+    def read(self, key: str) -> bytes | None:
+        entry = self.read_entry(key)
+        return None if entry is None else entry[0]
+
+    def read_entry(self, key: str) -> tuple[bytes, float] | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, written_at FROM cache_entries WHERE key = ? AND expires_at > ?",
+                (key, now),
+            ).fetchone()
+        return None if row is None else (bytes(row[0]), max(0.0, now - float(row[1])))
+
+    def read_recent(self, limit: int) -> list[tuple[str, bytes, float]]:
+        # Returns (key, payload, age_seconds), newest first.
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT key, payload, written_at
+                FROM cache_entries
+                WHERE expires_at > ?
+                ORDER BY written_at DESC
+                LIMIT ?
+                """,
+                (now, limit),
+            ).fetchall()
+        return [(str(key), bytes(payload), max(0.0, now - float(written_at))) for key, payload, written_at in rows]
+
+    def write_many(self, items: Iterable[tuple[str, bytes]]) -> int:
+        now = time.time()
+        return self.write_entries((key, payload, now) for key, payload in items)
+
+    def write_entries(self, items: Iterable[tuple[str, bytes, float]]) -> int:
+        # Rows keep their original write time, so entries promoted from another tier keep their age.
+        rows = [
+            (key, payload, written_at + self.ttl_seconds, written_at, len(payload))
+            for key, payload, written_at in items
+        ]
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO cache_entries (key, payload, expires_at, written_at, size) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+        return len(rows)
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0])
+
+    def compact(self) -> int:
+        # Drop expired rows, then the oldest rows until the file is back under the compaction target.
+        with self._lock:
+            removed = self._conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),)).rowcount
+            total = int(self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0])
+            if total > self.max_bytes:
+                target = int(self.max_bytes * self.compact_ratio)
+                cutoff = None
+                for written_at, size in self._conn.execute(
+                    "SELECT written_at, size FROM cache_entries ORDER BY written_at ASC"
+                ):
+                    if total <= target:
+                        break
+                    total -= size
+                    cutoff = written_at
+                if cutoff is not None:
+                    removed += self._conn.execute(
+                        "DELETE FROM cache_entries WHERE written_at <= ?", (cutoff,)
+                    ).rowcount
+            self._conn.commit()
+            if removed:
+                self._conn.execute("PRAGMA incremental_vacuum")
+        if removed:
+            self.compactions += 1
+        return removed
+
+    def count(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0])
+
+    async def get_entry(self, key: str, model: type[M]) -> tuple[M, float] | None:
+        # Returns the value with its age, so callers can keep honouring their own freshness bounds.
+        pending = self._pending.get(key)
+        try:
+            if pending is not None:
+                entry = (pending[0], max(0.0, time.time() - pending[1]))
+            else:
+                entry = await asyncio.to_thread(self.read_entry, key)
+        except sqlite3.Error:
+            self.errors += 1
+            return None
+        if entry is None:
+            self.misses += 1
+            return None
+        try:
+            value = model.model_validate_json(entry[0])
+        except Exception:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value, entry[1]
+
+    def set_model(self, key: str, value: BaseModel, age_seconds: float = 0.0) -> None:
+        # Write-behind: the latest value per key waits for the next flush.
+        self._pending[key] = (value.model_dump_json().encode("utf-8"), time.time() - age_seconds)
+
+    async def flush(self) -> int:
+        if not self._pending:
+            return 0
+        batch = self._pending
+        self._pending = {}
+        try:
+            written = await asyncio.to_thread(
+                self.write_entries, [(key, payload, written_at) for key, (payload, written_at) in batch.items()]
+            )
+        except sqlite3.Error:
+            self.errors += 1
+            logger.warning("Disk cache flush failed; dropping %d entries", len(batch), exc_info=True)
+            return 0
+        self.writes += written
+        try:
+            if await asyncio.to_thread(self.total_bytes) > self.max_bytes:
+                await asyncio.to_thread(self.compact)
+        except sqlite3.Error:
+            self.errors += 1
+            logger.warning("Disk cache compaction failed", exc_info=True)
+        return written
+
+    async def run_writer(self, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.flush()
+            except Exception:
+                # Write-behind must outlive a bad batch; the next interval tries again.
+                self.errors += 1
+                logger.warning("Disk cache writer iteration failed", exc_info=True)
+
+    def snapshot(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "pending": len(self._pending),
+            "errors": self.errors,
+            "compactions": self.compactions,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_disk_cache: DiskCache | None = None
+_writer_task: asyncio.Task[None] | None = None
+
+
+def get_disk_cache() -> DiskCache | None:
+    return _disk_cache
+
+
+async def start_disk_cache(path: str | None = None) -> DiskCache | None:
+    global _disk_cache, _writer_task
+    path = path or settings.disk_cache_path
+    if not path:
+        return None
+    try:
+        cache = DiskCache(
+            path,
+            max_bytes=settings.disk_cache_max_bytes,
+            # Rows live exactly as long as they may be served: ttl + stale, measured from the original write.
+            ttl_seconds=settings.cache_ttl_seconds + settings.cache_stale_ttl_seconds,
+        )
+        await asyncio.to_thread(cache.compact)
+    except sqlite3.Error:
+        logger.warning("Disk cache at %s could not be opened; continuing without it", path, exc_info=True)
+        return None
+    _disk_cache = cache
+    _writer_task = asyncio.create_task(cache.run_writer(settings.disk_cache_flush_interval_seconds))
+    return cache
+
+
+async def close_disk_cache() -> None:
+    global _disk_cache, _writer_task
+    cache, task = _disk_cache, _writer_task
+    _disk_cache = None
+    _writer_task = None
+    if task is not None:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    if cache is None:
+        return
+    try:
+        await cache.flush()
+    finally:
+        cache.close()
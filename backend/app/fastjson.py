@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from pydantic import BaseModel
+
+try:
+    import orjson
+except Exception:  # pragma: no cover - optional runtime dependency branch
+    orjson = None
+
+
+def loads(data: bytes | bytearray | memoryview | str) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def decode_response(response: Any) -> Any:
+    # Parse the raw body directly instead of letting httpx decode it to str first.
+    content = getattr(response, "content", None)
+    if isinstance(content, (bytes, bytearray)):
+        return loads(content)
+    return response.json()
+
+
+def encode_event(event: BaseModel) -> str:
+    # pydantic-core writes JSON bytes directly from the model; no intermediate dict, no stdlib encoder.
+    return event.model_dump_json()
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import gzip
+import io
+import logging
+import sys
+from pathlib import Path
+from typing import IO, Any, Iterator
+
+from . import fastjson
+from .config import settings
+from .models import PrecomputedScore
+from .policy import DEFAULT_POLICY_VERSION, get_ruleset
+from .product_store import ProductStore
+from .records import ProductRecord
+from .scoring import compute_score
+from .tools import BEAUTY_FIELDS, FOOD_FIELDS
+
+logger = logging.getLogger("nutrivision")
+
+LIST_FIELDS = {"additives_tags", "allergens_tags", "ingredients_tags", "labels_tags"}
+
+
+def _open_text(path: Path) -> IO[str]:
+    if path.suffix == ".gz":
+        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8", errors="replace")
+    return path.open("r", encoding="utf-8", errors="replace")
+
+
+def _dump_format(path: Path) -> str:
+    suffixes = [suffix for suffix in path.suffixes if suffix != ".gz"]
+    last = suffixes[-1] if suffixes else ""
+    return "csv" if last in {".csv", ".tsv"} else "jsonl"
+
+
+def _to_number(value: Any) -> float | None:
+    if value is None or value == "" or isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def project_product(raw: dict[str, Any], fields: str, language: str) -> dict[str, Any] | None:
+    code = str(raw.get("code") or "").strip()
+    if not code:
+        return None
+
+    wanted = [field for field in fields.split(",") if field]
+    localized_name = f"product_name_{language}"
+    projected: dict[str, Any] = {"code": code}
+    for field in wanted:
+        if field == "code":
+            continue
+        if field == "nutriments":
+            nutriments = {
+                key: number
+                for key, value in (raw.get("nutriments") or {}).items()
+                if key.endswith("_100g") and (number := _to_number(value)) is not None
+            }
+            if nutriments:
+                projected["nutriments"] = nutriments
+            continue
+        value = raw.get(field)
+        if value in (None, "", []):
+            continue
+        if field in LIST_FIELDS and isinstance(value, str):
+            value = [item.strip() for item in value.split(",") if item.strip()]
+        projected[field] = value
+    if raw.get(localized_name) and localized_name not in projected:
+        projected[localized_name] = raw[localized_name]
+    return projected
+
+
+def _csv_row_to_raw(row: dict[str, str]) -> dict[str, Any]:
+    # The OFF CSV export flattens nutriments into "<nutrient>_100g" columns.
+    raw: dict[str, Any] = {}
+    nutriments: dict[str, Any] = {}
+    for key, value in row.items():
+        if not key or value in (None, ""):
+            continue
+        if key.endswith("_100g"):
+            nutriments[key] = value
+        else:
+            raw[key] = value
+    raw["nutriments"] = nutriments
+    return raw
+
+
+def iter_dump_products(path: Path) -> Iterator[dict[str, Any]]:
+    with _open_text(path) as handle:
+        if _dump_format(path) == "csv":
+            csv.field_size_limit(sys.maxsize)
+            for row in csv.DictReader(handle, delimiter="\t", quoting=csv.QUOTE_NONE):
+                yield _csv_row_to_raw(row)
+            return
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield fastjson.loads(line)
+            except ValueError:
+                continue
+
+
+def ingest_dump(
+    source: Path,
+    store: ProductStore,
+    *,
+    domain: str,
+    language: str,
+    batch_size: int = 5000,
+) -> int:
+    fields = BEAUTY_FIELDS if domain == "beauty" else FOOD_FIELDS
+    ingested = 0
+    batch: list[dict[str, Any]] = []
+    for raw in iter_dump_products(source):
+        product = project_product(raw, fields, language)
+        if product is None:
+            continue
+        batch.append(product)
+        if len(batch) >= batch_size:
+            ingested += store.upsert_many(domain, batch)
+            batch.clear()
+            logger.info("Ingested %d %s products", ingested, domain)
+    if batch:
+        ingested += store.upsert_many(domain, batch)
+    indexed = store.rebuild_search_index(domain)
+    logger.info("Indexed %d %s products for local search", indexed, domain)
+    return ingested
+
+
+def precompute_scores(
+    store: ProductStore,
+    *,
+    domain: str,
+    policy_version: str = DEFAULT_POLICY_VERSION,
+    batch_size: int = 5000,
+) -> int:
+    ruleset = get_ruleset(policy_version)
+    digest = ruleset.digest
+    stale = store.delete_stale_scores(domain, policy_version, digest)
+    if stale:
+        logger.info("Dropped %d %s scores from an older %s ruleset", stale, domain, policy_version)
+    scored = 0
+    batch: list[tuple[str, str, str, str, str, str]] = []
+    for product in store.iter_products(domain):
+        record = ProductRecord.from_payload(product)
+        policy_result, normalized = compute_score(record, domain, policy_version, ruleset)
+        payload = PrecomputedScore(policy=policy_result, score=normalized).model_dump_json()
+        batch.append((domain, record.code, policy_version, digest, record.fingerprint(), payload))
+        if len(batch) >= batch_size:
+            scored += store.upsert_scores(batch)
+            batch.clear()
+    if batch:
+        scored += store.upsert_scores(batch)
+    logger.info("Precomputed %d %s scores for policy %s", scored, domain, policy_version)
+    return scored
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Ingest an Open Food Facts / Open Beauty Facts dump into the local product store.")
+    parser.add_argument(
+        "source",
+        type=Path,
+        nargs="?",
+        help="Path to the OFF/OBF JSONL or CSV export (optionally .gz); omit to only rescore the store",
+    )
+    parser.add_argument("--db", type=Path, default=settings.product_store_path, help="SQLite store to write")
+    parser.add_argument("--domain", choices=("food", "beauty"), default="food")
+    parser.add_argument("--language", default=settings.locale_language)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--policy-version", action="append", help="Policy version to precompute scores for (repeatable)")
+    parser.add_argument("--skip-scores", action="store_true", help="Do not precompute scores after ingestion")
+    args = parser.parse_args(argv)
+
+    if not args.db:
+        parser.error("--db is required when PRODUCT_STORE_PATH is not set")
+
+    logging.basicConfig(level=settings.log_level)
+    store = ProductStore(args.db, read_only=False)
+    try:
+        if args.source is not None:
+            count = ingest_dump(
+                args.source,
+                store,
+                domain=args.domain,
+                language=args.language,
+                batch_size=args.batch_size,
+            )
+            logger.info("Ingestion complete: %d %s products in %s", count, args.domain, args.db)
+        if not args.skip_scores:
+            for policy_version in args.policy_version or [DEFAULT_POLICY_VERSION]:
+                precompute_scores(store, domain=args.domain, policy_version=policy_version, batch_size=args.batch_size)
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
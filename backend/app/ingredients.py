@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+
+# Brackets end a segment just like separators do, so "chocolate (sugar, cocoa)" yields the parent name
+# and every nested ingredient as flat tokens.
+_BOUNDARIES = frozenset(",;:()[]{}、，；：•·|\n\r\t")
+_E_NUMBER = re.compile(r"(?<![a-z0-9])e\s?-?(\d{3,4}[a-z]?)(?![a-z0-9])")
+_PERCENT = re.compile(r"\d+(?:\.\d+)?\s*%")
+_MARKUP = re.compile(r"[*_†‡\"“”„«»]+")
+_WHITESPACE = re.compile(r"\s+")
+# Conjunctions join list items in running text ("salt and pepper", "latte e zucchero"). They split only
+# between spaces, and never after a vitamin, so "vitamin e" keeps its letter. E-numbers are pulled out
+# before names are split.
+_CONJUNCTIONS = frozenset({"and", "und", "et", "e", "ed", "y", "en", "i", "og", "och", "oraz", "&"})
+_CONJUNCTION = re.compile(
+    r"(?<= )(?<!vitamin )(?<!vitamine )(?<!vitamina )(?:"
+    + "|".join(re.escape(word) for word in sorted(_CONJUNCTIONS))
+    + r")(?= )"
+)
+_HEADERS = frozenset(
+    {
+        "ingredients",
+        "ingredient",
+        "zutaten",
+        "ingrédients",
+        "ingredienti",
+        "ingredientes",
+        "ingrediënten",
+        "składniki",
+        "contains",
+        "enthält",
+    }
+)
+
+
+def _segments(text: str) -> list[str]:
+    segments: list[str] = []
+    current: list[str] = []
+    last = len(text) - 1
+    for index, char in enumerate(text):
+        if char in _BOUNDARIES:
+            # "12,5 %" keeps its decimal comma; it is a number, not a list separator.
+            if char == "," and 0 < index < last and text[index - 1].isdigit() and text[index + 1].isdigit():
+                current.append(".")
+                continue
+            if current:
+                segments.append("".join(current))
+                current = []
+            continue
+        current.append(char)
+    if current:
+        segments.append("".join(current))
+    return segments
+
+
+def _clean_name(segment: str) -> str:
+    name = _PERCENT.sub(" ", segment)
+    name = _MARKUP.sub(" ", name)
+    name = _WHITESPACE.sub(" ", name).strip(" .-/&+")
+    if not name or name in _HEADERS or name in _CONJUNCTIONS or not any(char.isalpha() for char in name):
+        return ""
+    return name
+
+
+@lru_cache(maxsize=8192)
+def parse_ingredients(text: str) -> tuple[str, ...]:
+    tokens: dict[str, None] = {}
+    for segment in _segments(text.lower()):
+        for match in _E_NUMBER.finditer(segment):
+            tokens[f"e{match.group(1)}"] = None
+        for part in _CONJUNCTION.split(_WHITESPACE.sub(" ", _E_NUMBER.sub(" ", segment))):
+            name = _clean_name(part)
+            if name:
+                tokens[name] = None
+    return tuple(tokens)
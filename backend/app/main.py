@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import base64
+import hmac
 import io
 import json
 import logging
@@ -11,17 +12,38 @@ import time
 import unicodedata
 import uuid
 import wave
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from datetime import date
-from typing import Any
+from typing import Any, AsyncIterator
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Header, HTTPException, Response, WebSocket, WebSocketDisconnect, status
 from fastapi.middleware.cors import CORSMiddleware
+from pydantic import BaseModel
 
 from .config import settings
-from .models import HudUpdateEvent, MetricItem, ProductIdentity, SearchCandidate, SimpleEvent, SpeechAudioEvent, SpeechEvent, WarningItem
-from .scoring import evaluate_ingredients_regulatory, normalize_and_score
-from .tools import get_product_by_barcode, search_product_catalog
+from .disk_cache import close_disk_cache, start_disk_cache
+from .fastjson import encode_event
+from .models import BatchBarcodeItem, BatchBarcodeRequest, BatchBarcodeResponse, HudUpdateEvent, MetricItem, ProductIdentity, SearchCandidate, SimpleEvent, SpeechAudioEvent, SpeechEvent, WarningItem
+from .policy_reload import policy_stats, reload_policies, start_policy_rulesets, stop_policy_rulesets
+from .product_store import close_product_store
+from .records import ProductRecord
+from .resilience import set_turn_deadline
+from .scoring import evaluate_and_score, score_memo_stats
+from .shared_cache import close_shared_cache, start_shared_cache
+from .tools import (
+    cache_stats,
+    close_http_clients,
+    get_product_by_barcode,
+    get_products_by_barcodes,
+    rate_limit_stats,
+    restore_from_disk_cache,
+    search_product_catalog,
+    start_http_clients,
+    upstream_stats,
+)
+from .turns import TurnScheduler
+from .warmup import start_warmup, stop_warmup, warmup_progress
 
 try:
     from google import genai
@@ -34,7 +56,28 @@ logger = logging.getLogger("nutrivision")
 logging.basicConfig(level=settings.log_level)
 _gemini_client_warning_emitted = False
 
-app = FastAPI(title=settings.app_name)
+
+@asynccontextmanager
+async def _lifespan(_: FastAPI) -> AsyncIterator[None]:
+    await start_http_clients()
+    await start_shared_cache()
+    if await start_disk_cache() is not None:
+        restored = await restore_from_disk_cache()
+        logger.info("Restored %d cache entries from disk", restored)
+    await start_policy_rulesets()
+    start_warmup()
+    try:
+        yield
+    finally:
+        await stop_warmup()
+        await stop_policy_rulesets()
+        await close_disk_cache()
+        await close_shared_cache()
+        await close_http_clients()
+        close_product_store()
+
+
+app = FastAPI(title=settings.app_name, lifespan=_lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -45,6 +88,14 @@ app.add_middleware(
 )
 
 
+@app.get("/ready")
+async def ready(response: Response) -> dict[str, Any]:
+    progress = warmup_progress()
+    if not progress.ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {"status": "ready" if progress.ready else "warming", "warmup": progress.snapshot()}
+
+
 @app.get("/health")
 async def health(verbose: bool = False) -> dict[str, Any]:
     payload: dict[str, Any] = {"status": "ok"}
@@ -68,9 +119,27 @@ async def health(verbose: bool = False) -> dict[str, Any]:
         "live_model": _resolve_live_model_name(),
         "live_output_audio": settings.gemini_live_output_audio,
     }
+    payload["cache"] = cache_stats()
+    payload["cache"]["scoring"] = score_memo_stats()
+    payload["upstreams"] = upstream_stats()
+    payload["rate_limits"] = rate_limit_stats()
+    payload["warmup"] = warmup_progress().snapshot()
+    payload["policy"] = policy_stats()
     return payload
 
 
+@app.post("/admin/policy/reload")
+async def reload_policy_rulesets(x_admin_token: str | None = Header(default=None)) -> dict[str, Any]:
+    if not settings.admin_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if not hmac.compare_digest((x_admin_token or "").encode(), settings.admin_token.encode()):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="invalid admin token")
+    try:
+        return await reload_policies()
+    except (OSError, ValueError) as exc:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc)) from exc
+
+
 def _extract_barcode(text: str) -> str | None:
     match = re.search(r"\b\d{8,14}\b", text)
     return match.group(0) if match else None
@@ -828,38 +897,17 @@ def _clarification_prompt(language: str, attempt: int) -> str:
     )
 
 
-def _nutrition_detail_snippet(product_payload: dict[str, Any], language: str) -> str:
-    nutriments = product_payload.get("nutriments") or {}
-    calories = nutriments.get("energy-kcal_100g")
-    sugar = nutriments.get("sugars_100g")
-    fat = nutriments.get("fat_100g")
-    protein = nutriments.get("proteins_100g")
-    salt = nutriments.get("salt_100g")
-    details: list[str] = []
-    if calories is not None:
-        details.append(f"{float(calories):.0f} kcal/100g")
-    if sugar is not None:
-        details.append(f"sugar {float(sugar):.1f} g/100g")
-    if fat is not None:
-        details.append(f"fat {float(fat):.1f} g/100g")
-    if protein is not None:
-        details.append(f"protein {float(protein):.1f} g/100g")
-    if salt is not None:
-        details.append(f"salt {float(salt):.2f} g/100g")
-    if not details:
+def _nutrition_detail_snippet(record: ProductRecord, language: str) -> str:
+    if not record.nutrition_details:
         return ""
-    joined = ", ".join(details[:4])
+    joined = ", ".join(record.nutrition_details[:4])
     if language == "de":
         return f"Bekannte Naehrwerte: {joined}."
     return f"Known nutrition values: {joined}."
 
 
-def _needs_backside_prompt(product_payload: dict[str, Any]) -> bool:
-    nutriments = product_payload.get("nutriments") or {}
-    keys = ("sugars_100g", "fat_100g", "proteins_100g", "salt_100g", "energy-kcal_100g")
-    available = sum(1 for key in keys if nutriments.get(key) is not None)
-    ingredients_text = str(product_payload.get("ingredients_text") or "").strip()
-    return available < 3 or not ingredients_text
+def _needs_backside_prompt(record: ProductRecord) -> bool:
+    return record.needs_backside_prompt
 
 
 def _decode_data_url(value: str | None) -> tuple[str, bytes] | None:
@@ -1352,6 +1400,12 @@ def _build_disambiguation(
     return text, [candidate.model_dump() for candidate in top]
 
 
+async def _send_event(websocket: WebSocket, event: BaseModel) -> None:
+    # Events are validated when they are built; serialize them once, straight to JSON, instead of
+    # model_dump() followed by Starlette's json.dumps over the resulting dict.
+    await websocket.send_text(encode_event(event))
+
+
 async def _send_simple(
     websocket: WebSocket,
     *,
@@ -1368,7 +1422,7 @@ async def _send_simple(
         message=message,
         details=details,
     )
-    await websocket.send_json(event.model_dump())
+    await _send_event(websocket, event)
 
 
 async def _send_speech(
@@ -1385,7 +1439,7 @@ async def _send_speech(
         text=text,
         language=_event_language(language),
     )
-    await websocket.send_json(speech.model_dump())
+    await _send_event(websocket, speech)
 
 
 async def _send_model_speech(
@@ -1430,7 +1484,7 @@ async def _send_model_speech(
             mime_type=audio_mime,
             language=_event_language(language),
         )
-        await websocket.send_json(audio_event.model_dump())
+        await _send_event(websocket, audio_event)
     await _send_speech(
         websocket,
         session_id=session_id,
@@ -1441,267 +1495,443 @@ async def _send_model_speech(
     return spoken_text
 
 
-@app.websocket("/ws/live")
-async def live_session(websocket: WebSocket) -> None:
-    await websocket.accept()
-    session_id = f"S-{uuid.uuid4().hex[:8]}"
-    turn_counter = 0
-    domain = "food"
-    language = "de"
+@app.post("/api/products/batch")
+async def products_batch(request: BatchBarcodeRequest) -> BatchBarcodeResponse:
+    if len(request.barcodes) > settings.batch_max_barcodes:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.batch_max_barcodes} barcodes per request",
+        )
+    results = await get_products_by_barcodes(
+        barcodes=request.barcodes,
+        domain=request.domain,
+        locale_country=request.locale_country or settings.locale_country,
+        locale_language=request.locale_language or settings.locale_language,
+    )
+    return BatchBarcodeResponse(
+        results=[
+            BatchBarcodeItem(barcode=barcode.strip(), result=result)
+            for barcode, result in zip(request.barcodes, results)
+        ]
+    )
+
+
+@dataclass
+class _LiveSessionState:
+    session_id: str
+    domain: str = "food"
+    language: str = "de"
     latest_frame: tuple[str, bytes] | None = None
     latest_audio: tuple[str, bytes] | None = None
     last_turn_signature: tuple[str, str] | None = None
-    last_turn_signature_at = 0.0
-    uncertain_streak = 0
-
-    await _send_simple(
+    last_turn_signature_at: float = 0.0
+    last_turn_signature_turn_id: str | None = None
+    scheduled_query: tuple[str, str] | None = None
+    uncertain_streak: int = 0
+    turn_counter: int = 0
+
+
+def _query_signature(incoming: dict[str, Any]) -> tuple[str, str]:
+    raw_query_text = str(incoming.get("text") or "").strip()
+    barcode = str(incoming.get("barcode") or "").strip() or _extract_barcode(raw_query_text) or ""
+    return barcode, _normalize_catalog_query(raw_query_text).strip().lower()
+
+
+async def _run_session_greeting(websocket: WebSocket, state: _LiveSessionState) -> None:
+    session_prompt = (
+        "Hallo, ich bin dein Live-Nutrition-Agent. "
+        "Halte das Produkt vor die Kamera; falls der Barcode nicht sichtbar ist, zeig bitte die Rueckseite oder nenne den Produktnamen."
+        if state.language == "de"
+        else "Hello, I am your live nutrition agent. "
+        "Bring the product to the camera; if the barcode is not visible, show the backside or tell me the product name."
+    )
+    await _send_model_speech(
         websocket,
-        session_id=session_id,
-        turn_id=None,
-        event_type="session_state",
-        message="WebSocket connected",
+        session_id=state.session_id,
+        turn_id="T-000",
+        language=state.language,
+        domain=state.domain,
+        prompt_text=session_prompt,
     )
 
-    try:
-        while True:
-            incoming = await websocket.receive_json()
-            msg_type = incoming.get("type")
-
-            if msg_type == "session_start":
-                domain = incoming.get("domain", "food")
-                language = _event_language(str(incoming.get("language", "de")))
-                latest_frame = None
-                latest_audio = None
-                uncertain_streak = 0
-                await _send_simple(
-                    websocket,
-                    session_id=session_id,
-                    turn_id=None,
-                    event_type="session_state",
-                    message="Live session started",
-                    details={"domain": domain, "language": language},
-                )
-                session_prompt = (
-                    "Hallo, ich bin dein Live-Nutrition-Agent. "
-                    "Halte das Produkt vor die Kamera; falls der Barcode nicht sichtbar ist, zeig bitte die Rueckseite oder nenne den Produktnamen."
-                    if language == "de"
-                    else "Hello, I am your live nutrition agent. "
-                    "Bring the product to the camera; if the barcode is not visible, show the backside or tell me the product name."
-                )
-                await _send_model_speech(
-                    websocket,
-                    session_id=session_id,
-                    turn_id="T-000",
-                    language=language,
-                    domain=domain,
-                    prompt_text=session_prompt,
-                )
-                continue
 
-            if msg_type == "frame":
-                decoded_frame = _decode_data_url(incoming.get("image_b64"))
-                if decoded_frame:
-                    latest_frame = decoded_frame
-                continue
+async def _run_live_turn(
+    websocket: WebSocket,
+    state: _LiveSessionState,
+    incoming: dict[str, Any],
+    turn_id: str,
+) -> None:
+    session_id = state.session_id
+    domain = state.domain
+    language = state.language
+    # Frames keep streaming in while the turn runs, so state.latest_frame is read at each use; the audio
+    # belongs to the query and is pinned for the whole turn.
+    latest_audio = state.latest_audio
+
+    set_turn_deadline(settings.upstream_turn_budget_seconds)
+    raw_query_text = str(incoming.get("text") or "").strip()
+    query_source = str(incoming.get("source") or "manual").strip().lower()
+    query_text = _normalize_catalog_query(raw_query_text)
+    barcode = str(incoming.get("barcode") or "").strip() or _extract_barcode(raw_query_text)
+    camera_intent = False
+
+    expiry_guidance = _expiry_guidance_from_text(query_text, language)
+    if expiry_guidance and not barcode:
+        await _send_speech(
+            websocket,
+            session_id=session_id,
+            turn_id=turn_id,
+            text=expiry_guidance,
+            language=language,
+        )
+        await _send_simple(
+            websocket,
+            session_id=session_id,
+            turn_id=turn_id,
+            event_type="session_state",
+            message="Expiration guidance returned",
+        )
+        return
 
-            if msg_type == "audio_chunk":
-                decoded_audio = _decode_data_url(incoming.get("audio_b64"))
-                if decoded_audio:
-                    latest_audio = decoded_audio
-                continue
+    social_intent = _classify_social_intent(raw_query_text) if raw_query_text and not barcode else None
+    if social_intent == "camera_check":
+        camera_intent = True
+    elif social_intent:
+        state.uncertain_streak = 0
+        conversational_prompt = _social_prompt(language, social_intent)
+        await _send_model_speech(
+            websocket,
+            session_id=session_id,
+            turn_id=turn_id,
+            language=language,
+            domain=domain,
+            prompt_text=conversational_prompt,
+            latest_frame=state.latest_frame,
+            latest_audio=latest_audio,
+            user_query=raw_query_text,
+        )
+        await _send_simple(
+            websocket,
+            session_id=session_id,
+            turn_id=turn_id,
+            event_type="session_state",
+            message="Turn complete",
+        )
+        return
 
-            if msg_type == "barge_in":
+    voice_noise_detected = _is_voice_noise_query(raw_query_text)
+    short_voice_query = (
+        query_source == "voice"
+        and _is_short_voice_query(raw_query_text)
+        and _lookup_whole_food_profile(query_text) is None
+    )
+    should_use_frame_hint = (
+        not barcode
+        and state.latest_frame is not None
+        and (
+            camera_intent
+            or _is_low_signal_query(query_text)
+            or voice_noise_detected
+            or short_voice_query
+        )
+    )
+    if should_use_frame_hint:
+        inferred_hint = await _infer_query_from_frame(
+            latest_frame=state.latest_frame,
+            domain=domain,
+            language=language,
+        )
+        if inferred_hint:
+            inferred_barcode = _extract_barcode(inferred_hint)
+            if inferred_barcode:
+                barcode = inferred_barcode
                 await _send_simple(
                     websocket,
                     session_id=session_id,
-                    turn_id=None,
-                    event_type="barge_ack",
-                    message="Barge-in acknowledged; current response interrupted",
+                    turn_id=turn_id,
+                    event_type="tool_call",
+                    message="Frame fallback inferred barcode",
+                    details={"barcode": inferred_barcode},
                 )
-                continue
-
-            if msg_type == "session_end":
+            else:
+                query_text = _normalize_catalog_query(inferred_hint) or inferred_hint
                 await _send_simple(
                     websocket,
                     session_id=session_id,
-                    turn_id=None,
-                    event_type="session_state",
-                    message="Live session stopped",
+                    turn_id=turn_id,
+                    event_type="tool_call",
+                    message=(
+                        "Voice query corrected by frame hint"
+                        if query_source == "voice" or voice_noise_detected
+                        else "Frame fallback inferred product name"
+                    ),
+                    details={"query_text": query_text, "source": query_source},
                 )
-                await websocket.close(code=1000)
-                return
+        elif voice_noise_detected or camera_intent:
+            query_text = ""
+            unclear_message = (
+                "Voice query unclear; waiting for clearer product signal"
+                if query_source == "voice"
+                else "Waiting for clearer product signal"
+            )
+            await _send_simple(
+                websocket,
+                session_id=session_id,
+                turn_id=turn_id,
+                event_type="session_state",
+                message=unclear_message,
+            )
 
-            if msg_type != "user_query":
-                await _send_simple(
-                    websocket,
-                    session_id=session_id,
-                    turn_id=None,
-                    event_type="error",
-                    message=f"Unsupported message type: {msg_type}",
-                )
-                continue
+    turn_signature = ((barcode or "").strip(), (query_text or "").strip().lower())
+    now_monotonic = time.monotonic()
+    if state.last_turn_signature == turn_signature and (now_monotonic - state.last_turn_signature_at) < 4.0:
+        await _send_simple(
+            websocket,
+            session_id=session_id,
+            turn_id=turn_id,
+            event_type="session_state",
+            message="Duplicate query ignored",
+        )
+        return
+    state.last_turn_signature = turn_signature
+    state.last_turn_signature_at = now_monotonic
+    state.last_turn_signature_turn_id = turn_id
+
+    if camera_intent and not barcode and not query_text:
+        state.uncertain_streak = 0
+        camera_prompt = _social_prompt(language, "camera_check")
+        await _send_model_speech(
+            websocket,
+            session_id=session_id,
+            turn_id=turn_id,
+            language=language,
+            domain=domain,
+            prompt_text=camera_prompt,
+            latest_frame=state.latest_frame,
+            latest_audio=latest_audio,
+            user_query=raw_query_text,
+        )
+        await _send_simple(
+            websocket,
+            session_id=session_id,
+            turn_id=turn_id,
+            event_type="session_state",
+            message="Turn complete",
+        )
+        return
 
-            turn_counter += 1
-            turn_id = f"T-{turn_counter:03d}"
-            raw_query_text = str(incoming.get("text") or "").strip()
-            query_source = str(incoming.get("source") or "manual").strip().lower()
-            query_text = _normalize_catalog_query(raw_query_text)
-            barcode = str(incoming.get("barcode") or "").strip() or _extract_barcode(raw_query_text)
-            camera_intent = False
-
-            expiry_guidance = _expiry_guidance_from_text(query_text, language)
-            if expiry_guidance and not barcode:
-                await _send_speech(
-                    websocket,
-                    session_id=session_id,
-                    turn_id=turn_id,
-                    text=expiry_guidance,
-                    language=language,
-                )
+    if not barcode and not query_text:
+        state.uncertain_streak += 1
+        no_match_prompt = _clarification_prompt(language, state.uncertain_streak)
+        await _send_simple(
+            websocket,
+            session_id=session_id,
+            turn_id=turn_id,
+            event_type="uncertain_match",
+            message=no_match_prompt,
+        )
+        await _send_model_speech(
+            websocket,
+            session_id=session_id,
+            turn_id=turn_id,
+            language=language,
+            domain=domain,
+            prompt_text=no_match_prompt,
+            latest_frame=state.latest_frame,
+            latest_audio=latest_audio,
+            user_query=raw_query_text,
+        )
+        return
+
+    whole_food_profile = _lookup_whole_food_profile(query_text) if not barcode else None
+    if whole_food_profile:
+        state.uncertain_streak = 0
+        await _send_simple(
+            websocket,
+            session_id=session_id,
+            turn_id=turn_id,
+            event_type="tool_call",
+            message="Whole-food nutrition fallback selected",
+        )
+        produce_hud = _build_whole_food_hud(
+            session_id=session_id,
+            turn_id=turn_id,
+            domain=domain,
+            language=language,
+            profile=whole_food_profile,
+        )
+        default_spoken_text = _build_whole_food_spoken_text(language, whole_food_profile)
+        live_result = await _gemini_live_refine_text(
+            default_text=default_spoken_text,
+            language=language,
+            domain=domain,
+            user_query=query_text,
+            latest_frame=state.latest_frame,
+            latest_audio=latest_audio,
+        )
+        spoken_text = live_result.text
+
+        await _send_event(websocket, produce_hud)
+        for audio_mime, audio_payload in live_result.audio_chunks[:4]:
+            audio_event = SpeechAudioEvent(
+                session_id=session_id,
+                turn_id=turn_id,
+                audio_b64=_encode_data_url(audio_mime, audio_payload),
+                mime_type=audio_mime,
+                language=_event_language(language),
+            )
+            await _send_event(websocket, audio_event)
+
+        await _send_speech(
+            websocket,
+            session_id=session_id,
+            turn_id=turn_id,
+            text=spoken_text,
+            language=language,
+        )
+        if state.latest_audio is latest_audio:
+            state.latest_audio = None
+        await _send_simple(
+            websocket,
+            session_id=session_id,
+            turn_id=turn_id,
+            event_type="session_state",
+            message="Turn complete",
+        )
+        return
+
+    await _send_simple(
+        websocket,
+        session_id=session_id,
+        turn_id=turn_id,
+        event_type="tool_call",
+        message="Recognition orchestrator started",
+        details={"mode": "barcode_first"},
+    )
+
+    record: ProductRecord | None = None
+    identity = ProductIdentity(id="unknown", name="Unknown product", brand="Unknown brand")
+    confidence = 0.45
+
+    if barcode:
+        barcode_result = await get_product_by_barcode(
+            barcode=barcode,
+            domain=domain,
+            locale_country=settings.locale_country,
+            locale_language=settings.locale_language,
+        )
+        if barcode_result.found and barcode_result.raw_payload_ref:
+            record = barcode_result.product_record()
+            identity = ProductIdentity(
+                id=barcode_result.product_id or barcode,
+                name=barcode_result.canonical_name or "Unknown product",
+                brand=record.brands or "Unknown brand",
+            )
+            confidence = barcode_result.confidence
+
+    if record is None:
+        await _send_simple(
+            websocket,
+            session_id=session_id,
+            turn_id=turn_id,
+            event_type="tool_call",
+            message="Barcode miss, running catalog fallback search",
+        )
+        search_result = await search_product_catalog(
+            query_text=query_text,
+            domain=domain,
+            locale_country=settings.locale_country,
+            locale_language=settings.locale_language,
+            max_results=5,
+        )
+        if not search_result.selected_candidate and not barcode and state.latest_frame is not None:
+            inferred_retry_hint = await _infer_query_from_frame(
+                latest_frame=state.latest_frame,
+                domain=domain,
+                language=language,
+            )
+            retry_query = _normalize_catalog_query(inferred_retry_hint or "")
+            if retry_query and retry_query.lower() != query_text.lower():
+                query_text = retry_query
                 await _send_simple(
                     websocket,
                     session_id=session_id,
                     turn_id=turn_id,
-                    event_type="session_state",
-                    message="Expiration guidance returned",
+                    event_type="tool_call",
+                    message="Catalog fallback retry with frame hint",
+                    details={"query_text": query_text},
                 )
-                continue
-
-            social_intent = _classify_social_intent(raw_query_text) if raw_query_text and not barcode else None
-            if social_intent == "camera_check":
-                camera_intent = True
-            elif social_intent:
-                uncertain_streak = 0
-                conversational_prompt = _social_prompt(language, social_intent)
-                await _send_model_speech(
-                    websocket,
-                    session_id=session_id,
-                    turn_id=turn_id,
-                    language=language,
+                search_result = await search_product_catalog(
+                    query_text=query_text,
                     domain=domain,
-                    prompt_text=conversational_prompt,
-                    latest_frame=latest_frame,
-                    latest_audio=latest_audio,
-                    user_query=raw_query_text,
-                )
-                await _send_simple(
-                    websocket,
-                    session_id=session_id,
-                    turn_id=turn_id,
-                    event_type="session_state",
-                    message="Turn complete",
+                    locale_country=settings.locale_country,
+                    locale_language=settings.locale_language,
+                    max_results=5,
                 )
-                continue
 
-            voice_noise_detected = _is_voice_noise_query(raw_query_text)
-            short_voice_query = (
-                query_source == "voice"
-                and _is_short_voice_query(raw_query_text)
-                and _lookup_whole_food_profile(query_text) is None
-            )
-            should_use_frame_hint = (
-                not barcode
-                and latest_frame is not None
-                and (
-                    camera_intent
-                    or _is_low_signal_query(query_text)
-                    or voice_noise_detected
-                    or short_voice_query
-                )
+        if search_result.candidates:
+            chosen, match_score = _pick_best_catalog_candidate(
+                query_text=query_text,
+                candidates=search_result.candidates,
             )
-            if should_use_frame_hint:
-                inferred_hint = await _infer_query_from_frame(
-                    latest_frame=latest_frame,
-                    domain=domain,
-                    language=language,
+            if chosen is None:
+                match_score = 0.0
+            min_match_score = _min_catalog_match_score(query_text)
+            close_alternatives: list[SearchCandidate] = []
+            if chosen is not None:
+                for candidate in search_result.candidates:
+                    if candidate.id == chosen.id:
+                        continue
+                    candidate_score = _candidate_match_score(query_text, candidate.name)
+                    if candidate_score >= min_match_score and abs(candidate_score - match_score) <= 0.12:
+                        close_alternatives.append(candidate)
+                    if len(close_alternatives) >= 1:
+                        break
+
+            if chosen is None or match_score < min_match_score:
+                state.uncertain_streak += 1
+                candidates_payload = [candidate.model_dump() for candidate in search_result.candidates[:3]]
+                uncertain_text = _pick_language(
+                    language,
+                    "Ich habe Treffer gefunden, bin aber noch nicht sicher. Bitte waehle das richtige Produkt oder zeig den Barcode bzw. die Rueckseite mit Zutaten und Naehrwerten.",
+                    "I found possible matches, but I am not confident yet. Please choose the correct product or show the barcode / backside ingredients and nutrition table.",
                 )
-                if inferred_hint:
-                    inferred_barcode = _extract_barcode(inferred_hint)
-                    if inferred_barcode:
-                        barcode = inferred_barcode
-                        await _send_simple(
-                            websocket,
-                            session_id=session_id,
-                            turn_id=turn_id,
-                            event_type="tool_call",
-                            message="Frame fallback inferred barcode",
-                            details={"barcode": inferred_barcode},
-                        )
-                    else:
-                        query_text = _normalize_catalog_query(inferred_hint) or inferred_hint
-                        await _send_simple(
-                            websocket,
-                            session_id=session_id,
-                            turn_id=turn_id,
-                            event_type="tool_call",
-                            message=(
-                                "Voice query corrected by frame hint"
-                                if query_source == "voice" or voice_noise_detected
-                                else "Frame fallback inferred product name"
-                            ),
-                            details={"query_text": query_text, "source": query_source},
-                        )
-                elif voice_noise_detected or camera_intent:
-                    query_text = ""
-                    unclear_message = (
-                        "Voice query unclear; waiting for clearer product signal"
-                        if query_source == "voice"
-                        else "Waiting for clearer product signal"
-                    )
-                    await _send_simple(
-                        websocket,
-                        session_id=session_id,
-                        turn_id=turn_id,
-                        event_type="session_state",
-                        message=unclear_message,
-                    )
-
-            turn_signature = ((barcode or "").strip(), (query_text or "").strip().lower())
-            now_monotonic = time.monotonic()
-            if last_turn_signature == turn_signature and (now_monotonic - last_turn_signature_at) < 4.0:
                 await _send_simple(
                     websocket,
                     session_id=session_id,
                     turn_id=turn_id,
-                    event_type="session_state",
-                    message="Duplicate query ignored",
+                    event_type="uncertain_match",
+                    message=uncertain_text,
+                    details={"candidates": candidates_payload, "match_score": round(match_score, 3)},
                 )
-                continue
-            last_turn_signature = turn_signature
-            last_turn_signature_at = now_monotonic
-
-            if camera_intent and not barcode and not query_text:
-                uncertain_streak = 0
-                camera_prompt = _social_prompt(language, "camera_check")
                 await _send_model_speech(
                     websocket,
                     session_id=session_id,
                     turn_id=turn_id,
                     language=language,
                     domain=domain,
-                    prompt_text=camera_prompt,
-                    latest_frame=latest_frame,
+                    prompt_text=uncertain_text,
+                    latest_frame=state.latest_frame,
                     latest_audio=latest_audio,
-                    user_query=raw_query_text,
+                    user_query=raw_query_text or query_text,
                 )
-                await _send_simple(
-                    websocket,
-                    session_id=session_id,
-                    turn_id=turn_id,
-                    event_type="session_state",
-                    message="Turn complete",
-                )
-                continue
+                return
 
-            if not barcode and not query_text:
-                uncertain_streak += 1
-                no_match_prompt = _clarification_prompt(language, uncertain_streak)
+            if close_alternatives:
+                top_two = [chosen, close_alternatives[0]]
+                options_text = (" oder " if language == "de" else " or ").join(candidate.name for candidate in top_two)
+                disambiguation_text = (
+                    f"Mehrere Treffer passen: {options_text}. Welches Produkt meinst du?"
+                    if language == "de"
+                    else f"Multiple matches fit: {options_text}. Which product do you mean?"
+                )
                 await _send_simple(
                     websocket,
                     session_id=session_id,
                     turn_id=turn_id,
                     event_type="uncertain_match",
-                    message=no_match_prompt,
+                    message=disambiguation_text,
+                    details={"candidates": [candidate.model_dump() for candidate in top_two]},
                 )
                 await _send_model_speech(
                     websocket,
@@ -1709,365 +1939,274 @@ async def live_session(websocket: WebSocket) -> None:
                     turn_id=turn_id,
                     language=language,
                     domain=domain,
-                    prompt_text=no_match_prompt,
-                    latest_frame=latest_frame,
+                    prompt_text=disambiguation_text,
+                    latest_frame=state.latest_frame,
                     latest_audio=latest_audio,
-                    user_query=raw_query_text,
+                    user_query=raw_query_text or query_text,
                 )
-                continue
+                return
 
-            whole_food_profile = _lookup_whole_food_profile(query_text) if not barcode else None
-            if whole_food_profile:
-                uncertain_streak = 0
+            disambiguation = _build_disambiguation(candidates=search_result.candidates, language=language)
+            if disambiguation:
+                disambiguation_text, candidates_payload = disambiguation
                 await _send_simple(
                     websocket,
                     session_id=session_id,
                     turn_id=turn_id,
-                    event_type="tool_call",
-                    message="Whole-food nutrition fallback selected",
+                    event_type="uncertain_match",
+                    message=disambiguation_text,
+                    details={"candidates": candidates_payload},
                 )
-                produce_hud = _build_whole_food_hud(
+                await _send_model_speech(
+                    websocket,
                     session_id=session_id,
                     turn_id=turn_id,
-                    domain=domain,
-                    language=language,
-                    profile=whole_food_profile,
-                )
-                default_spoken_text = _build_whole_food_spoken_text(language, whole_food_profile)
-                live_result = await _gemini_live_refine_text(
-                    default_text=default_spoken_text,
                     language=language,
                     domain=domain,
-                    user_query=query_text,
-                    latest_frame=latest_frame,
+                    prompt_text=disambiguation_text,
+                    latest_frame=state.latest_frame,
                     latest_audio=latest_audio,
+                    user_query=raw_query_text or query_text,
                 )
-                spoken_text = live_result.text
-
-                await websocket.send_json(produce_hud.model_dump())
-                for audio_mime, audio_payload in live_result.audio_chunks[:4]:
-                    audio_event = SpeechAudioEvent(
-                        session_id=session_id,
-                        turn_id=turn_id,
-                        audio_b64=_encode_data_url(audio_mime, audio_payload),
-                        mime_type=audio_mime,
-                        language=_event_language(language),
-                    )
-                    await websocket.send_json(audio_event.model_dump())
-
-                await _send_speech(
-                    websocket,
-                    session_id=session_id,
-                    turn_id=turn_id,
-                    text=spoken_text,
-                    language=language,
-                )
-                if latest_audio:
-                    latest_audio = None
-                await _send_simple(
-                    websocket,
-                    session_id=session_id,
-                    turn_id=turn_id,
-                    event_type="session_state",
-                    message="Turn complete",
-                )
-                continue
+                return
+
+            identity = ProductIdentity(id=chosen.id, name=chosen.name, brand="Catalog match")
+            confidence = chosen.confidence
 
+            barcode_retry = await get_product_by_barcode(
+                barcode=chosen.id,
+                domain=domain,
+                locale_country=settings.locale_country,
+                locale_language=settings.locale_language,
+            )
+            if barcode_retry.found and barcode_retry.raw_payload_ref:
+                record = barcode_retry.product_record()
+            else:
+                record = ProductRecord.from_payload(
+                    {"code": chosen.id, "product_name": chosen.name, "brands": "Catalog match"}
+                )
+        else:
+            state.uncertain_streak += 1
+            uncertain_text = _clarification_prompt(language, state.uncertain_streak)
             await _send_simple(
                 websocket,
                 session_id=session_id,
                 turn_id=turn_id,
-                event_type="tool_call",
-                message="Recognition orchestrator started",
-                details={"mode": "barcode_first"},
+                event_type="uncertain_match",
+                message=uncertain_text,
             )
+            await _send_model_speech(
+                websocket,
+                session_id=session_id,
+                turn_id=turn_id,
+                language=language,
+                domain=domain,
+                prompt_text=uncertain_text,
+                latest_frame=state.latest_frame,
+                latest_audio=latest_audio,
+                user_query=raw_query_text or query_text,
+            )
+            return
+
+    state.uncertain_streak = 0
+    _, normalized = evaluate_and_score(record, domain=domain, policy_version=settings.policy_version)
+
+    default_spoken_text = _pick_language(language, normalized.spoken_summary_de, normalized.spoken_summary_en)
+    nutrition_detail = _nutrition_detail_snippet(record, language)
+    backside_prompt_needed = _needs_backside_prompt(record)
+    backside_prompt = _nutrition_table_prompt(language) if backside_prompt_needed else ""
+    if nutrition_detail:
+        default_spoken_text = f"{default_spoken_text} {nutrition_detail}"
+    if backside_prompt:
+        default_spoken_text = f"{default_spoken_text} {backside_prompt}"
+    live_result = await _gemini_live_refine_text(
+        default_text=default_spoken_text,
+        language=language,
+        domain=domain,
+        user_query=query_text,
+        latest_frame=state.latest_frame,
+        latest_audio=latest_audio,
+    )
+    spoken_text = live_result.text
 
-            product_payload: dict[str, Any] = {}
-            identity = ProductIdentity(id="unknown", name="Unknown product", brand="Unknown brand")
-            confidence = 0.45
+    hud = HudUpdateEvent(
+        session_id=session_id,
+        turn_id=turn_id,
+        domain=domain,
+        policy_version=normalized.policy_version,
+        product_identity=ProductIdentity(
+            id=identity.id,
+            name=record.product_name or identity.name,
+            brand=record.brands or identity.brand,
+        ),
+        grade_or_tier=normalized.grade_or_tier,
+        warnings=normalized.warnings,
+        metrics=normalized.metrics,
+        confidence=max(confidence, normalized.confidence),
+        data_sources=normalized.data_sources,
+        explanation_bullets=normalized.explanation_bullets
+        + ([nutrition_detail] if nutrition_detail else [])
+        + ([backside_prompt] if backside_prompt else []),
+    )
+    await _send_event(websocket, hud)
 
-            if barcode:
-                barcode_result = await get_product_by_barcode(
-                    barcode=barcode,
-                    domain=domain,
-                    locale_country=settings.locale_country,
-                    locale_language=settings.locale_language,
-                )
-                if barcode_result.found and barcode_result.raw_payload_ref:
-                    product_payload = barcode_result.raw_payload_ref
-                    identity = ProductIdentity(
-                        id=barcode_result.product_id or barcode,
-                        name=barcode_result.canonical_name or "Unknown product",
-                        brand=(barcode_result.raw_payload_ref.get("brands") or "Unknown brand"),
-                    )
-                    confidence = barcode_result.confidence
-
-            if not product_payload:
-                await _send_simple(
-                    websocket,
-                    session_id=session_id,
-                    turn_id=turn_id,
-                    event_type="tool_call",
-                    message="Barcode miss, running catalog fallback search",
-                )
-                search_result = await search_product_catalog(
-                    query_text=query_text,
-                    domain=domain,
-                    locale_country=settings.locale_country,
-                    locale_language=settings.locale_language,
-                    max_results=5,
-                )
-                if not search_result.selected_candidate and not barcode and latest_frame is not None:
-                    inferred_retry_hint = await _infer_query_from_frame(
-                        latest_frame=latest_frame,
-                        domain=domain,
-                        language=language,
-                    )
-                    retry_query = _normalize_catalog_query(inferred_retry_hint or "")
-                    if retry_query and retry_query.lower() != query_text.lower():
-                        query_text = retry_query
-                        await _send_simple(
-                            websocket,
-                            session_id=session_id,
-                            turn_id=turn_id,
-                            event_type="tool_call",
-                            message="Catalog fallback retry with frame hint",
-                            details={"query_text": query_text},
-                        )
-                        search_result = await search_product_catalog(
-                            query_text=query_text,
-                            domain=domain,
-                            locale_country=settings.locale_country,
-                            locale_language=settings.locale_language,
-                            max_results=5,
-                        )
+    for audio_mime, audio_payload in live_result.audio_chunks[:4]:
+        audio_event = SpeechAudioEvent(
+            session_id=session_id,
+            turn_id=turn_id,
+            audio_b64=_encode_data_url(audio_mime, audio_payload),
+            mime_type=audio_mime,
+            language=_event_language(language),
+        )
+        await _send_event(websocket, audio_event)
 
-                if search_result.candidates:
-                    chosen, match_score = _pick_best_catalog_candidate(
-                        query_text=query_text,
-                        candidates=search_result.candidates,
-                    )
-                    if chosen is None:
-                        match_score = 0.0
-                    min_match_score = _min_catalog_match_score(query_text)
-                    close_alternatives: list[SearchCandidate] = []
-                    if chosen is not None:
-                        for candidate in search_result.candidates:
-                            if candidate.id == chosen.id:
-                                continue
-                            candidate_score = _candidate_match_score(query_text, candidate.name)
-                            if candidate_score >= min_match_score and abs(candidate_score - match_score) <= 0.12:
-                                close_alternatives.append(candidate)
-                            if len(close_alternatives) >= 1:
-                                break
-
-                    if chosen is None or match_score < min_match_score:
-                        uncertain_streak += 1
-                        candidates_payload = [candidate.model_dump() for candidate in search_result.candidates[:3]]
-                        uncertain_text = _pick_language(
-                            language,
-                            "Ich habe Treffer gefunden, bin aber noch nicht sicher. Bitte waehle das richtige Produkt oder zeig den Barcode bzw. die Rueckseite mit Zutaten und Naehrwerten.",
-                            "I found possible matches, but I am not confident yet. Please choose the correct product or show the barcode / backside ingredients and nutrition table.",
-                        )
-                        await _send_simple(
-                            websocket,
-                            session_id=session_id,
-                            turn_id=turn_id,
-                            event_type="uncertain_match",
-                            message=uncertain_text,
-                            details={"candidates": candidates_payload, "match_score": round(match_score, 3)},
-                        )
-                        await _send_model_speech(
-                            websocket,
-                            session_id=session_id,
-                            turn_id=turn_id,
-                            language=language,
-                            domain=domain,
-                            prompt_text=uncertain_text,
-                            latest_frame=latest_frame,
-                            latest_audio=latest_audio,
-                            user_query=raw_query_text or query_text,
-                        )
-                        continue
+    await _send_speech(
+        websocket,
+        session_id=session_id,
+        turn_id=turn_id,
+        text=spoken_text,
+        language=language,
+    )
+    if state.latest_audio is latest_audio:
+        state.latest_audio = None
 
-                    if close_alternatives:
-                        top_two = [chosen, close_alternatives[0]]
-                        options_text = (" oder " if language == "de" else " or ").join(candidate.name for candidate in top_two)
-                        disambiguation_text = (
-                            f"Mehrere Treffer passen: {options_text}. Welches Produkt meinst du?"
-                            if language == "de"
-                            else f"Multiple matches fit: {options_text}. Which product do you mean?"
-                        )
-                        await _send_simple(
-                            websocket,
-                            session_id=session_id,
-                            turn_id=turn_id,
-                            event_type="uncertain_match",
-                            message=disambiguation_text,
-                            details={"candidates": [candidate.model_dump() for candidate in top_two]},
-                        )
-                        await _send_model_speech(
-                            websocket,
-                            session_id=session_id,
-                            turn_id=turn_id,
-                            language=language,
-                            domain=domain,
-                            prompt_text=disambiguation_text,
-                            latest_frame=latest_frame,
-                            latest_audio=latest_audio,
-                            user_query=raw_query_text or query_text,
-                        )
-                        continue
+    await _send_simple(
+        websocket,
+        session_id=session_id,
+        turn_id=turn_id,
+        event_type="session_state",
+        message="Turn complete",
+    )
 
-                    disambiguation = _build_disambiguation(candidates=search_result.candidates, language=language)
-                    if disambiguation:
-                        disambiguation_text, candidates_payload = disambiguation
-                        await _send_simple(
-                            websocket,
-                            session_id=session_id,
-                            turn_id=turn_id,
-                            event_type="uncertain_match",
-                            message=disambiguation_text,
-                            details={"candidates": candidates_payload},
-                        )
-                        await _send_model_speech(
-                            websocket,
-                            session_id=session_id,
-                            turn_id=turn_id,
-                            language=language,
-                            domain=domain,
-                            prompt_text=disambiguation_text,
-                            latest_frame=latest_frame,
-                            latest_audio=latest_audio,
-                            user_query=raw_query_text or query_text,
-                        )
-                        continue
 
-                    identity = ProductIdentity(id=chosen.id, name=chosen.name, brand="Catalog match")
-                    confidence = chosen.confidence
-
-                    barcode_retry = await get_product_by_barcode(
-                        barcode=chosen.id,
-                        domain=domain,
-                        locale_country=settings.locale_country,
-                        locale_language=settings.locale_language,
-                    )
-                    if barcode_retry.found and barcode_retry.raw_payload_ref:
-                        product_payload = barcode_retry.raw_payload_ref
-                    else:
-                        product_payload = {
-                            "code": chosen.id,
-                            "product_name": chosen.name,
-                            "brands": "Catalog match",
-                            "ingredients_text": "",
-                            "additives_tags": [],
-                            "ingredients_tags": [],
-                        }
-                else:
-                    uncertain_streak += 1
-                    uncertain_text = _clarification_prompt(language, uncertain_streak)
-                    await _send_simple(
-                        websocket,
-                        session_id=session_id,
-                        turn_id=turn_id,
-                        event_type="uncertain_match",
-                        message=uncertain_text,
-                    )
-                    await _send_model_speech(
-                        websocket,
-                        session_id=session_id,
-                        turn_id=turn_id,
-                        language=language,
-                        domain=domain,
-                        prompt_text=uncertain_text,
-                        latest_frame=latest_frame,
-                        latest_audio=latest_audio,
-                        user_query=raw_query_text or query_text,
-                    )
-                    continue
-
-            uncertain_streak = 0
-            additives = product_payload.get("additives_tags") or []
-            ingredients_tags = product_payload.get("ingredients_tags") or []
-            ingredients_text = product_payload.get("ingredients_text") or ""
-            ingredient_tokens = list(additives) + list(ingredients_tags)
-            if ingredients_text:
-                ingredient_tokens.extend([token.strip() for token in ingredients_text.split(",") if token.strip()])
-
-            policy_result = evaluate_ingredients_regulatory(
-                domain=domain,
-                ingredients_or_additives=ingredient_tokens,
-                policy_version="v1",
-            )
-            normalized = normalize_and_score(product_payload=product_payload, policy_result=policy_result, domain=domain)
-
-            default_spoken_text = _pick_language(language, normalized.spoken_summary_de, normalized.spoken_summary_en)
-            nutrition_detail = _nutrition_detail_snippet(product_payload, language)
-            backside_prompt_needed = _needs_backside_prompt(product_payload)
-            backside_prompt = _nutrition_table_prompt(language) if backside_prompt_needed else ""
-            if nutrition_detail:
-                default_spoken_text = f"{default_spoken_text} {nutrition_detail}"
-            if backside_prompt:
-                default_spoken_text = f"{default_spoken_text} {backside_prompt}"
-            live_result = await _gemini_live_refine_text(
-                default_text=default_spoken_text,
-                language=language,
-                domain=domain,
-                user_query=query_text,
-                latest_frame=latest_frame,
-                latest_audio=latest_audio,
+async def _receive_live_messages(
+    websocket: WebSocket,
+    state: _LiveSessionState,
+    scheduler: TurnScheduler,
+) -> None:
+    # Never blocks on a turn: frames, audio and barge-ins keep landing in the session state while the
+    # turn worker is busy.
+    session_id = state.session_id
+    while True:
+        incoming = await websocket.receive_json()
+        msg_type = incoming.get("type")
+
+        if msg_type == "session_start":
+            scheduler.cancel_all()
+            state.domain = incoming.get("domain", "food")
+            state.language = _event_language(str(incoming.get("language", "de")))
+            state.latest_frame = None
+            state.latest_audio = None
+            state.uncertain_streak = 0
+            await _send_simple(
+                websocket,
+                session_id=session_id,
+                turn_id=None,
+                event_type="session_state",
+                message="Live session started",
+                details={"domain": state.domain, "language": state.language},
             )
-            spoken_text = live_result.text
+            state.scheduled_query = None
+            scheduler.submit("T-000", lambda: _run_session_greeting(websocket, state))
+            continue
 
-            hud = HudUpdateEvent(
+        if msg_type == "frame":
+            decoded_frame = _decode_data_url(incoming.get("image_b64"))
+            if decoded_frame:
+                state.latest_frame = decoded_frame
+            continue
+
+        if msg_type == "audio_chunk":
+            decoded_audio = _decode_data_url(incoming.get("audio_b64"))
+            if decoded_audio:
+                state.latest_audio = decoded_audio
+            continue
+
+        if msg_type == "barge_in":
+            scheduler.cancel_current()
+            await _send_simple(
+                websocket,
                 session_id=session_id,
-                turn_id=turn_id,
-                domain=domain,
-                policy_version=normalized.policy_version,
-                product_identity=ProductIdentity(
-                    id=identity.id,
-                    name=product_payload.get("product_name") or identity.name,
-                    brand=product_payload.get("brands") or identity.brand,
-                ),
-                grade_or_tier=normalized.grade_or_tier,
-                warnings=normalized.warnings,
-                metrics=normalized.metrics,
-                confidence=max(confidence, normalized.confidence),
-                data_sources=normalized.data_sources,
-                explanation_bullets=normalized.explanation_bullets
-                + ([nutrition_detail] if nutrition_detail else [])
-                + ([backside_prompt] if backside_prompt else []),
+                turn_id=None,
+                event_type="barge_ack",
+                message="Barge-in acknowledged; current response interrupted",
             )
-            await websocket.send_json(hud.model_dump())
+            continue
 
-            for audio_mime, audio_payload in live_result.audio_chunks[:4]:
-                audio_event = SpeechAudioEvent(
-                    session_id=session_id,
-                    turn_id=turn_id,
-                    audio_b64=_encode_data_url(audio_mime, audio_payload),
-                    mime_type=audio_mime,
-                    language=_event_language(language),
-                )
-                await websocket.send_json(audio_event.model_dump())
+        if msg_type == "session_end":
+            scheduler.cancel_all()
+            await _send_simple(
+                websocket,
+                session_id=session_id,
+                turn_id=None,
+                event_type="session_state",
+                message="Live session stopped",
+            )
+            await websocket.close(code=1000)
+            return
 
-            await _send_speech(
+        if msg_type != "user_query":
+            await _send_simple(
                 websocket,
                 session_id=session_id,
-                turn_id=turn_id,
-                text=spoken_text,
-                language=language,
+                turn_id=None,
+                event_type="error",
+                message=f"Unsupported message type: {msg_type}",
             )
-            if latest_audio:
-                latest_audio = None
+            continue
 
+        state.turn_counter += 1
+        turn_id = f"T-{state.turn_counter:03d}"
+        signature = _query_signature(incoming)
+        if scheduler.busy and signature == state.scheduled_query:
+            # A repeat of the query already being answered must not cancel it and restart from scratch.
             await _send_simple(
                 websocket,
                 session_id=session_id,
                 turn_id=turn_id,
                 event_type="session_state",
-                message="Turn complete",
+                message="Duplicate query ignored",
             )
+            continue
+        state.scheduled_query = signature
+        scheduler.submit(turn_id, lambda incoming=incoming, turn_id=turn_id: _run_live_turn(websocket, state, incoming, turn_id))
+
+
+@app.websocket("/ws/live")
+async def live_session(websocket: WebSocket) -> None:
+    await websocket.accept()
+    state = _LiveSessionState(session_id=f"S-{uuid.uuid4().hex[:8]}")
+    session_id = state.session_id
+
+    async def _turn_cancelled(turn_id: str) -> None:
+        # A turn that never finished must not make its replacement look like a duplicate.
+        if state.last_turn_signature_turn_id == turn_id:
+            state.last_turn_signature = None
+            state.last_turn_signature_turn_id = None
+        await _send_simple(
+            websocket,
+            session_id=session_id,
+            turn_id=turn_id,
+            event_type="session_state",
+            message="Turn cancelled",
+        )
+
+    scheduler = TurnScheduler(on_cancelled=_turn_cancelled)
 
+    await _send_simple(
+        websocket,
+        session_id=session_id,
+        turn_id=None,
+        event_type="session_state",
+        message="WebSocket connected",
+    )
+
+    receiver = asyncio.create_task(_receive_live_messages(websocket, state, scheduler))
+    worker = asyncio.create_task(scheduler.run())
+    try:
+        done, _ = await asyncio.wait({receiver, worker}, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()
     except WebSocketDisconnect:
         logger.info("WebSocket disconnected: %s", session_id)
     except Exception:
@@ -2082,3 +2221,7 @@ async def live_session(websocket: WebSocket) -> None:
             )
         except Exception:
             pass
+    finally:
+        receiver.cancel()
+        worker.cancel()
+        await asyncio.gather(receiver, worker, return_exceptions=True)
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 from typing import Any, Literal
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
+
+from .records import ProductRecord
 
 
 EventType = Literal[
@@ -83,6 +85,28 @@ class BarcodeToolResult(BaseModel):
     canonical_name: str | None = None
     confidence: float = 0.0
     raw_payload_ref: dict[str, Any] | None = None
+    _record: ProductRecord | None = PrivateAttr(default=None)
+
+    def product_record(self) -> ProductRecord | None:
+        if self._record is None and self.raw_payload_ref:
+            self._record = ProductRecord.from_payload(self.raw_payload_ref)
+        return self._record
+
+
+class BatchBarcodeRequest(BaseModel):
+    barcodes: list[str] = Field(min_length=1)
+    domain: DomainType = "food"
+    locale_country: str | None = None
+    locale_language: str | None = None
+
+
+class BatchBarcodeItem(BaseModel):
+    barcode: str
+    result: BarcodeToolResult
+
+
+class BatchBarcodeResponse(BaseModel):
+    results: list[BatchBarcodeItem]
 
 
 class SearchCandidate(BaseModel):
@@ -119,3 +143,8 @@ class NormalizedScoreResult(BaseModel):
     metrics: list[MetricItem]
     explanation_bullets: list[str]
     data_sources: list[str]
+
+
+class PrecomputedScore(BaseModel):
+    policy: PolicyToolResult
+    score: NormalizedScoreResult
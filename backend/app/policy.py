@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Iterable
+
+from .config import settings
+from .models import PolicyFlag
+
+logger = logging.getLogger("nutrivision")
+
+RULESET_DIR = Path(__file__).resolve().parent / "rulesets"
+DEFAULT_POLICY_VERSION = "v1"
+_POLICY_VERSION_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")
+# Tokens are scanned as one text; the separator keeps "contains" patterns from matching across tokens.
+TOKEN_SEPARATOR = "\n"
+
+
+class RulesetError(ValueError):
+    pass
+
+
+class PatternMatcher:
+    # Aho-Corasick automaton: one pass over the text finds every pattern, whatever the pattern count.
+    def __init__(self, patterns: dict[str, frozenset[int]]) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._outputs: list[frozenset[int]] = [frozenset()]
+        for pattern, rules in patterns.items():
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._outputs.append(frozenset())
+                state = next_state
+            self._outputs[state] = self._outputs[state] | rules
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._outputs[next_state] = self._outputs[next_state] | self._outputs[self._fail[next_state]]
+
+    def scan(self, text: str, matched: set[int]) -> None:
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if outputs[state]:
+                matched.update(outputs[state])
+
+
+class CompiledDomainRules:
+    def __init__(self, rules: list[dict[str, Any]]) -> None:
+        self.flags = [_flag(rule) for rule in rules]
+        self.exact: dict[str, set[int]] = {}
+        contains: dict[str, set[int]] = {}
+        for index, rule in enumerate(rules):
+            for token in rule.get("exact") or []:
+                self.exact.setdefault(_normalize(token), set()).add(index)
+            for pattern in rule.get("contains") or []:
+                contains.setdefault(_normalize(pattern), set()).add(index)
+        self.matcher = PatternMatcher({pattern: frozenset(rules) for pattern, rules in contains.items() if pattern})
+
+    def match(self, tokens: list[str]) -> list[PolicyFlag]:
+        matched: set[int] = set()
+        for token in tokens:
+            hits = self.exact.get(token)
+            if hits:
+                matched.update(hits)
+        self.matcher.scan(TOKEN_SEPARATOR.join(tokens), matched)
+        return [self.flags[index] for index in sorted(matched)]
+
+
+class CompiledRuleset:
+    def __init__(self, data: dict[str, Any], *, digest: str = "") -> None:
+        # The digest identifies the rule content, so precomputed scores notice edits within a version.
+        self.digest = digest or hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        self.policy_version = str(data.get("policy_version") or "")
+        domains = data.get("domains")
+        if not self.policy_version or not isinstance(domains, dict) or not domains:
+            raise RulesetError("ruleset needs a policy_version and at least one domain")
+        self.domains = {str(domain): CompiledDomainRules(list(rules or [])) for domain, rules in domains.items()}
+        fallback = data.get("fallback")
+        self.fallback = _flag(fallback) if fallback else None
+
+    def evaluate(self, domain: str, ingredients_or_additives: Iterable[str]) -> list[PolicyFlag]:
+        rules = self.domains.get(domain)
+        if rules is None and domain != "food":
+            # Anything that is not food is evaluated against the beauty rules.
+            rules = self.domains.get("beauty")
+        tokens = list({_normalize(item) for item in ingredients_or_additives if item})
+        flags = rules.match(tokens) if rules is not None else []
+        if not flags and self.fallback is not None:
+            flags = [self.fallback]
+        return flags
+
+
+def _normalize(value: str) -> str:
+    return str(value).lower().strip()
+
+
+def _flag(rule: dict[str, Any]) -> PolicyFlag:
+    try:
+        return PolicyFlag(
+            category=rule["category"],
+            severity=rule["severity"],
+            message_short=rule["message_short"],
+            policy_citation=rule["policy_citation"],
+        )
+    except (KeyError, ValueError) as exc:
+        raise RulesetError(f"invalid rule {rule.get('id', '?')!r}: {exc}") from exc
+
+
+def load_ruleset(path: str | Path) -> CompiledRuleset:
+    raw = Path(path).read_bytes()
+    return CompiledRuleset(json.loads(raw), digest=_digest(raw))
+
+
+def _digest(raw: bytes) -> str:
+    return hashlib.sha256(raw).hexdigest()[:16]
+
+
+def ruleset_dir() -> Path:
+    return Path(settings.policy_ruleset_dir) if settings.policy_ruleset_dir else RULESET_DIR
+
+
+# Readers take whatever dict is current; writers build a new one and swap the reference, so a turn that
+# already holds a CompiledRuleset keeps evaluating against it until it finishes. The dict is never mutated
+# in place, because reloads iterate it from a worker thread.
+_rulesets: dict[str, CompiledRuleset] = {}
+_swap_lock = threading.Lock()
+
+
+def get_ruleset(policy_version: str) -> CompiledRuleset:
+    global _rulesets
+    ruleset = _rulesets.get(policy_version)
+    if ruleset is not None:
+        return ruleset
+    path = ruleset_dir() / f"{policy_version}.json"
+    if not _POLICY_VERSION_PATTERN.match(policy_version) or not path.is_file():
+        if policy_version == DEFAULT_POLICY_VERSION:
+            raise RulesetError(f"default ruleset {path} is missing")
+        logger.warning("Unknown policy_version %r; using %s rules", policy_version, DEFAULT_POLICY_VERSION)
+        ruleset = get_ruleset(DEFAULT_POLICY_VERSION)
+    else:
+        ruleset = load_ruleset(path)
+    with _swap_lock:
+        existing = _rulesets.get(policy_version)
+        if existing is not None:
+            return existing
+        _rulesets = {**_rulesets, policy_version: ruleset}
+    return ruleset
+
+
+def loaded_rulesets() -> dict[str, str]:
+    return {version: ruleset.digest for version, ruleset in sorted(_rulesets.items())}
+
+
+def ruleset_signature(directory: str | Path | None = None) -> tuple[tuple[str, int, int], ...]:
+    directory = Path(directory) if directory else ruleset_dir()
+    signature = []
+    for path in sorted(directory.glob("*.json")):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        signature.append((path.name, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+def reload_rulesets(directory: str | Path | None = None) -> list[str]:
+    # Compiles every ruleset in the directory, reusing unchanged ones by digest, then swaps them in at once.
+    # A file that fails to parse keeps its previous compiled version. Returns the versions whose rules changed.
+    global _rulesets
+    directory = Path(directory) if directory else ruleset_dir()
+    current = dict(_rulesets)
+    compiled: dict[str, CompiledRuleset] = {}
+    for path in sorted(directory.glob("*.json")):
+        version = path.stem
+        if not _POLICY_VERSION_PATTERN.match(version):
+            continue
+        previous = current.get(version)
+        try:
+            raw = path.read_bytes()
+            digest = _digest(raw)
+            if previous is not None and previous.digest == digest:
+                compiled[version] = previous
+                continue
+            compiled[version] = CompiledRuleset(json.loads(raw), digest=digest)
+        except (OSError, ValueError) as exc:
+            logger.warning("Ruleset %s could not be reloaded: %s", path, exc)
+            if previous is not None:
+                compiled[version] = previous
+    default = compiled.get(DEFAULT_POLICY_VERSION)
+    if default is None:
+        raise RulesetError(f"default ruleset {DEFAULT_POLICY_VERSION}.json is missing from {directory}")
+    with _swap_lock:
+        # Re-read under the lock: lookups on the event loop may have added aliases while this thread compiled.
+        latest = _rulesets
+        for version, ruleset in latest.items():
+            # Unknown versions that fell back to the default stay aliased while the default is unchanged.
+            if version not in compiled and ruleset is default:
+                compiled[version] = default
+        changed = sorted(
+            version for version in set(latest) | set(compiled) if latest.get(version) is not compiled.get(version)
+        )
+        _rulesets = compiled
+    return changed
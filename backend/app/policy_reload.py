@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any
+
+from .config import settings
+from .policy import loaded_rulesets, reload_rulesets, ruleset_dir, ruleset_signature
+from .scoring import invalidate_policy_scores
+
+logger = logging.getLogger("nutrivision")
+
+
+@dataclass
+class PolicyReloadStats:
+    reloads: int = 0
+    failures: int = 0
+    invalidated: int = 0
+    last_changed: tuple[str, ...] = ()
+    last_error: str | None = None
+
+
+_stats = PolicyReloadStats()
+_reload_lock = asyncio.Lock()
+_watcher_task: asyncio.Task[None] | None = None
+
+
+async def reload_policies() -> dict[str, Any]:
+    async with _reload_lock:
+        try:
+            # Compiling large rulesets is CPU work; keep it off the event loop so live turns keep flowing.
+            changed = await asyncio.to_thread(reload_rulesets)
+        except (OSError, ValueError) as exc:
+            _stats.failures += 1
+            _stats.last_error = str(exc)
+            logger.warning("Policy ruleset reload failed: %s", exc)
+            raise
+        invalidated = invalidate_policy_scores(changed)
+        _stats.reloads += 1
+        _stats.invalidated += invalidated
+        _stats.last_changed = tuple(changed)
+        _stats.last_error = None
+    if changed:
+        logger.info("Reloaded policy rulesets %s; dropped %d memoized scores", ", ".join(changed), invalidated)
+    return {"changed": changed, "invalidated": invalidated, "versions": loaded_rulesets()}
+
+
+async def _watch(interval_seconds: float) -> None:
+    signature = await asyncio.to_thread(ruleset_signature)
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            current = await asyncio.to_thread(ruleset_signature)
+            if current == signature:
+                continue
+            signature = current
+            await reload_policies()
+        except (OSError, ValueError):
+            continue
+        except Exception as exc:
+            # The poller must outlive a bad iteration; count it and try again on the next change.
+            _stats.failures += 1
+            _stats.last_error = repr(exc)
+            logger.exception("Policy ruleset watcher iteration failed")
+
+
+async def start_policy_rulesets() -> None:
+    global _watcher_task
+    try:
+        await reload_policies()
+    except (OSError, ValueError):
+        logger.warning("Policy rulesets will be loaded lazily from %s", ruleset_dir())
+    if settings.policy_reload_interval_seconds > 0:
+        _watcher_task = asyncio.create_task(_watch(settings.policy_reload_interval_seconds))
+
+
+async def stop_policy_rulesets() -> None:
+    global _watcher_task
+    task = _watcher_task
+    _watcher_task = None
+    if task is None or task.done():
+        return
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+
+def policy_stats() -> dict[str, Any]:
+    return {
+        "active_version": settings.policy_version,
+        "directory": str(ruleset_dir()),
+        "versions": loaded_rulesets(),
+        "watching": _watcher_task is not None and not _watcher_task.done(),
+        "reloads": _stats.reloads,
+        "failures": _stats.failures,
+        "invalidated": _stats.invalidated,
+        "last_changed": list(_stats.last_changed),
+        "last_error": _stats.last_error,
+    }
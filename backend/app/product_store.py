@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import json
+import logging
+import re
+import sqlite3
+import unicodedata
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from . import fastjson
+from .config import settings
+
+logger = logging.getLogger("nutrivision")
+
+PRODUCTS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    domain TEXT NOT NULL,
+    code TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (domain, code)
+) WITHOUT ROWID
+"""
+
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+    product_name,
+    brands,
+    domain UNINDEXED,
+    code UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2'
+)
+"""
+
+
+SCORES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    domain TEXT NOT NULL,
+    code TEXT NOT NULL,
+    policy_version TEXT NOT NULL,
+    ruleset_digest TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (domain, code, policy_version)
+) WITHOUT ROWID
+"""
+
+
+def _fold(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text.lower().replace("’", "'"))
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def _query_terms(query_text: str) -> list[str]:
+    terms: list[str] = []
+    for token in re.findall(r"\w+", _fold(query_text)):
+        if token == "s":
+            continue
+        # Strip plural "s" and prefix-match so "lays" finds "Lay's" and "chips" finds "chip".
+        stem = token[:-1] if token.endswith("s") and len(token) > 3 else token
+        if stem not in terms:
+            terms.append(stem)
+    return terms
+
+
+def _fts_query(query_text: str) -> str:
+    return " OR ".join(f'"{term}"*' for term in _query_terms(query_text))
+
+
+def _match_ratio(terms: list[str], *texts: str) -> float:
+    if not terms:
+        return 0.0
+    words = re.findall(r"\w+", _fold(" ".join(texts)))
+    matched = sum(1 for term in terms if any(word.startswith(term) for word in words))
+    return matched / len(terms)
+
+
+class ProductStore:
+    def __init__(self, path: str | Path, *, read_only: bool = True) -> None:
+        self.path = Path(path)
+        self.read_only = read_only
+        if read_only:
+            self._conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            # The store is a rebuildable artifact, so bulk ingestion skips fsyncs.
+            self._conn.execute("PRAGMA synchronous=OFF")
+            self._conn.execute(PRODUCTS_SCHEMA)
+            self._conn.execute(SEARCH_SCHEMA)
+            self._conn.execute(SCORES_SCHEMA)
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        return self._conn
+
+    def get(self, domain: str, code: str) -> dict[str, Any] | None:
+        row = self._conn.execute(
+            "SELECT payload FROM products WHERE domain = ? AND code = ?",
+            (domain, code),
+        ).fetchone()
+        if row is None:
+            return None
+        return fastjson.loads(row[0])
+
+    def upsert_many(self, domain: str, products: Iterable[dict[str, Any]]) -> int:
+        rows = [
+            (domain, str(product["code"]), json.dumps(product, ensure_ascii=False, separators=(",", ":")))
+            for product in products
+        ]
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO products (domain, code, payload) VALUES (?, ?, ?)",
+            rows,
+        )
+        self._conn.commit()
+        return len(rows)
+
+    def iter_products(self, domain: str, page_size: int = 5000) -> Iterator[dict[str, Any]]:
+        # Keyset pagination, so callers can write to the store between pages.
+        last_code = ""
+        while True:
+            rows = self._conn.execute(
+                "SELECT code, payload FROM products WHERE domain = ? AND code > ? ORDER BY code LIMIT ?",
+                (domain, last_code, page_size),
+            ).fetchall()
+            if not rows:
+                return
+            for code, payload in rows:
+                yield fastjson.loads(payload)
+            last_code = rows[-1][0]
+
+    def upsert_scores(self, rows: Iterable[tuple[str, str, str, str, str, str]]) -> int:
+        rows = list(rows)
+        self._conn.executemany(
+            """
+            INSERT OR REPLACE INTO scores (domain, code, policy_version, ruleset_digest, fingerprint, payload)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+        self._conn.commit()
+        return len(rows)
+
+    def delete_stale_scores(self, domain: str, policy_version: str, ruleset_digest: str) -> int:
+        cursor = self._conn.execute(
+            "DELETE FROM scores WHERE domain = ? AND policy_version = ? AND ruleset_digest != ?",
+            (domain, policy_version, ruleset_digest),
+        )
+        self._conn.commit()
+        return cursor.rowcount
+
+    def get_score(self, domain: str, code: str, policy_version: str, ruleset_digest: str) -> tuple[str, str] | None:
+        try:
+            row = self._conn.execute(
+                """
+                SELECT fingerprint, payload FROM scores
+                WHERE domain = ? AND code = ? AND policy_version = ? AND ruleset_digest = ?
+                """,
+                (domain, code, policy_version, ruleset_digest),
+            ).fetchone()
+        except sqlite3.OperationalError:
+            # Stores built before scores were precomputed have no scores table.
+            return None
+        if row is None:
+            return None
+        return str(row[0]), str(row[1])
+
+    def rebuild_search_index(self, domain: str) -> int:
+        self._conn.execute("DELETE FROM products_fts WHERE domain = ?", (domain,))
+        cursor = self._conn.execute(
+            """
+            INSERT INTO products_fts (product_name, brands, domain, code)
+            SELECT
+                COALESCE(json_extract(payload, '$.product_name'), ''),
+                COALESCE(json_extract(payload, '$.brands'), ''),
+                domain,
+                code
+            FROM products
+            WHERE domain = ?
+            """,
+            (domain,),
+        )
+        self._conn.commit()
+        return cursor.rowcount
+
+    def search(self, domain: str, query_text: str, limit: int) -> list[tuple[str, str, float, float]]:
+        # Each hit carries the share of query terms its name or brand actually matches, because OR-prefix
+        # matching alone lets almost any query hit something.
+        terms = _query_terms(query_text)
+        if not terms:
+            return []
+        try:
+            rows = self._conn.execute(
+                """
+                SELECT code, product_name, brands, -bm25(products_fts, 10.0, 4.0) AS relevance
+                FROM products_fts
+                WHERE products_fts MATCH ? AND domain = ?
+                ORDER BY relevance DESC
+                LIMIT ?
+                """,
+                (_fts_query(query_text), domain, limit),
+            ).fetchall()
+        except sqlite3.OperationalError:
+            return []
+        return [
+            (str(code), str(name or ""), float(relevance), _match_ratio(terms, str(name or ""), str(brands or "")))
+            for code, name, brands, relevance in rows
+        ]
+
+    def count(self, domain: str | None = None) -> int:
+        if domain is None:
+            return int(self._conn.execute("SELECT COUNT(*) FROM products").fetchone()[0])
+        return int(self._conn.execute("SELECT COUNT(*) FROM products WHERE domain = ?", (domain,)).fetchone()[0])
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+_product_store: ProductStore | None = None
+_product_store_path: str | None = None
+
+
+def get_product_store() -> ProductStore | None:
+    global _product_store, _product_store_path
+    path = settings.product_store_path
+    if not path:
+        return None
+    if _product_store is not None and _product_store_path == path:
+        return _product_store
+    close_product_store()
+    if not Path(path).is_file():
+        return None
+    try:
+        _product_store = ProductStore(path)
+        _product_store_path = path
+    except sqlite3.Error:
+        logger.warning("Local product store at %s could not be opened", path, exc_info=True)
+        return None
+    return _product_store
+
+
+def close_product_store() -> None:
+    global _product_store, _product_store_path
+    if _product_store is not None:
+        _product_store.close()
+    _product_store = None
+    _product_store_path = None
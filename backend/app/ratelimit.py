@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any
+
+INTERACTIVE = 0
+BACKGROUND = 1
+
+_request_priority: ContextVar[int] = ContextVar("upstream_request_priority", default=INTERACTIVE)
+
+
+class RateLimitExceeded(Exception):
+    pass
+
+
+def current_priority() -> int:
+    return _request_priority.get()
+
+
+def set_request_priority(priority: int) -> None:
+    # Tasks copy their context on creation, so this only affects the calling task and what it spawns.
+    _request_priority.set(priority)
+
+
+class TokenBucketLimiter:
+    def __init__(
+        self,
+        name: str,
+        *,
+        rate_per_second: float,
+        burst: int,
+        max_wait_seconds: float,
+        wait_samples: int = 200,
+    ) -> None:
+        self.name = name
+        self.rate_per_second = rate_per_second
+        self.burst = max(1, burst)
+        self.max_wait_seconds = max_wait_seconds
+        self.acquired = 0
+        self.rejected = 0
+        self.max_queue_depth = 0
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._sequence = itertools.count()
+        self._waits: deque[float] = deque(maxlen=wait_samples)
+        self._drainer: asyncio.Task[None] | None = None
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for _, _, waiter in self._waiters if not waiter.done())
+
+    async def acquire(self, priority: int | None = None) -> None:
+        if self.rate_per_second <= 0:
+            return
+        priority = current_priority() if priority is None else priority
+        self._refill()
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+            self._record_wait(0.0)
+            return
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), waiter))
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        if self._drainer is None or self._drainer.done():
+            self._drainer = asyncio.create_task(self._drain())
+        queued_at = time.monotonic()
+        try:
+            async with asyncio.timeout(self.max_wait_seconds):
+                await waiter
+        except TimeoutError:
+            self.rejected += 1
+            raise RateLimitExceeded(self.name) from None
+        self._record_wait(time.monotonic() - queued_at)
+
+    async def _drain(self) -> None:
+        # Hands out tokens to queued callers in priority order, then FIFO within a priority.
+        while self._waiters:
+            _, _, waiter = self._waiters[0]
+            if waiter.done():
+                heapq.heappop(self._waiters)
+                continue
+            self._refill()
+            if self._tokens >= 1:
+                heapq.heappop(self._waiters)
+                self._tokens -= 1
+                waiter.set_result(None)
+                continue
+            await asyncio.sleep((1 - self._tokens) / self.rate_per_second)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        self._tokens = min(float(self.burst), self._tokens + elapsed * self.rate_per_second)
+
+    def _record_wait(self, seconds: float) -> None:
+        self.acquired += 1
+        self._waits.append(seconds)
+
+    def snapshot(self) -> dict[str, Any]:
+        self._refill()
+        ordered = sorted(self._waits)
+        p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))] if ordered else 0.0
+        return {
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "acquired": self.acquired,
+            "rejected": self.rejected,
+            "tokens": round(self._tokens, 2),
+            "wait_ms_avg": round(sum(ordered) / len(ordered) * 1000, 1) if ordered else 0.0,
+            "wait_ms_p95": round(p95 * 1000, 1),
+        }
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import hashlib
+import math
+from array import array
+from typing import Any
+
+from .ingredients import parse_ingredients
+
+NUTRIENT_KEYS = (
+    "energy-kcal_100g",
+    "sugars_100g",
+    "fat_100g",
+    "saturated-fat_100g",
+    "proteins_100g",
+    "salt_100g",
+)
+_NUTRIENT_INDEX = {key: index for index, key in enumerate(NUTRIENT_KEYS)}
+
+# Ordered as the spoken nutrition snippet lists them.
+_DETAIL_FORMATS = (
+    ("energy-kcal_100g", "{value:.0f} kcal/100g"),
+    ("sugars_100g", "sugar {value:.1f} g/100g"),
+    ("fat_100g", "fat {value:.1f} g/100g"),
+    ("proteins_100g", "protein {value:.1f} g/100g"),
+    ("salt_100g", "salt {value:.2f} g/100g"),
+)
+_BACKSIDE_KEYS = ("sugars_100g", "fat_100g", "proteins_100g", "salt_100g", "energy-kcal_100g")
+
+
+def _parse_float(value: Any) -> float:
+    if value is None or isinstance(value, bool):
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _tag_tuple(value: Any) -> tuple[str, ...]:
+    if not value:
+        return ()
+    if isinstance(value, str):
+        value = value.split(",")
+    return tuple(str(item) for item in value if item)
+
+
+class ProductRecord:
+    __slots__ = (
+        "code",
+        "product_name",
+        "brands",
+        "ingredients_text",
+        "ingredients_text_lower",
+        "additives_tags",
+        "ingredients_tags",
+        "nutrients",
+        "policy_tokens",
+        "nutrition_details",
+        "needs_backside_prompt",
+        "_fingerprint",
+    )
+
+    def __init__(
+        self,
+        *,
+        code: str,
+        product_name: str,
+        brands: str,
+        ingredients_text: str,
+        additives_tags: tuple[str, ...],
+        ingredients_tags: tuple[str, ...],
+        nutrients: array,
+    ) -> None:
+        self.code = code
+        self.product_name = product_name
+        self.brands = brands
+        self.ingredients_text = ingredients_text
+        self.ingredients_text_lower = ingredients_text.lower()
+        self.additives_tags = additives_tags
+        self.ingredients_tags = ingredients_tags
+        self.nutrients = nutrients
+
+        tokens = list(additives_tags) + list(ingredients_tags) + list(parse_ingredients(ingredients_text))
+        self.policy_tokens = frozenset(token.lower().strip() for token in tokens if token and token.strip())
+        self.nutrition_details = tuple(
+            template.format(value=self.nutrient(key))
+            for key, template in _DETAIL_FORMATS
+            if self.has_nutrient(key)
+        )
+        available = sum(1 for key in _BACKSIDE_KEYS if self.has_nutrient(key))
+        self.needs_backside_prompt = available < 3 or not ingredients_text.strip()
+        self._fingerprint: str | None = None
+
+    @classmethod
+    def from_payload(cls, payload: dict[str, Any]) -> ProductRecord:
+        nutriments = payload.get("nutriments") or {}
+        nutrients = array("d", (_parse_float(nutriments.get(key)) for key in NUTRIENT_KEYS))
+        return cls(
+            code=str(payload.get("code") or ""),
+            product_name=str(payload.get("product_name") or payload.get("product_name_de") or ""),
+            brands=str(payload.get("brands") or ""),
+            ingredients_text=str(payload.get("ingredients_text") or ""),
+            additives_tags=_tag_tuple(payload.get("additives_tags")),
+            ingredients_tags=_tag_tuple(payload.get("ingredients_tags")),
+            nutrients=nutrients,
+        )
+
+    def nutrient(self, key: str, default: float = 0.0) -> float:
+        value = self.nutrients[_NUTRIENT_INDEX[key]]
+        return default if math.isnan(value) else value
+
+    def has_nutrient(self, key: str) -> bool:
+        return not math.isnan(self.nutrients[_NUTRIENT_INDEX[key]])
+
+    def fingerprint(self) -> str:
+        # Covers everything policy evaluation and scoring read, and nothing else (names, brands, code).
+        if self._fingerprint is None:
+            digest = hashlib.blake2b(self.nutrients.tobytes(), digest_size=16)
+            for token in sorted(self.policy_tokens):
+                digest.update(b"\x00" + token.encode("utf-8"))
+            digest.update(b"\x01" + self.ingredients_text_lower.encode("utf-8"))
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def to_payload(self) -> dict[str, Any]:
+        return {
+            "code": self.code,
+            "product_name": self.product_name,
+            "brands": self.brands,
+            "ingredients_text": self.ingredients_text,
+            "additives_tags": list(self.additives_tags),
+            "ingredients_tags": list(self.ingredients_tags),
+            "nutriments": {key: self.nutrient(key) for key in NUTRIENT_KEYS if self.has_nutrient(key)},
+        }
@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, TypeVar
+
+import httpx
+
+T = TypeVar("T")
+
+# Endpoint classes have very different latency profiles (product reads vs search.pl), so each one
+# gets its own latency window and adaptive timeout while sharing the host's failure accounting.
+DEFAULT_ENDPOINT = "product"
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+_turn_deadline: ContextVar[float | None] = ContextVar("upstream_turn_deadline", default=None)
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class DeadlineExceeded(TimeoutError):
+    # The caller's turn budget ran out; this says nothing about the upstream or the key being looked up.
+    pass
+
+
+def is_upstream_failure(exc: BaseException) -> bool:
+    # 4xx answers (other than throttling) mean the upstream is healthy and simply said no.
+    if isinstance(exc, httpx.HTTPStatusError) and exc.response is not None:
+        status_code = exc.response.status_code
+        return status_code >= 500 or status_code == 429
+    return True
+
+
+def is_retryable(exc: BaseException) -> bool:
+    # Only transient failures of idempotent GETs are worth another attempt; a 404 stays a 404.
+    if isinstance(exc, DeadlineExceeded):
+        return False
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response is not None and is_upstream_failure(exc)
+    return isinstance(exc, (httpx.TransportError, TimeoutError))
+
+
+def set_turn_deadline(seconds: float | None) -> None:
+    _turn_deadline.set(time.monotonic() + seconds if seconds and seconds > 0 else None)
+
+
+def remaining_budget() -> float | None:
+    deadline = _turn_deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+async def retry_transient(
+    call: Callable[[], Awaitable[T]],
+    *,
+    attempts: int,
+    base_delay_seconds: float,
+    max_delay_seconds: float,
+    min_budget_seconds: float,
+) -> T:
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            return await call()
+        except Exception as exc:
+            if attempt >= attempts or not is_retryable(exc):
+                raise
+            # Full jitter keeps instances that failed together from retrying together.
+            delay = random.uniform(0.0, min(max_delay_seconds, base_delay_seconds * 2 ** (attempt - 1)))
+            budget = remaining_budget()
+            if budget is not None and budget - delay < min_budget_seconds:
+                raise
+            await asyncio.sleep(delay)
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_rate_threshold: float,
+        min_calls: int,
+        window_seconds: float,
+        open_seconds: float,
+        timeout_floor_seconds: float,
+        timeout_ceiling_seconds: float,
+        timeout_multiplier: float,
+        latency_samples: int = 200,
+    ) -> None:
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.min_calls = max(1, min_calls)
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self.timeout_floor_seconds = timeout_floor_seconds
+        self.timeout_ceiling_seconds = timeout_ceiling_seconds
+        self.timeout_multiplier = timeout_multiplier
+        self._outcomes: deque[tuple[float, bool]] = deque()
+        self.latency_samples = latency_samples
+        self._latencies: dict[str, deque[float]] = {}
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == OPEN
+
+    def allow_request(self) -> bool:
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self, latency_seconds: float, endpoint: str = DEFAULT_ENDPOINT) -> None:
+        latencies = self._latencies.get(endpoint)
+        if latencies is None:
+            latencies = self._latencies[endpoint] = deque(maxlen=self.latency_samples)
+        latencies.append(latency_seconds)
+        if self._state == HALF_OPEN:
+            self._close()
+            return
+        self._record(True)
+
+    def record_failure(self) -> None:
+        if self._state == HALF_OPEN:
+            self._open()
+            return
+        self._record(False)
+        total = len(self._outcomes)
+        failures = sum(1 for _, ok in self._outcomes if not ok)
+        if total >= self.min_calls and failures / total >= self.failure_rate_threshold:
+            self._open()
+
+    def record_abandoned(self) -> None:
+        # A cancelled call says nothing about upstream health; just free the half-open probe slot.
+        if self._state == HALF_OPEN:
+            self._probe_in_flight = False
+
+    def latency_percentile(self, percentile: float, endpoint: str = DEFAULT_ENDPOINT) -> float | None:
+        latencies = self._latencies.get(endpoint)
+        if not latencies:
+            return None
+        ordered = sorted(latencies)
+        index = min(len(ordered) - 1, int(round(percentile * (len(ordered) - 1))))
+        return ordered[index]
+
+    def timeout_seconds(self, endpoint: str = DEFAULT_ENDPOINT) -> float:
+        if len(self._latencies.get(endpoint) or ()) < self.min_calls:
+            return self.timeout_ceiling_seconds
+        p95 = self.latency_percentile(0.95, endpoint) or self.timeout_ceiling_seconds
+        adaptive = p95 * self.timeout_multiplier
+        return max(self.timeout_floor_seconds, min(self.timeout_ceiling_seconds, adaptive))
+
+    @asynccontextmanager
+    async def guard(self, endpoint: str = DEFAULT_ENDPOINT) -> AsyncIterator[None]:
+        if not self.allow_request():
+            raise CircuitOpenError(self.name)
+        started_at = time.monotonic()
+        timeout_seconds = self.timeout_seconds(endpoint)
+        budget = remaining_budget()
+        # The turn deadline may shorten an attempt, but never below the floor: a turn that already spent
+        # its budget elsewhere still gets one fair try at a healthy upstream.
+        attempt_seconds = timeout_seconds
+        if budget is not None:
+            attempt_seconds = min(timeout_seconds, max(budget, self.timeout_floor_seconds))
+        cut_by_deadline = attempt_seconds < timeout_seconds
+        try:
+            async with asyncio.timeout(attempt_seconds):
+                yield
+        except asyncio.CancelledError:
+            self.record_abandoned()
+            raise
+        except TimeoutError as exc:
+            # Running out of the caller's turn budget says nothing about upstream health.
+            if cut_by_deadline:
+                self.record_abandoned()
+                raise DeadlineExceeded(self.name) from exc
+            self.record_failure()
+            raise
+        except Exception as exc:
+            if is_upstream_failure(exc):
+                self.record_failure()
+            else:
+                self.record_success(time.monotonic() - started_at, endpoint)
+            raise
+        self.record_success(time.monotonic() - started_at, endpoint)
+
+    def snapshot(self) -> dict[str, Any]:
+        self._trim(time.monotonic())
+        total = len(self._outcomes)
+        failures = sum(1 for _, ok in self._outcomes if not ok)
+        return {
+            "state": self.state,
+            "calls_in_window": total,
+            "failure_rate": round(failures / total, 3) if total else 0.0,
+            "rejected": self.rejected,
+            **self._latency_snapshot(DEFAULT_ENDPOINT),
+            "endpoints": {endpoint: self._latency_snapshot(endpoint) for endpoint in sorted(self._latencies)},
+        }
+
+    def _latency_snapshot(self, endpoint: str) -> dict[str, Any]:
+        p50 = self.latency_percentile(0.5, endpoint)
+        p95 = self.latency_percentile(0.95, endpoint)
+        return {
+            "latency_p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "latency_p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "timeout_seconds": round(self.timeout_seconds(endpoint), 3),
+        }
+
+    def _record(self, ok: bool) -> None:
+        now = time.monotonic()
+        self._outcomes.append((now, ok))
+        self._trim(now)
+
+    def _trim(self, now: float) -> None:
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            self._outcomes.popleft()
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._probe_in_flight = False
+
+    def _close(self) -> None:
+        self._state = CLOSED
+        self._outcomes.clear()
+        self._probe_in_flight = False
@@ -2,149 +2,77 @@ from __future__ import annotations
 
 from typing import Any
 
-from .models import MetricItem, NormalizedScoreResult, PolicyFlag, PolicyToolResult, WarningItem
+from .cache import TTLCache
+from .config import settings
+from .models import MetricItem, NormalizedScoreResult, PolicyToolResult, PrecomputedScore, WarningItem
+from .policy import CompiledRuleset, get_ruleset
+from .product_store import get_product_store
+from .records import ProductRecord
 
-WARNING_COLORANTS = {"e102", "e104", "e110", "e122", "e124", "e129"}
-NOT_AUTHORIZED_FOOD = {"e171"}
-
-
-def _to_float(value: Any, default: float = 0.0) -> float:
-    try:
-        if value is None:
-            return default
-        return float(value)
-    except (TypeError, ValueError):
-        return default
+# Results are pure functions of their inputs, so entries never go stale; the TTL only bounds idle memory.
+_score_memo: TTLCache[tuple[PolicyToolResult, NormalizedScoreResult]] = TTLCache(
+    max_entries=settings.score_memo_max_entries,
+    max_bytes=settings.cache_max_bytes // 8,
+)
 
 
 def evaluate_ingredients_regulatory(
     domain: str,
     ingredients_or_additives: list[str],
     policy_version: str = "v1",
+    ruleset: CompiledRuleset | None = None,
 ) -> PolicyToolResult:
-    normalized = {item.lower().strip() for item in ingredients_or_additives if item}
-    flags: list[PolicyFlag] = []
-
-    if domain == "food":
-        if normalized.intersection(NOT_AUTHORIZED_FOOD):
-            flags.append(
-                PolicyFlag(
-                    category="not_authorized",
-                    severity="critical",
-                    message_short="E171 is not authorized in EU food context.",
-                    policy_citation="EU food additive framework (E171 status)",
-                )
-            )
-
-        if normalized.intersection(WARNING_COLORANTS):
-            flags.append(
-                PolicyFlag(
-                    category="warning_required",
-                    severity="high",
-                    message_short="Contains colorants that can require warning labeling.",
-                    policy_citation="EU warning-colorants list",
-                )
-            )
-
-        if any("nitrite" in item or "e250" in item or "e249" in item for item in normalized):
-            flags.append(
-                PolicyFlag(
-                    category="restricted",
-                    severity="medium",
-                    message_short="Nitrite preservative present; monitor intake frequency.",
-                    policy_citation="EFSA nitrite context",
-                )
-            )
-    else:
-        if any("limonene" in item or "linalool" in item for item in normalized):
-            flags.append(
-                PolicyFlag(
-                    category="warning_required",
-                    severity="medium",
-                    message_short="Fragrance allergens detected.",
-                    policy_citation="EU cosmetics allergen labeling",
-                )
-            )
-
-        if any("sodium laureth sulfate" in item or "sodium lauryl sulfate" in item for item in normalized):
-            flags.append(
-                PolicyFlag(
-                    category="restricted",
-                    severity="medium",
-                    message_short="Strong surfactant may irritate sensitive skin.",
-                    policy_citation="EU cosmetics irritation guidance",
-                )
-            )
-
-        if any("formaldehyde" in item for item in normalized):
-            flags.append(
-                PolicyFlag(
-                    category="warning_required",
-                    severity="high",
-                    message_short="Formaldehyde-related ingredient requires conservative handling.",
-                    policy_citation="EU formaldehyde labeling update",
-                )
-            )
-
-        if any("polyethylene" in item or "acrylates" in item for item in normalized):
-            flags.append(
-                PolicyFlag(
-                    category="restricted",
-                    severity="medium",
-                    message_short="Potential microplastics signal found.",
-                    policy_citation="EU microplastics restriction",
-                )
-            )
-
-    if not flags:
-        flags.append(
-            PolicyFlag(
-                category="uncertain",
-                severity="low",
-                message_short="No strong regulatory markers found from current fields.",
-                policy_citation="Internal conservative fallback",
-            )
-        )
-
+    ruleset = ruleset or get_ruleset(policy_version)
+    flags = ruleset.evaluate(domain, ingredients_or_additives)
     uncertainty_markers = ["source_fields_incomplete"] if any(flag.category == "uncertain" for flag in flags) else []
     return PolicyToolResult(flags=flags, policy_version=policy_version, uncertainty_markers=uncertainty_markers)
 
 
+BAND_THRESHOLDS = ((80, "red"), (60, "orange"), (35, "amber"))
+GRADE_THRESHOLDS = ((80, "A"), (65, "B"), (50, "C"), (35, "D"))
+FOOD_SEVERITY_PENALTIES = {"critical": 24, "high": 16, "medium": 8}
+BEAUTY_SEVERITY_PENALTIES = {"critical": 25, "high": 18, "medium": 10}
+
+
 def _band(score: int, reverse: bool = False) -> str:
     effective = 100 - score if reverse else score
-    if effective >= 80:
-        return "red"
-    if effective >= 60:
-        return "orange"
-    if effective >= 35:
-        return "amber"
+    for threshold, band in BAND_THRESHOLDS:
+        if effective >= threshold:
+            return band
     return "green"
 
 
 def _grade(score: float) -> str:
-    if score >= 80:
-        return "A"
-    if score >= 65:
-        return "B"
-    if score >= 50:
-        return "C"
-    if score >= 35:
-        return "D"
+    for threshold, grade in GRADE_THRESHOLDS:
+        if score >= threshold:
+            return grade
     return "E"
 
 
-def normalize_and_score(product_payload: dict[str, Any], policy_result: PolicyToolResult, domain: str) -> NormalizedScoreResult:
+def policy_penalty(policy_result: PolicyToolResult, domain: str) -> int:
+    if domain == "food":
+        penalties, default = FOOD_SEVERITY_PENALTIES, 3
+    else:
+        penalties, default = BEAUTY_SEVERITY_PENALTIES, 4
+    return sum(penalties.get(flag.severity, default) for flag in policy_result.flags)
+
+
+def normalize_and_score(
+    product_payload: ProductRecord | dict[str, Any],
+    policy_result: PolicyToolResult,
+    domain: str,
+) -> NormalizedScoreResult:
+    record = product_payload if isinstance(product_payload, ProductRecord) else ProductRecord.from_payload(product_payload)
     warnings = [
         WarningItem(category=flag.category, severity=flag.severity, label=flag.message_short)
         for flag in policy_result.flags[:3]
     ]
 
     if domain == "food":
-        nutriments = product_payload.get("nutriments") or {}
-        sugar = _to_float(nutriments.get("sugars_100g"), 0.0)
-        salt = _to_float(nutriments.get("salt_100g"), 0.0)
-        sat_fat = _to_float(nutriments.get("saturated-fat_100g"), 0.0)
-        protein = _to_float(nutriments.get("proteins_100g"), 0.0)
+        sugar = record.nutrient("sugars_100g")
+        salt = record.nutrient("salt_100g")
+        sat_fat = record.nutrient("saturated-fat_100g")
+        protein = record.nutrient("proteins_100g")
 
         sugar_score = min(100, int((sugar / 22.5) * 100))
         salt_score = min(100, int((salt / 1.5) * 100))
@@ -152,18 +80,8 @@ def normalize_and_score(product_payload: dict[str, Any], policy_result: PolicyTo
         protein_score = min(100, int((protein / 12.0) * 100))
 
         nutrition_component = max(0, 100 - int((sugar_score * 0.45) + (salt_score * 0.25) + (sat_fat_score * 0.3)))
-        policy_penalty = 0
-        for flag in policy_result.flags:
-            if flag.severity == "critical":
-                policy_penalty += 24
-            elif flag.severity == "high":
-                policy_penalty += 16
-            elif flag.severity == "medium":
-                policy_penalty += 8
-            else:
-                policy_penalty += 3
-
-        total_score = max(0, min(100, nutrition_component - policy_penalty + int(protein_score * 0.1)))
+        penalty = policy_penalty(policy_result, domain)
+        total_score = max(0, min(100, nutrition_component - penalty + int(protein_score * 0.1)))
         grade = _grade(total_score)
 
         verdict_de = (
@@ -198,22 +116,11 @@ def normalize_and_score(product_payload: dict[str, Any], policy_result: PolicyTo
             warnings=warnings,
             metrics=metrics,
             explanation_bullets=bullets,
-            data_sources=["Open Food Facts", "Policy ruleset v1"],
+            data_sources=["Open Food Facts", f"Policy ruleset {policy_result.policy_version}"],
         )
 
-    ingredients_text = (product_payload.get("ingredients_text") or "").lower()
-    severity_penalty = 0
-    for flag in policy_result.flags:
-        if flag.severity == "critical":
-            severity_penalty += 25
-        elif flag.severity == "high":
-            severity_penalty += 18
-        elif flag.severity == "medium":
-            severity_penalty += 10
-        else:
-            severity_penalty += 4
-
-    base_safety = max(0, 86 - severity_penalty)
+    ingredients_text = record.ingredients_text_lower
+    base_safety = max(0, 86 - policy_penalty(policy_result, domain))
     tier = _grade(base_safety)
 
     sensitizer = 70 if ("limonene" in ingredients_text or "linalool" in ingredients_text) else 25
@@ -253,5 +160,69 @@ def normalize_and_score(product_payload: dict[str, Any], policy_result: PolicyTo
         warnings=warnings,
         metrics=metrics,
         explanation_bullets=bullets,
-        data_sources=["Open Beauty Facts", "EU 1223/2009 mapping", "Policy ruleset v1"],
+        data_sources=["Open Beauty Facts", "EU 1223/2009 mapping", f"Policy ruleset {policy_result.policy_version}"],
+    )
+
+
+def evaluate_and_score(
+    record: ProductRecord,
+    domain: str,
+    policy_version: str = "v1",
+) -> tuple[PolicyToolResult, NormalizedScoreResult]:
+    # Resolve the ruleset once so a reload mid-call cannot mix two rule versions in one result.
+    ruleset = get_ruleset(policy_version)
+    # Callers share the memoized models and must treat them as read-only.
+    key = f"{policy_version}:{ruleset.digest}:{domain}:{record.fingerprint()}"
+    cached = _score_memo.get(key)
+    if cached is not None:
+        return cached
+    result = _precomputed_score(record, domain, policy_version, ruleset) or compute_score(
+        record, domain, policy_version, ruleset
+    )
+    _score_memo.set(key, result, ttl_seconds=settings.score_memo_ttl_seconds)
+    return result
+
+
+def compute_score(
+    record: ProductRecord,
+    domain: str,
+    policy_version: str,
+    ruleset: CompiledRuleset | None = None,
+) -> tuple[PolicyToolResult, NormalizedScoreResult]:
+    policy_result = evaluate_ingredients_regulatory(
+        domain=domain,
+        ingredients_or_additives=list(record.policy_tokens),
+        policy_version=policy_version,
+        ruleset=ruleset,
     )
+    normalized = normalize_and_score(product_payload=record, policy_result=policy_result, domain=domain)
+    return policy_result, normalized
+
+
+def _precomputed_score(
+    record: ProductRecord,
+    domain: str,
+    policy_version: str,
+    ruleset: CompiledRuleset | None = None,
+) -> tuple[PolicyToolResult, NormalizedScoreResult] | None:
+    store = get_product_store()
+    if store is None or not record.code:
+        return None
+    digest = (ruleset or get_ruleset(policy_version)).digest
+    row = store.get_score(domain, record.code, policy_version, digest)
+    # A fingerprint mismatch means the product changed upstream since the store was built.
+    if row is None or row[0] != record.fingerprint():
+        return None
+    try:
+        stored = PrecomputedScore.model_validate_json(row[1])
+    except ValueError:
+        return None
+    return stored.policy, stored.score
+
+
+def invalidate_policy_scores(policy_versions: list[str]) -> int:
+    return sum(_score_memo.pop_prefix(f"{policy_version}:") for policy_version in policy_versions)
+
+
+def score_memo_stats() -> dict[str, int]:
+    return _score_memo.snapshot()
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Protocol, TypeVar
+
+from pydantic import BaseModel
+
+from .config import settings
+
+try:
+    import redis.asyncio as redis_asyncio
+except Exception:  # pragma: no cover - optional runtime dependency branch
+    redis_asyncio = None
+
+logger = logging.getLogger("nutrivision")
+M = TypeVar("M", bound=BaseModel)
+
+
+class SharedCacheBackend(Protocol):
+    # get() returns the value together with its remaining TTL in seconds.
+    async def get(self, key: str) -> tuple[bytes, float] | None: ...
+
+    async def set(self, key: str, value: bytes, ttl_seconds: int) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+class InMemoryBackend:
+    def __init__(self) -> None:
+        self._values: dict[str, tuple[float, bytes]] = {}
+
+    async def get(self, key: str) -> tuple[bytes, float] | None:
+        stored = self._values.get(key)
+        if stored is None:
+            return None
+        expires_at, value = stored
+        remaining = expires_at - time.monotonic()
+        if remaining <= 0:
+            self._values.pop(key, None)
+            return None
+        return value, remaining
+
+    async def set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        self._values[key] = (time.monotonic() + ttl_seconds, value)
+
+    async def close(self) -> None:
+        self._values.clear()
+
+
+class RedisBackend:
+    def __init__(self, url: str, *, max_connections: int, timeout_seconds: float) -> None:
+        if redis_asyncio is None:
+            raise RuntimeError("redis package is not installed")
+        self._pool = redis_asyncio.ConnectionPool.from_url(
+            url,
+            max_connections=max_connections,
+            socket_timeout=timeout_seconds,
+            socket_connect_timeout=timeout_seconds,
+        )
+        self._client = redis_asyncio.Redis(connection_pool=self._pool)
+
+    async def get(self, key: str) -> tuple[bytes, float] | None:
+        # GET and PTTL share one round trip; the remaining TTL is how callers recover the entry's age.
+        async with self._client.pipeline(transaction=False) as pipe:
+            value, ttl_ms = await pipe.get(key).pttl(key).execute()
+        if value is None:
+            return None
+        return value, max(0.0, ttl_ms / 1000.0)
+
+    async def set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        await self._client.set(key, value, ex=ttl_seconds)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+        await self._pool.disconnect()
+
+
+class SharedCache:
+    def __init__(
+        self,
+        backend: SharedCacheBackend,
+        *,
+        key_prefix: str,
+        ttl_seconds: int,
+        timeout_seconds: float,
+        retry_after_seconds: float,
+    ) -> None:
+        self.backend = backend
+        self.key_prefix = key_prefix
+        self.ttl_seconds = ttl_seconds
+        self.timeout_seconds = timeout_seconds
+        self.retry_after_seconds = retry_after_seconds
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._skip_until = 0.0
+
+    async def get_entry(self, key: str, model: type[M]) -> tuple[M, float] | None:
+        # Returns the value with its age: every entry is written with ttl_seconds, so age is what has run down.
+        if self._backing_off():
+            return None
+        try:
+            async with asyncio.timeout(self.timeout_seconds):
+                stored = await self.backend.get(self.key_prefix + key)
+        except Exception:
+            self._record_failure()
+            return None
+        if stored is None:
+            self.misses += 1
+            return None
+        raw, ttl_remaining = stored
+        try:
+            value = model.model_validate_json(raw)
+        except Exception:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value, max(0.0, self.ttl_seconds - ttl_remaining)
+
+    async def set_model(self, key: str, value: BaseModel) -> None:
+        if self._backing_off():
+            return
+        try:
+            async with asyncio.timeout(self.timeout_seconds):
+                await self.backend.set(
+                    self.key_prefix + key, value.model_dump_json().encode("utf-8"), self.ttl_seconds
+                )
+        except Exception:
+            self._record_failure()
+
+    def snapshot(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "available": int(not self._backing_off()),
+        }
+
+    def _backing_off(self) -> bool:
+        return time.monotonic() < self._skip_until
+
+    def _record_failure(self) -> None:
+        # Fail open: while the backend is unhealthy, skip it instead of paying the timeout per lookup.
+        self.errors += 1
+        self._skip_until = time.monotonic() + self.retry_after_seconds
+        logger.warning("Shared product cache unavailable; serving from local cache only")
+
+
+_shared_cache: SharedCache | None = None
+
+
+def get_shared_cache() -> SharedCache | None:
+    return _shared_cache
+
+
+async def start_shared_cache(backend: SharedCacheBackend | None = None) -> SharedCache | None:
+    global _shared_cache
+    if backend is None:
+        if not settings.redis_url:
+            return None
+        if redis_asyncio is None:
+            logger.warning("REDIS_URL is set but the redis package is not installed; shared cache disabled")
+            return None
+        backend = RedisBackend(
+            settings.redis_url,
+            max_connections=settings.redis_max_connections,
+            timeout_seconds=settings.redis_timeout_seconds,
+        )
+    _shared_cache = SharedCache(
+        backend,
+        key_prefix=settings.shared_cache_key_prefix,
+        # Nothing may be served past ttl + stale, so there is no point keeping it in Redis any longer.
+        ttl_seconds=min(
+            settings.shared_cache_ttl_seconds,
+            settings.cache_ttl_seconds + settings.cache_stale_ttl_seconds,
+        ),
+        timeout_seconds=settings.redis_timeout_seconds,
+        retry_after_seconds=settings.redis_retry_after_seconds,
+    )
+    return _shared_cache
+
+
+async def close_shared_cache() -> None:
+    global _shared_cache
+    shared = _shared_cache
+    _shared_cache = None
+    if shared is None:
+        return
+    try:
+        await shared.backend.close()
+    except Exception:
+        logger.debug("Shared cache backend close failed", exc_info=True)
@@ -1,13 +1,30 @@
 from __future__ import annotations
 
+import asyncio
 import re
 import time
-from typing import Any, TypeVar
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, TypeVar
 
 import httpx
 
+from .cache import SingleFlight, TTLCache
 from .config import settings
+from .disk_cache import get_disk_cache
+from .fastjson import decode_response
 from .models import BarcodeToolResult, SearchCandidate, SearchToolResult
+from .product_store import get_product_store
+from .ratelimit import BACKGROUND, RateLimitExceeded, TokenBucketLimiter, set_request_priority
+from .records import ProductRecord
+from .resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceeded,
+    remaining_budget,
+    retry_transient,
+    set_turn_deadline,
+)
+from .shared_cache import get_shared_cache
 
 FOOD_FIELDS = (
     "code,product_name,brands,nutriments,nutriscore_grade,nova_group,ecoscore_grade,"
@@ -16,30 +33,297 @@ FOOD_FIELDS = (
 
 BEAUTY_FIELDS = "code,product_name,brands,ingredients_text,ingredients_tags,labels_tags"
 
-_barcode_cache: dict[str, tuple[float, BarcodeToolResult]] = {}
-_search_cache: dict[str, tuple[float, SearchToolResult]] = {}
+# Search results only feed candidate ids and names, so do not pull whole product documents.
+SEARCH_FIELDS = "code,product_name,product_name_de"
+
+OFF_BASE_URL = "https://world.openfoodfacts.org"
+OBF_BASE_URL = "https://world.openbeautyfacts.org"
+
+_barcode_cache: TTLCache[BarcodeToolResult] = TTLCache(
+    max_entries=settings.cache_max_entries,
+    max_bytes=settings.cache_max_bytes,
+    sweep_interval_seconds=settings.cache_sweep_interval_seconds,
+    refresh_beta=settings.cache_refresh_beta,
+)
+_search_cache: TTLCache[SearchToolResult] = TTLCache(
+    max_entries=settings.cache_max_entries,
+    max_bytes=settings.cache_max_bytes // 4,
+    sweep_interval_seconds=settings.cache_sweep_interval_seconds,
+    refresh_beta=settings.cache_refresh_beta,
+)
+_negative_cache: TTLCache[str] = TTLCache(
+    max_entries=settings.cache_max_entries,
+    max_bytes=settings.cache_max_bytes // 16,
+    sweep_interval_seconds=settings.cache_sweep_interval_seconds,
+)
+_barcode_flights: SingleFlight[BarcodeToolResult] = SingleFlight()
+_search_flights: SingleFlight[SearchToolResult] = SingleFlight()
+_http_clients: dict[str, httpx.AsyncClient] = {}
+_breakers: dict[str, CircuitBreaker] = {}
+_rate_limiters: dict[tuple[str, str], TokenBucketLimiter] = {}
+_background_tasks: set[asyncio.Task[Any]] = set()
 T = TypeVar("T")
+R = TypeVar("R", BarcodeToolResult, SearchToolResult)
+
+NEGATIVE_NOT_FOUND = "not_found"
+NEGATIVE_UPSTREAM_ERROR = "upstream_error"
 
 
 def _base_url(domain: str) -> str:
     if domain == "beauty":
-        return "https://world.openbeautyfacts.org"
-    return "https://world.openfoodfacts.org"
+        return OBF_BASE_URL
+    return OFF_BASE_URL
+
+
+def _breaker(domain: str) -> CircuitBreaker:
+    base_url = _base_url(domain)
+    breaker = _breakers.get(base_url)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            base_url,
+            failure_rate_threshold=settings.breaker_failure_rate_threshold,
+            min_calls=settings.breaker_min_calls,
+            window_seconds=settings.breaker_window_seconds,
+            open_seconds=settings.breaker_open_seconds,
+            timeout_floor_seconds=settings.adaptive_timeout_min_seconds,
+            timeout_ceiling_seconds=settings.request_timeout_seconds,
+            timeout_multiplier=settings.adaptive_timeout_multiplier,
+        )
+        _breakers[base_url] = breaker
+    return breaker
+
+
+def _rate_limiter(domain: str, endpoint: str) -> TokenBucketLimiter:
+    # OFF limits each endpoint class separately, and search.pl far more tightly than product reads.
+    key = (_base_url(domain), endpoint)
+    limiter = _rate_limiters.get(key)
+    if limiter is None:
+        if endpoint == "search":
+            rate_per_minute, burst = settings.off_search_rate_per_minute, settings.off_search_burst
+        else:
+            rate_per_minute, burst = settings.off_product_rate_per_minute, settings.off_product_burst
+        limiter = TokenBucketLimiter(
+            f"{key[0]} {endpoint}",
+            rate_per_second=rate_per_minute / 60.0,
+            burst=burst,
+            max_wait_seconds=settings.off_rate_limit_max_wait_seconds,
+        )
+        _rate_limiters[key] = limiter
+    return limiter
+
+
+def upstream_stats() -> dict[str, dict[str, Any]]:
+    return {base_url: breaker.snapshot() for base_url, breaker in _breakers.items()}
+
+
+def rate_limit_stats() -> dict[str, dict[str, Any]]:
+    return {limiter.name: limiter.snapshot() for limiter in _rate_limiters.values()}
+
+
+def _build_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=settings.request_timeout_seconds,
+        http2=settings.off_http2,
+        limits=httpx.Limits(
+            max_connections=settings.off_max_connections,
+            max_keepalive_connections=settings.off_max_keepalive_connections,
+            keepalive_expiry=settings.off_keepalive_expiry_seconds,
+        ),
+    )
+
+
+async def _preconnect(client: httpx.AsyncClient, base_url: str) -> None:
+    try:
+        await client.head(f"{base_url}/", headers={"User-Agent": settings.off_user_agent})
+    except Exception:
+        return
+
+
+async def start_http_clients() -> None:
+    for base_url in (OFF_BASE_URL, OBF_BASE_URL):
+        if base_url not in _http_clients:
+            _http_clients[base_url] = _build_http_client()
+    if settings.off_preconnect_on_startup:
+        await asyncio.gather(*(_preconnect(client, base_url) for base_url, client in _http_clients.items()))
+
+
+async def close_http_clients() -> None:
+    clients = list(_http_clients.values())
+    _http_clients.clear()
+    await asyncio.gather(*(client.aclose() for client in clients), return_exceptions=True)
+
+
+@asynccontextmanager
+async def _upstream_client(domain: str) -> AsyncIterator[httpx.AsyncClient]:
+    shared = _http_clients.get(_base_url(domain))
+    if shared is not None and not shared.is_closed:
+        yield shared
+        return
+    # Outside the app lifespan (scripts, tests) fall back to a short-lived client.
+    async with httpx.AsyncClient(timeout=settings.request_timeout_seconds) as client:
+        yield client
+
+
+async def _get_product_json(
+    domain: str,
+    url: str,
+    *,
+    params: dict[str, Any],
+    headers: dict[str, str],
+    endpoint: str = "product",
+) -> dict[str, Any]:
+    breaker = _breaker(domain)
+    limiter = _rate_limiter(domain, endpoint)
+
+    async def attempt() -> dict[str, Any]:
+        await limiter.acquire()
+        async with breaker.guard(endpoint):
+            async with _upstream_client(domain) as client:
+                response = await client.get(url, params=params, headers=headers)
+                response.raise_for_status()
+                return decode_response(response)
+
+    return await retry_transient(
+        attempt,
+        attempts=settings.upstream_retry_attempts,
+        base_delay_seconds=settings.upstream_retry_base_delay_seconds,
+        max_delay_seconds=settings.upstream_retry_max_delay_seconds,
+        min_budget_seconds=settings.upstream_retry_min_budget_seconds,
+    )
+
+
+def _cache_set(cache: TTLCache[T], key: str, value: T, compute_seconds: float = 0.0, age_seconds: float = 0.0) -> None:
+    # Values restored from a lower tier keep their age, so ttl + stale stays a hard bound on staleness.
+    hard_ttl_seconds = settings.cache_ttl_seconds + settings.cache_stale_ttl_seconds - age_seconds
+    if hard_ttl_seconds <= 0:
+        return
+    fresh_seconds = max(0.0, settings.cache_ttl_seconds - age_seconds)
+    cache.set(
+        key,
+        value,
+        ttl_seconds=fresh_seconds,
+        stale_seconds=hard_ttl_seconds - fresh_seconds,
+        compute_seconds=compute_seconds,
+    )
+
+
+def _background_done(task: asyncio.Task[Any]) -> None:
+    _background_tasks.discard(task)
+    if not task.cancelled():
+        task.exception()
+
+
+def _schedule_refresh(flights: SingleFlight[T], key: str, factory: Callable[[], Awaitable[T]]) -> None:
+    # Stale-while-revalidate: the caller keeps the cached value, a background task refreshes it.
+    if key in flights:
+        return
+
+    async def refresh() -> T:
+        # The refresh outlives the turn that noticed the stale entry, so it must not inherit that turn's deadline.
+        set_request_priority(BACKGROUND)
+        set_turn_deadline(None)
+        return await asyncio.shield(_start_flight(flights, key, factory))
 
+    task = asyncio.ensure_future(refresh())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_done)
 
-def _cache_get(cache: dict[str, tuple[float, T]], key: str) -> T | None:
-    cached = cache.get(key)
-    if not cached:
+
+async def _detached(factory: Callable[[], Awaitable[T]]) -> T:
+    # Shared work serves every caller that joins it, so it must not inherit the starter's turn deadline.
+    set_turn_deadline(None)
+    return await factory()
+
+
+def _start_flight(flights: SingleFlight[T], key: str, factory: Callable[[], Awaitable[T]]) -> asyncio.Task[T]:
+    return flights.start(key, lambda: _detached(factory))
+
+
+async def _await_flight(task: asyncio.Task[T], fallback: T) -> T:
+    # Each caller bounds only its own wait by its turn budget; the flight keeps going and fills the cache.
+    budget = remaining_budget()
+    if budget is None:
+        return await asyncio.shield(task)
+    done, _ = await asyncio.wait({task}, timeout=max(budget, settings.adaptive_timeout_min_seconds))
+    return task.result() if done else fallback
+
+
+async def _shared_cache_get(key: str, model: type[R]) -> tuple[R, float] | None:
+    # Returns the value and its age in seconds, so promoting it into a faster tier cannot make it fresher.
+    disk = get_disk_cache()
+    if disk is not None:
+        entry = await disk.get_entry(key, model)
+        if entry is not None:
+            return entry
+    shared = get_shared_cache()
+    if shared is None:
         return None
-    expires_at, value = cached
-    if expires_at < time.time():
-        cache.pop(key, None)
+    entry = await shared.get_entry(key, model)
+    if entry is None:
         return None
-    return value
+    if disk is not None:
+        disk.set_model(key, entry[0], age_seconds=entry[1])
+    return entry
+
+
+async def _shared_cache_set(key: str, value: BarcodeToolResult | SearchToolResult) -> None:
+    disk = get_disk_cache()
+    if disk is not None:
+        disk.set_model(key, value)
+    shared = get_shared_cache()
+    if shared is None:
+        return
+    await shared.set_model(key, value)
+
+
+async def restore_from_disk_cache(limit: int | None = None) -> int:
+    # Rehydrate L1 with the most recently written entries so a restart does not start cold.
+    disk = get_disk_cache()
+    if disk is None:
+        return 0
+    limit = settings.disk_cache_restore_entries if limit is None else limit
+    rows = await asyncio.to_thread(disk.read_recent, limit)
+    restored = 0
+    for key, payload, age_seconds in reversed(rows):
+        kind, _, cache_key = key.partition(":")
+        try:
+            if kind == "barcode":
+                cache, value = _barcode_cache, BarcodeToolResult.model_validate_json(payload)
+            elif kind == "search":
+                cache, value = _search_cache, SearchToolResult.model_validate_json(payload)
+            else:
+                continue
+        except ValueError:
+            continue
+        _cache_set(cache, cache_key, value, age_seconds=age_seconds)
+        restored += 1
+    return restored
 
 
-def _cache_set(cache: dict[str, tuple[float, T]], key: str, value: T) -> None:
-    cache[key] = (time.time() + settings.cache_ttl_seconds, value)
+def _negative_cache_set(key: str, reason: str) -> None:
+    # Upstream errors are remembered much more briefly than genuine "not found" answers.
+    ttl_seconds = (
+        settings.negative_cache_ttl_seconds
+        if reason == NEGATIVE_NOT_FOUND
+        else settings.negative_cache_error_ttl_seconds
+    )
+    if ttl_seconds > 0:
+        _negative_cache.set(key, reason, ttl_seconds=ttl_seconds)
+
+
+def cache_stats() -> dict[str, dict[str, int]]:
+    stats = {
+        "barcode": _barcode_cache.snapshot(),
+        "search": _search_cache.snapshot(),
+        "negative": _negative_cache.snapshot(),
+    }
+    shared = get_shared_cache()
+    if shared is not None:
+        stats["shared"] = shared.snapshot()
+    disk = get_disk_cache()
+    if disk is not None:
+        stats["disk"] = disk.snapshot()
+    return stats
 
 
 def _dedupe_nonempty(values: list[str]) -> list[str]:
@@ -97,6 +381,135 @@ def _search_locale_variants(locale_country: str, locale_language: str) -> list[t
     return deduped
 
 
+async def _first_nonempty_by_priority(
+    attempts: list[Callable[[], Awaitable[list[T]]]],
+    *,
+    max_in_flight: int,
+    hedge_delay: float,
+) -> list[T]:
+    # Attempts are ordered by priority. The next one is started when an in-flight attempt
+    # comes back or the hedge delay elapses, and the first non-empty result in priority
+    # order wins; anything still running is cancelled.
+    max_in_flight = max(1, max_in_flight)
+    tasks: list[asyncio.Task[list[T]]] = []
+    head = 0
+    launch_next = True
+    try:
+        while True:
+            while head < len(tasks) and tasks[head].done():
+                result = tasks[head].result()
+                if result:
+                    return result
+                head += 1
+            if head >= len(attempts):
+                return []
+
+            pending = [task for task in tasks[head:] if not task.done()]
+            has_fallback = any(task.done() and task.result() for task in tasks[head:])
+            can_launch = len(tasks) < len(attempts) and len(pending) < max_in_flight and not has_fallback
+            if can_launch and (launch_next or not pending):
+                tasks.append(asyncio.create_task(attempts[len(tasks)]()))
+                launch_next = False
+                continue
+
+            await asyncio.wait(
+                pending,
+                timeout=hedge_delay if can_launch else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            launch_next = True
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _barcode_result(barcode: str, product: dict[str, Any]) -> BarcodeToolResult:
+    # Build the compact record once; the cached payload is its trimmed projection.
+    record = ProductRecord.from_payload(product)
+    result = BarcodeToolResult(
+        found=True,
+        product_id=barcode,
+        canonical_name=record.product_name or barcode,
+        confidence=0.95,
+        raw_payload_ref=record.to_payload(),
+    )
+    result._record = record
+    return result
+
+
+def _local_product_lookup(barcode: str, domain: str) -> BarcodeToolResult | None:
+    store = get_product_store()
+    if store is None:
+        return None
+    try:
+        product = store.get(domain, barcode)
+    except Exception:
+        return None
+    if not product:
+        return None
+    return _barcode_result(barcode, product)
+
+
+async def _local_catalog_search(query_text: str, domain: str, max_results: int) -> SearchToolResult | None:
+    store = get_product_store()
+    if store is None:
+        return None
+    try:
+        # A broad prefix query over a full dump can take a while; keep it off the event loop.
+        hits = await asyncio.to_thread(store.search, domain, query_text, max_results)
+    except Exception:
+        return None
+    # Weak local matches defer to OFF instead of shadowing it.
+    hits = [hit for hit in hits if hit[3] >= settings.local_search_min_match_ratio]
+    if not hits:
+        return None
+
+    top_relevance = hits[0][2]
+    candidates: list[SearchCandidate] = []
+    for index, (code, name, relevance, _) in enumerate(hits):
+        if top_relevance > 0:
+            confidence = max(0.35, 0.82 * (relevance / top_relevance))
+        else:
+            confidence = max(0.35, 0.82 - (index * 0.09))
+        candidates.append(SearchCandidate(id=code, name=name or "Unknown product", confidence=round(confidence, 4)))
+    return SearchToolResult(candidates=candidates, selected_candidate=candidates[0])
+
+
+def _cached_barcode_result(
+    *,
+    barcode: str,
+    domain: str,
+    locale_country: str,
+    locale_language: str,
+    cache_key: str,
+) -> BarcodeToolResult | None:
+    cached, needs_refresh = _barcode_cache.lookup(cache_key)
+    if cached is not None:
+        if needs_refresh:
+            _schedule_refresh(
+                _barcode_flights,
+                cache_key,
+                lambda: _fetch_product_by_barcode(
+                    barcode=barcode,
+                    domain=domain,
+                    locale_country=locale_country,
+                    locale_language=locale_language,
+                    cache_key=cache_key,
+                    refresh=True,
+                ),
+            )
+        return cached
+    local_hit = _local_product_lookup(barcode, domain)
+    if local_hit is not None:
+        return local_hit
+    if _negative_cache.get(f"barcode:{cache_key}") is not None:
+        return BarcodeToolResult(found=False)
+    return None
+
+
 async def get_product_by_barcode(
     barcode: str,
     domain: str,
@@ -108,37 +521,207 @@ async def get_product_by_barcode(
         return BarcodeToolResult(found=False)
 
     cache_key = f"{domain}:{locale_country}:{locale_language}:{barcode}"
-    cached = _cache_get(_barcode_cache, cache_key)
+    cached = _cached_barcode_result(
+        barcode=barcode,
+        domain=domain,
+        locale_country=locale_country,
+        locale_language=locale_language,
+        cache_key=cache_key,
+    )
     if cached is not None:
         return cached
 
+    flight = _start_flight(
+        _barcode_flights,
+        cache_key,
+        lambda: _fetch_product_by_barcode(
+            barcode=barcode,
+            domain=domain,
+            locale_country=locale_country,
+            locale_language=locale_language,
+            cache_key=cache_key,
+        ),
+    )
+    return await _await_flight(flight, BarcodeToolResult(found=False))
+
+
+async def get_products_by_barcodes(
+    barcodes: list[str],
+    domain: str,
+    locale_country: str,
+    locale_language: str,
+) -> list[BarcodeToolResult]:
+    codes = [str(barcode or "").strip() for barcode in barcodes]
+    key_prefix = f"{domain}:{locale_country}:{locale_language}:"
+    resolved: dict[str, BarcodeToolResult] = {}
+    misses: list[str] = []
+    for barcode in dict.fromkeys(code for code in codes if code):
+        cached = _cached_barcode_result(
+            barcode=barcode,
+            domain=domain,
+            locale_country=locale_country,
+            locale_language=locale_language,
+            cache_key=key_prefix + barcode,
+        )
+        if cached is not None:
+            resolved[barcode] = cached
+        else:
+            misses.append(barcode)
+
+    # The disk and shared tiers are checked for every miss at once, before anything goes upstream.
+    shared_hits = await asyncio.gather(
+        *(_shared_cache_get(f"barcode:{key_prefix}{barcode}", BarcodeToolResult) for barcode in misses)
+    )
+    flights: dict[str, asyncio.Task[BarcodeToolResult]] = {}
+    to_fetch: list[str] = []
+    for barcode, shared_hit in zip(misses, shared_hits):
+        cache_key = key_prefix + barcode
+        if shared_hit is not None:
+            value, age_seconds = shared_hit
+            _cache_set(_barcode_cache, cache_key, value, age_seconds=age_seconds)
+            resolved[barcode] = value
+        elif cache_key in _barcode_flights:
+            # Someone is already fetching this code; join that flight instead of refetching.
+            flights[barcode] = _start_flight(
+                _barcode_flights,
+                cache_key,
+                lambda barcode=barcode, cache_key=cache_key: _fetch_product_by_barcode(
+                    barcode=barcode,
+                    domain=domain,
+                    locale_country=locale_country,
+                    locale_language=locale_language,
+                    cache_key=cache_key,
+                ),
+            )
+        else:
+            to_fetch.append(barcode)
+
+    chunk_size = max(1, settings.off_batch_max_codes)
+    semaphore = asyncio.Semaphore(max(1, settings.off_batch_max_in_flight))
+
+    async def fetch_chunk(chunk: list[str]) -> dict[str, BarcodeToolResult]:
+        async with semaphore:
+            return await _fetch_products_batch(
+                chunk,
+                domain=domain,
+                locale_country=locale_country,
+                locale_language=locale_language,
+            )
+
+    async def from_chunk(chunk_task: asyncio.Task[dict[str, BarcodeToolResult]], barcode: str) -> BarcodeToolResult:
+        return (await chunk_task).get(barcode) or BarcodeToolResult(found=False)
+
+    for start in range(0, len(to_fetch), chunk_size):
+        chunk = to_fetch[start : start + chunk_size]
+        chunk_task = asyncio.ensure_future(_detached(lambda chunk=chunk: fetch_chunk(chunk)))
+        for barcode in chunk:
+            # Each code gets its own flight, so single lookups and overlapping batches join the chunk.
+            flights[barcode] = _barcode_flights.start(
+                key_prefix + barcode,
+                lambda chunk_task=chunk_task, barcode=barcode: from_chunk(chunk_task, barcode),
+            )
+
+    if flights:
+        results = await asyncio.gather(
+            *(_await_flight(task, BarcodeToolResult(found=False)) for task in flights.values())
+        )
+        resolved.update(zip(flights, results))
+    return [resolved.get(code) or BarcodeToolResult(found=False) for code in codes]
+
+
+async def _fetch_products_batch(
+    barcodes: list[str],
+    *,
+    domain: str,
+    locale_country: str,
+    locale_language: str,
+) -> dict[str, BarcodeToolResult]:
+    # OFF's search API accepts a comma-separated code list, so one request resolves a whole chunk. OFF counts
+    # it against the search quota, so it is charged to the search limiter, not the product one.
+    fields = BEAUTY_FIELDS if domain == "beauty" else FOOD_FIELDS
+    url = f"{_base_url(domain)}/api/v2/search"
+    params = {
+        "code": ",".join(barcodes),
+        "cc": locale_country,
+        "lc": locale_language,
+        "fields": fields,
+        "page_size": str(len(barcodes)),
+    }
+    headers = {"User-Agent": settings.off_user_agent}
+    key_prefix = f"{domain}:{locale_country}:{locale_language}:"
+
+    started_at = time.monotonic()
+    try:
+        payload = await _get_product_json(domain, url, params=params, headers=headers, endpoint="search")
+    except (CircuitOpenError, RateLimitExceeded, DeadlineExceeded):
+        return {}
+    except Exception:
+        for barcode in barcodes:
+            _negative_cache_set(f"barcode:{key_prefix}{barcode}", NEGATIVE_UPSTREAM_ERROR)
+        return {}
+
+    compute_seconds = (time.monotonic() - started_at) / max(1, len(barcodes))
+    wanted = set(barcodes)
+    results: dict[str, BarcodeToolResult] = {}
+    for product in payload.get("products") or []:
+        barcode = str(product.get("code") or "")
+        if barcode not in wanted or barcode in results:
+            continue
+        result = _barcode_result(barcode, product)
+        results[barcode] = result
+        _cache_set(_barcode_cache, key_prefix + barcode, result, compute_seconds=compute_seconds)
+        await _shared_cache_set(f"barcode:{key_prefix}{barcode}", result)
+    for barcode in wanted.difference(results):
+        _negative_cache_set(f"barcode:{key_prefix}{barcode}", NEGATIVE_NOT_FOUND)
+    return results
+
+
+async def _fetch_product_by_barcode(
+    *,
+    barcode: str,
+    domain: str,
+    locale_country: str,
+    locale_language: str,
+    cache_key: str,
+    refresh: bool = False,
+) -> BarcodeToolResult:
+    shared_key = f"barcode:{cache_key}"
+    if not refresh:
+        shared_hit = await _shared_cache_get(shared_key, BarcodeToolResult)
+        if shared_hit is not None:
+            value, age_seconds = shared_hit
+            _cache_set(_barcode_cache, cache_key, value, age_seconds=age_seconds)
+            return value
+
+    negative_key = f"barcode:{cache_key}"
     fields = BEAUTY_FIELDS if domain == "beauty" else FOOD_FIELDS
     url = f"{_base_url(domain)}/api/v2/product/{barcode}.json"
     params = {"cc": locale_country, "lc": locale_language, "fields": fields}
     headers = {"User-Agent": settings.off_user_agent}
 
+    started_at = time.monotonic()
     try:
-        async with httpx.AsyncClient(timeout=settings.request_timeout_seconds) as client:
-            response = await client.get(url, params=params, headers=headers)
-            response.raise_for_status()
-            payload = response.json()
+        payload = await _get_product_json(domain, url, params=params, headers=headers)
+    except (CircuitOpenError, RateLimitExceeded, DeadlineExceeded):
+        return BarcodeToolResult(found=False)
+    except httpx.HTTPStatusError as exc:
+        # OFF answers unknown barcodes with a 404 carrying status=0.
+        is_not_found = exc.response is not None and exc.response.status_code == 404
+        _negative_cache_set(negative_key, NEGATIVE_NOT_FOUND if is_not_found else NEGATIVE_UPSTREAM_ERROR)
+        return BarcodeToolResult(found=False)
     except Exception:
+        _negative_cache_set(negative_key, NEGATIVE_UPSTREAM_ERROR)
         return BarcodeToolResult(found=False)
 
     status = payload.get("status")
     product = payload.get("product") or {}
     if status != 1 or not product:
+        _negative_cache_set(negative_key, NEGATIVE_NOT_FOUND)
         return BarcodeToolResult(found=False)
 
-    name = product.get("product_name") or product.get("product_name_de") or barcode
-    result = BarcodeToolResult(
-        found=True,
-        product_id=barcode,
-        canonical_name=name,
-        confidence=0.95,
-        raw_payload_ref=product,
-    )
-    _cache_set(_barcode_cache, cache_key, result)
+    result = _barcode_result(barcode, product)
+    _cache_set(_barcode_cache, cache_key, result, compute_seconds=time.monotonic() - started_at)
+    await _shared_cache_set(shared_key, result)
     return result
 
 
@@ -154,45 +737,121 @@ async def search_product_catalog(
         return SearchToolResult(candidates=[], selected_candidate=None)
 
     cache_key = f"{domain}:{locale_country}:{locale_language}:{max_results}:{query_text.lower()}"
-    cached = _cache_get(_search_cache, cache_key)
+    cached, needs_refresh = _search_cache.lookup(cache_key)
     if cached is not None:
+        if needs_refresh:
+            _schedule_refresh(
+                _search_flights,
+                cache_key,
+                lambda: _fetch_search_results(
+                    query_text=query_text,
+                    domain=domain,
+                    locale_country=locale_country,
+                    locale_language=locale_language,
+                    max_results=max_results,
+                    cache_key=cache_key,
+                    refresh=True,
+                ),
+            )
         return cached
+    local_result = await _local_catalog_search(query_text, domain, max_results)
+    if local_result is not None:
+        return local_result
+    if not settings.off_search_fallback_enabled:
+        return SearchToolResult(candidates=[], selected_candidate=None)
+    negative_key = f"search:{cache_key}"
+    if _negative_cache.get(negative_key) is not None:
+        return SearchToolResult(candidates=[], selected_candidate=None)
 
-    fields = BEAUTY_FIELDS if domain == "beauty" else FOOD_FIELDS
+    flight = _start_flight(
+        _search_flights,
+        cache_key,
+        lambda: _fetch_search_results(
+            query_text=query_text,
+            domain=domain,
+            locale_country=locale_country,
+            locale_language=locale_language,
+            max_results=max_results,
+            cache_key=cache_key,
+        ),
+    )
+    return await _await_flight(flight, SearchToolResult(candidates=[], selected_candidate=None))
+
+
+async def _fetch_search_results(
+    *,
+    query_text: str,
+    domain: str,
+    locale_country: str,
+    locale_language: str,
+    max_results: int,
+    cache_key: str,
+    refresh: bool = False,
+) -> SearchToolResult:
+    shared_key = f"search:{cache_key}"
+    if not refresh:
+        shared_hit = await _shared_cache_get(shared_key, SearchToolResult)
+        if shared_hit is not None:
+            value, age_seconds = shared_hit
+            _cache_set(_search_cache, cache_key, value, age_seconds=age_seconds)
+            return value
+
+    negative_key = f"search:{cache_key}"
     url = f"{_base_url(domain)}/cgi/search.pl"
     headers = {"User-Agent": settings.off_user_agent}
 
-    products: list[dict[str, Any]] = []
     query_variants = _search_query_variants(query_text)
     locale_variants = _search_locale_variants(locale_country=locale_country, locale_language=locale_language)
+    variant_params: list[dict[str, Any]] = []
+    for query_variant in query_variants:
+        for country_variant, language_variant in locale_variants:
+            params: dict[str, Any] = {
+                "search_terms": query_variant,
+                "search_simple": 1,
+                "action": "process",
+                "json": 1,
+                "page_size": max_results,
+                "fields": SEARCH_FIELDS,
+            }
+            if country_variant:
+                params["cc"] = country_variant
+            if language_variant:
+                params["lc"] = language_variant
+            variant_params.append(params)
+
+    breaker = _breaker(domain)
+    if breaker.is_open:
+        return SearchToolResult(candidates=[], selected_candidate=None)
+    limiter = _rate_limiter(domain, "search")
+    upstream_errors = 0
+    abandoned = 0
+    started_at = time.monotonic()
     try:
-        async with httpx.AsyncClient(timeout=settings.request_timeout_seconds) as client:
-            for query_variant in query_variants:
-                for country_variant, language_variant in locale_variants:
-                    params: dict[str, Any] = {
-                        "search_terms": query_variant,
-                        "search_simple": 1,
-                        "action": "process",
-                        "json": 1,
-                        "page_size": max_results,
-                        "fields": fields,
-                    }
-                    if country_variant:
-                        params["cc"] = country_variant
-                    if language_variant:
-                        params["lc"] = language_variant
-                    try:
+        async with _upstream_client(domain) as client:
+
+            async def fetch_variant(params: dict[str, Any]) -> list[dict[str, Any]]:
+                nonlocal upstream_errors, abandoned
+                try:
+                    await limiter.acquire()
+                    async with breaker.guard("search"):
                         response = await client.get(url, params=params, headers=headers)
                         response.raise_for_status()
-                        payload = response.json()
-                        products = payload.get("products") or []
-                    except Exception:
-                        continue
-                    if products:
-                        break
-                if products:
-                    break
+                        payload = decode_response(response)
+                    return payload.get("products") or []
+                except (CircuitOpenError, RateLimitExceeded, DeadlineExceeded):
+                    abandoned += 1
+                    return []
+                except Exception:
+                    upstream_errors += 1
+                    return []
+
+            products = await _first_nonempty_by_priority(
+                [lambda params=params: fetch_variant(params) for params in variant_params],
+                max_in_flight=settings.search_max_in_flight,
+                hedge_delay=settings.search_hedge_delay_seconds,
+            )
     except Exception:
+        upstream_errors += 1
         products = []
 
     candidates: list[SearchCandidate] = []
@@ -204,5 +863,9 @@ async def search_product_catalog(
 
     selected = candidates[0] if candidates else None
     result = SearchToolResult(candidates=candidates, selected_candidate=selected)
-    _cache_set(_search_cache, cache_key, result)
+    if candidates:
+        _cache_set(_search_cache, cache_key, result, compute_seconds=time.monotonic() - started_at)
+        await _shared_cache_set(shared_key, result)
+    elif not abandoned:
+        _negative_cache_set(negative_key, NEGATIVE_UPSTREAM_ERROR if upstream_errors else NEGATIVE_NOT_FOUND)
     return result
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable
+
+TurnFactory = Callable[[], Awaitable[None]]
+
+
+class TurnScheduler:
+    # One worker per session runs turns one at a time. Submitting a turn supersedes anything still queued
+    # and cancels the turn in flight, so the session always converges on the latest request.
+    def __init__(self, on_cancelled: Callable[[str], Awaitable[None]] | None = None) -> None:
+        self._queue: asyncio.Queue[tuple[str, TurnFactory]] = asyncio.Queue()
+        self._current: asyncio.Task[None] | None = None
+        self._current_id: str | None = None
+        self._on_cancelled = on_cancelled
+        self.completed = 0
+        self.cancelled = 0
+        self.dropped = 0
+
+    @property
+    def current_turn_id(self) -> str | None:
+        return self._current_id if self._current is not None and not self._current.done() else None
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    @property
+    def busy(self) -> bool:
+        return self.current_turn_id is not None or not self._queue.empty()
+
+    def submit(self, turn_id: str, factory: TurnFactory) -> None:
+        self.cancel_all()
+        self._queue.put_nowait((turn_id, factory))
+
+    def cancel_current(self) -> bool:
+        task = self._current
+        if task is None or task.done():
+            return False
+        task.cancel()
+        return True
+
+    def cancel_all(self) -> None:
+        while not self._queue.empty():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self.cancel_current()
+
+    async def run(self) -> None:
+        while True:
+            turn_id, factory = await self._queue.get()
+            task = asyncio.ensure_future(factory())
+            self._current, self._current_id = task, turn_id
+            try:
+                # wait() rather than await: cancelling the turn must not cancel the worker with it.
+                await asyncio.wait({task})
+            except asyncio.CancelledError:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                raise
+            finally:
+                self._current, self._current_id = None, None
+            if task.cancelled():
+                self.cancelled += 1
+                if self._on_cancelled is not None:
+                    await self._on_cancelled(turn_id)
+                continue
+            task.result()
+            self.completed += 1
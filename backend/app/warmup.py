@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from .config import settings
+from .ratelimit import BACKGROUND, set_request_priority
+from .tools import get_product_by_barcode, search_product_catalog
+
+logger = logging.getLogger("nutrivision")
+
+DISABLED = "disabled"
+PENDING = "pending"
+RUNNING = "running"
+COMPLETE = "complete"
+FAILED = "failed"
+
+
+@dataclass(frozen=True)
+class WarmupItem:
+    kind: str
+    value: str
+    domain: str
+    locale_country: str
+    locale_language: str
+
+
+@dataclass
+class WarmupProgress:
+    state: str = DISABLED
+    total: int = 0
+    completed: int = 0
+    failed: int = 0
+    error: str | None = None
+    items: list[WarmupItem] = field(default_factory=list, repr=False)
+
+    @property
+    def ready(self) -> bool:
+        return self.state in {DISABLED, COMPLETE, FAILED}
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "state": self.state,
+            "total": self.total,
+            "completed": self.completed,
+            "failed": self.failed,
+            "progress": round(self.completed / self.total, 3) if self.total else 1.0,
+            "error": self.error,
+        }
+
+
+def load_manifest(path: str | Path) -> list[WarmupItem]:
+    # {"locales": [{"domain": "food", "country": "de", "language": "de", "barcodes": [...], "queries": [...]}]}
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    items: list[WarmupItem] = []
+    for locale in data.get("locales") or []:
+        domain = "beauty" if locale.get("domain") == "beauty" else "food"
+        country = str(locale.get("country") or settings.locale_country)
+        language = str(locale.get("language") or settings.locale_language)
+        for barcode in locale.get("barcodes") or []:
+            if str(barcode).strip():
+                items.append(WarmupItem("barcode", str(barcode).strip(), domain, country, language))
+        for query in locale.get("queries") or []:
+            if str(query).strip():
+                items.append(WarmupItem("query", str(query).strip(), domain, country, language))
+    return list(dict.fromkeys(items))
+
+
+async def _warm_item(item: WarmupItem) -> bool:
+    if item.kind == "barcode":
+        result = await get_product_by_barcode(
+            barcode=item.value,
+            domain=item.domain,
+            locale_country=item.locale_country,
+            locale_language=item.locale_language,
+        )
+        return result.found
+    result = await search_product_catalog(
+        query_text=item.value,
+        domain=item.domain,
+        locale_country=item.locale_country,
+        locale_language=item.locale_language,
+    )
+    return bool(result.candidates)
+
+
+async def run_warmup(progress: WarmupProgress, *, requests_per_second: float) -> None:
+    interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+    set_request_priority(BACKGROUND)
+    progress.state = RUNNING
+    for index, item in enumerate(progress.items):
+        if index and interval:
+            await asyncio.sleep(interval)
+        try:
+            warmed = await _warm_item(item)
+        except Exception:
+            logger.warning("Warm-up of %s %r failed", item.kind, item.value, exc_info=True)
+            warmed = False
+        progress.completed += 1
+        if not warmed:
+            progress.failed += 1
+    progress.state = COMPLETE
+    logger.info("Cache warm-up complete: %d entries, %d misses", progress.completed, progress.failed)
+
+
+_progress = WarmupProgress()
+_warmup_task: asyncio.Task[None] | None = None
+
+
+def warmup_progress() -> WarmupProgress:
+    return _progress
+
+
+def start_warmup(path: str | None = None) -> WarmupProgress:
+    global _progress, _warmup_task
+    path = path or settings.warmup_manifest_path
+    if not path:
+        _progress = WarmupProgress()
+        return _progress
+    try:
+        items = load_manifest(path)
+    except (OSError, ValueError, AttributeError) as exc:
+        logger.warning("Warm-up manifest %s could not be loaded", path, exc_info=True)
+        _progress = WarmupProgress(state=FAILED, error=str(exc))
+        return _progress
+    _progress = WarmupProgress(state=PENDING, total=len(items), items=items)
+    _warmup_task = asyncio.create_task(
+        run_warmup(_progress, requests_per_second=settings.warmup_requests_per_second)
+    )
+    return _progress
+
+
+async def stop_warmup() -> None:
+    global _warmup_task
+    task = _warmup_task
+    _warmup_task = None
+    if task is None or task.done():
+        return
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import os
+import sys
+import timeit
+from pathlib import Path
+from typing import Any, Callable
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.fastjson import encode_event, orjson  # noqa: E402
+from app.models import (  # noqa: E402
+    HudUpdateEvent,
+    MetricItem,
+    ProductIdentity,
+    SimpleEvent,
+    SpeechAudioEvent,
+    SpeechEvent,
+    WarningItem,
+)
+
+
+def _events(audio_bytes: int) -> dict[str, Any]:
+    audio = base64.b64encode(os.urandom(audio_bytes)).decode("ascii")
+    return {
+        "hud_update": HudUpdateEvent(
+            session_id="session",
+            turn_id="turn",
+            domain="food",
+            product_identity=ProductIdentity(id="4000417025005", name="Zartbitter Schokolade 70 %", brand="Ritter Sport"),
+            grade_or_tier="C",
+            warnings=[WarningItem(category="warning_required", label="Farbstoff E 150d", severity="medium")] * 2,
+            metrics=[
+                MetricItem(name=name, value="12.5 g", band="amber", score=48)
+                for name in ("Sugar", "Salt", "Saturated fat", "Protein")
+            ],
+            confidence=0.94,
+            data_sources=["Open Food Facts", "Policy ruleset v1"],
+            explanation_bullets=["Zucker liegt im mittleren Bereich für Schokolade."] * 4,
+        ),
+        "speech_text": SpeechEvent(
+            session_id="session",
+            turn_id="turn",
+            text="Das Produkt hat Note C. Zucker ist moderat, Salz ist niedrig.",
+            language="de",
+        ),
+        "simple": SimpleEvent(event_type="barge_ack", session_id="session", turn_id="turn", message="Interrupted."),
+        "speech_audio": SpeechAudioEvent(
+            session_id="session",
+            turn_id="turn",
+            audio_b64=f"data:audio/wav;base64,{audio}",
+            mime_type="audio/wav",
+            language="de",
+        ),
+    }
+
+
+def _send_json_path(event: Any) -> str:
+    # What `websocket.send_json(event.model_dump())` does before the frame is written.
+    return json.dumps(event.model_dump(), separators=(",", ":"), ensure_ascii=False)
+
+
+def _orjson_dict_path(event: Any) -> str:
+    return orjson.dumps(event.model_dump()).decode("utf-8")
+
+
+def _per_call_us(func: Callable[[Any], str], event: Any, iterations: int, repeat: int) -> float:
+    return min(timeit.repeat(lambda: func(event), number=iterations, repeat=repeat)) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare websocket event serialization paths")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--audio-bytes", type=int, default=256 * 1024, help="Raw PCM bytes before base64")
+    args = parser.parse_args()
+
+    paths: dict[str, Callable[[Any], str]] = {"send_json(model_dump())": _send_json_path, "encode_event": encode_event}
+    if orjson is not None:
+        paths["orjson(model_dump())"] = _orjson_dict_path
+
+    print(f"{'event':<14}{'bytes':>10}" + "".join(f"{name:>26}" for name in paths) + f"{'speedup':>10}")
+    for name, event in _events(args.audio_bytes).items():
+        encoded = encode_event(event)
+        if json.loads(encoded) != json.loads(_send_json_path(event)):
+            raise SystemExit(f"{name}: encode_event output differs from send_json")
+        # Large payloads dominate wall time; scale iterations down so every row takes similar time.
+        iterations = max(20, args.iterations * 1024 // max(1024, len(encoded)))
+        timings = {path: _per_call_us(func, event, iterations, args.repeat) for path, func in paths.items()}
+        speedup = timings["send_json(model_dump())"] / timings["encode_event"]
+        print(
+            f"{name:<14}{len(encoded):>10}"
+            + "".join(f"{timings[path]:>23.1f} us" for path in paths)
+            + f"{speedup:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
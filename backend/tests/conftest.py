@@ -3,7 +3,22 @@ from __future__ import annotations
 import sys
 from pathlib import Path
 
+import pytest
+
 # Ensure `backend` directory is on sys.path so `import app...` works in all pytest entry points.
 BACKEND_ROOT = Path(__file__).resolve().parents[1]
 if str(BACKEND_ROOT) not in sys.path:
     sys.path.insert(0, str(BACKEND_ROOT))
+
+
+@pytest.fixture(autouse=True)
+def _reset_tool_caches():
+    from app import tools
+
+    tools._negative_cache.clear()
+    tools._breakers.clear()
+    tools._rate_limiters.clear()
+    yield
+    tools._negative_cache.clear()
+    tools._breakers.clear()
+    tools._rate_limiters.clear()
@@ -0,0 +1,73 @@
+import math
+import random
+
+import numpy as np
+
+from app.batch_scoring import score_food_batch, score_food_records
+from app.records import ProductRecord
+from app.scoring import evaluate_ingredients_regulatory, normalize_and_score
+
+_TOKENS = [[], ["e171"], ["e102", "sodium nitrite"], ["e250"], ["e171", "e104", "e249"]]
+
+
+def _random_payloads(count: int) -> list[dict]:
+    rng = random.Random(7)
+    edges = [0.0, 4.5, 9.0, 22.5, 0.3, 1.5, 5.0, 12.0, 100.0]
+
+    def value() -> float | None:
+        roll = rng.random()
+        if roll < 0.1:
+            return None
+        if roll < 0.3:
+            return rng.choice(edges)
+        return round(rng.uniform(0, 60), rng.choice([0, 1, 2, 3]))
+
+    return [
+        {
+            "code": str(index),
+            "nutriments": {
+                key: number
+                for key in ("sugars_100g", "salt_100g", "saturated-fat_100g", "proteins_100g")
+                if (number := value()) is not None
+            },
+        }
+        for index in range(count)
+    ]
+
+
+def test_batch_kernel_matches_scalar_scoring_exactly() -> None:
+    payloads = _random_payloads(2000)
+    policies = [
+        evaluate_ingredients_regulatory("food", _TOKENS[index % len(_TOKENS)]) for index in range(len(payloads))
+    ]
+    records = [ProductRecord.from_payload(payload) for payload in payloads]
+
+    batch = score_food_records(records, policies)
+
+    assert len(batch) == len(payloads)
+    for index, (record, policy) in enumerate(zip(records, policies)):
+        scalar = normalize_and_score(product_payload=record, policy_result=policy, domain="food")
+        scores = [metric.score for metric in scalar.metrics]
+        bands = [metric.band for metric in scalar.metrics]
+        assert scalar.grade_or_tier == batch.grade[index]
+        assert scores == [
+            batch.sugar_score[index],
+            batch.salt_score[index],
+            batch.sat_fat_score[index],
+            batch.protein_score[index],
+        ]
+        assert bands == [
+            batch.sugar_band[index],
+            batch.salt_band[index],
+            batch.sat_fat_band[index],
+            batch.protein_band[index],
+        ]
+
+
+def test_batch_kernel_treats_missing_values_as_zero() -> None:
+    batch = score_food_batch([math.nan, 22.5], [None, 1.5], [0.0, 5.0], [12.0, math.nan], [0, 24])
+
+    assert batch.total_score.tolist() == [100, 0]
+    assert batch.grade.tolist() == ["A", "E"]
+    assert batch.protein_band.tolist() == ["green", "red"]
+    assert isinstance(batch.total_score, np.ndarray)
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+
+from app import cache as cache_module
+from app.cache import SingleFlight, TTLCache, approx_size
+from app.models import BarcodeToolResult
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_ttl_cache_evicts_least_recently_used_entry() -> None:
+    cache: TTLCache[str] = TTLCache(max_entries=2, max_bytes=1_000_000)
+    cache.set("a", "apple", ttl_seconds=60)
+    cache.set("b", "banana", ttl_seconds=60)
+    assert cache.get("a") == "apple"
+
+    cache.set("c", "cherry", ttl_seconds=60)
+
+    assert "b" not in cache
+    assert cache.get("a") == "apple"
+    assert cache.get("c") == "cherry"
+    assert cache.stats.evictions == 1
+
+
+def test_ttl_cache_respects_byte_budget() -> None:
+    payload = BarcodeToolResult(found=True, product_id="1", raw_payload_ref={"ingredients_text": "x" * 4000})
+    budget = approx_size(payload) * 2 + 100
+    cache: TTLCache[BarcodeToolResult] = TTLCache(max_entries=100, max_bytes=budget)
+
+    for index in range(5):
+        cache.set(str(index), payload.model_copy(deep=True), ttl_seconds=60)
+
+    assert len(cache) == 2
+    assert cache.total_bytes <= budget
+    assert cache.stats.evictions == 3
+
+
+def test_ttl_cache_expires_and_sweeps_stale_entries(monkeypatch) -> None:
+    clock = _Clock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    cache: TTLCache[int] = TTLCache(max_entries=10, max_bytes=1_000_000, sweep_interval_seconds=30)
+    cache.set("short", 1, ttl_seconds=5)
+    cache.set("long", 2, ttl_seconds=120)
+
+    clock.now += 10
+    assert cache.get("short") is None
+    assert cache.stats.expirations == 1
+
+    cache.set("other", 3, ttl_seconds=5)
+    clock.now += 31
+    cache.get("long")
+
+    assert "other" not in cache
+    assert len(cache) == 1
+    assert cache.snapshot()["hits"] == 1
+    assert cache.snapshot()["misses"] == 1
+
+
+def test_single_flight_propagates_failure_to_all_waiters() -> None:
+    flights: SingleFlight[int] = SingleFlight()
+    starts: list[int] = []
+
+    async def failing_lookup() -> int:
+        starts.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream exploded")
+
+    async def scenario():
+        return await asyncio.gather(
+            *(flights.run("key", failing_lookup) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(scenario())
+
+    assert len(starts) == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(flights) == 0
+
+
+def test_ttl_cache_serves_stale_until_hard_expiry(monkeypatch) -> None:
+    clock = _Clock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    cache: TTLCache[str] = TTLCache(max_entries=10, max_bytes=1_000_000, sweep_interval_seconds=3600)
+    cache.set("hot", "v1", ttl_seconds=60, stale_seconds=30)
+
+    assert cache.lookup("hot") == ("v1", False)
+    clock.now += 75
+    assert cache.lookup("hot") == ("v1", True)
+    clock.now += 20
+    assert cache.lookup("hot") == (None, False)
+    assert cache.stats.stale_hits == 1
+
+
+def test_ttl_cache_early_refresh_is_probabilistic_near_expiry(monkeypatch) -> None:
+    clock = _Clock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    cache: TTLCache[str] = TTLCache(max_entries=10, max_bytes=1_000_000, refresh_beta=1.0)
+    cache.set("hot", "v1", ttl_seconds=60, stale_seconds=30, compute_seconds=2.0)
+
+    monkeypatch.setattr(cache_module.random, "random", lambda: 0.5)
+    assert cache.lookup("hot") == ("v1", False)
+
+    clock.now += 59
+    assert cache.lookup("hot") == ("v1", True)
+    assert cache.stats.early_refreshes == 1
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import asyncio
+
+from app import disk_cache, tools
+from app.disk_cache import DiskCache
+from app.models import BarcodeToolResult
+
+
+def test_restart_restores_written_behind_entries(monkeypatch, tmp_path) -> None:
+    def _no_network(*args, **kwargs):
+        raise AssertionError("restored entries must not reach the network")
+
+    path = str(tmp_path / "cache.sqlite3")
+    cache_key = "food:de:de:4000000000001"
+    result = tools._barcode_result("4000000000001", {"code": "4000000000001", "product_name": "Demo"})
+
+    async def first_run():
+        cache = await disk_cache.start_disk_cache(path)
+        await tools._shared_cache_set(f"barcode:{cache_key}", result)
+        pending = cache.snapshot()["pending"]
+        await disk_cache.close_disk_cache()
+        return pending
+
+    async def second_run():
+        await disk_cache.start_disk_cache(path)
+        try:
+            restored = await tools.restore_from_disk_cache()
+            lookup = await tools.get_product_by_barcode(
+                barcode="4000000000001",
+                domain="food",
+                locale_country="de",
+                locale_language="de",
+            )
+        finally:
+            await disk_cache.close_disk_cache()
+        return restored, lookup
+
+    tools._barcode_cache.clear()
+    assert asyncio.run(first_run()) == 1
+    tools._barcode_cache.clear()
+    monkeypatch.setattr(tools.httpx, "AsyncClient", _no_network)
+    restored, lookup = asyncio.run(second_run())
+
+    assert restored == 1
+    assert lookup.found is True
+    assert lookup.raw_payload_ref == result.raw_payload_ref
+    tools._barcode_cache.clear()
+
+
+def test_compaction_drops_expired_then_oldest_entries(monkeypatch, tmp_path) -> None:
+    clock = [1000.0]
+    monkeypatch.setattr(disk_cache.time, "time", lambda: clock[0])
+    cache = DiskCache(tmp_path / "cache.sqlite3", max_bytes=250, ttl_seconds=60)
+
+    cache.write_many([("barcode:expired", b"x" * 100)])
+    clock[0] += 61
+    for index in range(3):
+        cache.write_many([(f"barcode:{index}", b"x" * 100)])
+        clock[0] += 1
+
+    assert cache.compact() == 2
+    assert cache.read("barcode:expired") is None
+    assert cache.read("barcode:0") is None
+    assert cache.read("barcode:2") == b"x" * 100
+    assert cache.total_bytes() == 200
+    cache.close()
+
+
+def test_disk_tier_is_checked_before_upstream(tmp_path) -> None:
+    async def scenario():
+        cache = await disk_cache.start_disk_cache(str(tmp_path / "cache.sqlite3"))
+        try:
+            cache.set_model("barcode:food:de:de:1", BarcodeToolResult(found=True, product_id="1"))
+            await cache.flush()
+            hit = await tools._shared_cache_get("barcode:food:de:de:1", BarcodeToolResult)
+            miss = await tools._shared_cache_get("barcode:food:de:de:2", BarcodeToolResult)
+        finally:
+            await disk_cache.close_disk_cache()
+        return hit, miss, cache.snapshot()
+
+    hit, miss, snapshot = asyncio.run(scenario())
+
+    assert hit is not None and hit[0].product_id == "1"
+    assert miss is None
+    assert snapshot["hits"] == 1 and snapshot["misses"] == 1 and snapshot["writes"] == 1
+
+
+def test_restored_entries_keep_their_age(monkeypatch, tmp_path) -> None:
+    clock = [10_000.0]
+    monkeypatch.setattr(disk_cache.time, "time", lambda: clock[0])
+    monkeypatch.setattr(tools.settings, "cache_ttl_seconds", 300)
+    monkeypatch.setattr(tools.settings, "cache_stale_ttl_seconds", 1800)
+    result = BarcodeToolResult(found=True, product_id="1")
+
+    async def scenario():
+        cache = await disk_cache.start_disk_cache(str(tmp_path / "cache.sqlite3"))
+        try:
+            cache.write_many([("barcode:food:de:de:old", result.model_dump_json().encode())])
+            clock[0] += 1000
+            cache.write_many([("barcode:food:de:de:aging", result.model_dump_json().encode())])
+            clock[0] += 1200
+            restored = await tools.restore_from_disk_cache()
+            expired_hit = await tools._shared_cache_get("barcode:food:de:de:old", BarcodeToolResult)
+            compacted = cache.compact()
+        finally:
+            await disk_cache.close_disk_cache()
+        return restored, expired_hit, compacted
+
+    tools._barcode_cache.clear()
+    restored, expired_hit, compacted = asyncio.run(scenario())
+    value, needs_refresh = tools._barcode_cache.lookup("food:de:de:aging")
+
+    assert restored == 1
+    assert expired_hit is None
+    # The row expires on disk at the same bound reads use, so compaction reclaims it.
+    assert compacted == 1
+    assert "food:de:de:old" not in tools._barcode_cache
+    assert value is not None and needs_refresh is True
+    tools._barcode_cache.clear()
+
+
+def test_writer_keeps_running_after_a_compaction_error(monkeypatch, tmp_path) -> None:
+    cache = DiskCache(tmp_path / "cache.sqlite3", max_bytes=1, ttl_seconds=60)
+    failures = []
+
+    def _disk_full() -> int:
+        failures.append(1)
+        raise disk_cache.sqlite3.OperationalError("database or disk is full")
+
+    monkeypatch.setattr(cache, "compact", _disk_full)
+
+    async def scenario():
+        writer = asyncio.create_task(cache.run_writer(0.01))
+        cache.set_model("barcode:1", BarcodeToolResult(found=True, product_id="1"))
+        await asyncio.sleep(0.05)
+        cache.set_model("barcode:2", BarcodeToolResult(found=True, product_id="2"))
+        await asyncio.sleep(0.05)
+        alive = not writer.done()
+        writer.cancel()
+        await asyncio.gather(writer, return_exceptions=True)
+        return alive
+
+    assert asyncio.run(scenario()) is True
+    assert cache.count() == 2
+    assert len(failures) == 2 and cache.snapshot()["errors"] == 2
+    cache.close()
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+
+from app import product_store, tools
+from app.ingest import ingest_dump
+from app.product_store import ProductStore
+
+
+def _write_jsonl_dump(path) -> None:
+    rows = [
+        {
+            "code": "4251097401447",
+            "product_name": "BiFi Original XXL",
+            "brands": "BiFi",
+            "nutriments": {"sugars_100g": "0.9", "salt_100g": 2.1, "energy-kcal": 500, "sugars_unit": "g"},
+            "additives_tags": ["en:e250"],
+            "ingredients_text": "pork, salt",
+            "images": {"front": {"sizes": {}}},
+        },
+        {"code": "", "product_name": "No code"},
+    ]
+    with gzip.open(path, "wt", encoding="utf-8") as handle:
+        for row in rows:
+            handle.write(json.dumps(row) + "\n")
+        handle.write("not json\n")
+
+
+def test_ingest_jsonl_dump_keeps_only_tool_fields(tmp_path) -> None:
+    source = tmp_path / "off.jsonl.gz"
+    _write_jsonl_dump(source)
+    store = ProductStore(tmp_path / "products.sqlite3", read_only=False)
+
+    count = ingest_dump(source, store, domain="food", language="de")
+
+    product = store.get("food", "4251097401447")
+    assert count == 1
+    assert product is not None
+    assert "images" not in product
+    assert product["nutriments"] == {"sugars_100g": 0.9, "salt_100g": 2.1}
+    assert product["additives_tags"] == ["en:e250"]
+    store.close()
+
+
+def test_ingest_csv_dump_rebuilds_nutriments_and_tags(tmp_path) -> None:
+    source = tmp_path / "beauty.csv"
+    source.write_text(
+        "code\tproduct_name\tbrands\tingredients_tags\tlabels_tags\n"
+        "3600523614530\tShampoo\tGarnier\ten:aqua,en:sodium-laureth-sulfate\ten:vegan\n",
+        encoding="utf-8",
+    )
+    store = ProductStore(tmp_path / "products.sqlite3", read_only=False)
+
+    ingest_dump(source, store, domain="beauty", language="de")
+
+    product = store.get("beauty", "3600523614530")
+    assert product is not None
+    assert product["ingredients_tags"] == ["en:aqua", "en:sodium-laureth-sulfate"]
+    assert store.get("food", "3600523614530") is None
+    store.close()
+
+
+def test_barcode_lookup_prefers_local_store(tmp_path, monkeypatch) -> None:
+    db_path = tmp_path / "products.sqlite3"
+    source = tmp_path / "off.jsonl.gz"
+    _write_jsonl_dump(source)
+    writer = ProductStore(db_path, read_only=False)
+    ingest_dump(source, writer, domain="food", language="de")
+    writer.close()
+
+    def _no_network(*args, **kwargs):
+        raise AssertionError("local store hit must not reach the network")
+
+    monkeypatch.setattr(tools.httpx, "AsyncClient", _no_network)
+    monkeypatch.setattr(tools.settings, "product_store_path", str(db_path))
+    tools._barcode_cache.clear()
+    try:
+        result = asyncio.run(
+            tools.get_product_by_barcode(
+                barcode="4251097401447",
+                domain="food",
+                locale_country="de",
+                locale_language="de",
+            )
+        )
+    finally:
+        product_store.close_product_store()
+
+    assert result.found is True
+    assert result.canonical_name == "BiFi Original XXL"
+    assert result.raw_payload_ref is not None
+    assert result.raw_payload_ref["brands"] == "BiFi"
+
+
+def test_catalog_search_uses_local_index_before_off(tmp_path, monkeypatch) -> None:
+    db_path = tmp_path / "products.sqlite3"
+    writer = ProductStore(db_path, read_only=False)
+    writer.upsert_many(
+        "food",
+        [
+            {"code": "111", "product_name": "Lay's Classic Chips", "brands": "Lay's"},
+            {"code": "222", "product_name": "Classic Oat Cereal", "brands": "Kölln"},
+            {"code": "333", "product_name": "Lay's Paprika", "brands": "Lay's"},
+        ],
+    )
+    writer.rebuild_search_index("food")
+    writer.close()
+
+    def _no_network(*args, **kwargs):
+        raise AssertionError("local index hit must not reach OFF search")
+
+    monkeypatch.setattr(tools.httpx, "AsyncClient", _no_network)
+    monkeypatch.setattr(tools.settings, "product_store_path", str(db_path))
+    tools._search_cache.clear()
+    try:
+        result = asyncio.run(
+            tools.search_product_catalog(
+                query_text="lays classic chips",
+                domain="food",
+                locale_country="de",
+                locale_language="de",
+                max_results=5,
+            )
+        )
+        koelln = asyncio.run(
+            tools.search_product_catalog(
+                query_text="kolln",
+                domain="food",
+                locale_country="de",
+                locale_language="de",
+                max_results=5,
+            )
+        )
+    finally:
+        product_store.close_product_store()
+
+    assert result.selected_candidate is not None
+    assert result.selected_candidate.id == "111"
+    assert [candidate.id for candidate in result.candidates][:1] == ["111"]
+    assert result.candidates[0].confidence >= result.candidates[-1].confidence
+    assert koelln.selected_candidate is not None
+    assert koelln.selected_candidate.id == "222"
+
+
+def test_weak_local_match_falls_back_to_off_search(tmp_path, monkeypatch) -> None:
+    from app.models import SearchCandidate, SearchToolResult
+
+    db_path = tmp_path / "products.sqlite3"
+    writer = ProductStore(db_path, read_only=False)
+    writer.upsert_many("food", [{"code": "222", "product_name": "Classic Oat Cereal", "brands": "Kölln"}])
+    writer.rebuild_search_index("food")
+    writer.close()
+    off_queries: list[str] = []
+
+    async def _fake_off_search(*, query_text, **kwargs):
+        off_queries.append(query_text)
+        candidate = SearchCandidate(id="999", name="Bio Muesli Classic", confidence=0.82)
+        return SearchToolResult(candidates=[candidate], selected_candidate=candidate)
+
+    monkeypatch.setattr(tools, "_fetch_search_results", _fake_off_search)
+    monkeypatch.setattr(tools.settings, "product_store_path", str(db_path))
+    tools._search_cache.clear()
+    try:
+        result = asyncio.run(
+            tools.search_product_catalog(
+                query_text="bio muesli classic",
+                domain="food",
+                locale_country="de",
+                locale_language="de",
+                max_results=5,
+            )
+        )
+        hits = product_store.get_product_store().search("food", "bio muesli classic", limit=5)
+    finally:
+        product_store.close_product_store()
+
+    assert hits and hits[0][0] == "222" and hits[0][3] < tools.settings.local_search_min_match_ratio
+    assert off_queries == ["bio muesli classic"]
+    assert result.selected_candidate is not None and result.selected_candidate.id == "999"
+
+
+def test_precomputed_scores_are_served_until_inputs_or_rules_change(tmp_path, monkeypatch) -> None:
+    from app import policy, scoring
+    from app.ingest import precompute_scores
+    from app.records import ProductRecord
+
+    db_path = tmp_path / "products.sqlite3"
+    source = tmp_path / "off.jsonl.gz"
+    _write_jsonl_dump(source)
+    writer = ProductStore(db_path, read_only=False)
+    ingest_dump(source, writer, domain="food", language="de")
+    assert precompute_scores(writer, domain="food", policy_version="v1") == 1
+    writer.close()
+
+    def _no_scoring(*args, **kwargs):
+        raise AssertionError("precomputed score must be served without rescoring")
+
+    monkeypatch.setattr(tools.settings, "product_store_path", str(db_path))
+    scoring._score_memo.clear()
+    try:
+        record = ProductRecord.from_payload(product_store.get_product_store().get("food", "4251097401447"))
+        with monkeypatch.context() as patched:
+            patched.setattr(scoring, "compute_score", _no_scoring)
+            policy_result, normalized = scoring.evaluate_and_score(record, domain="food", policy_version="v1")
+
+        changed = ProductRecord.from_payload({**record.to_payload(), "nutriments": {"sugars_100g": 40.0}})
+        rescored = scoring.evaluate_and_score(changed, domain="food", policy_version="v1")
+        expected = scoring.compute_score(record, "food", "v1")
+
+        scoring._score_memo.clear()
+        edited = policy.CompiledRuleset(
+            {"policy_version": "v1", "domains": {"food": []}, "fallback": None}, digest="edited"
+        )
+        monkeypatch.setitem(policy._rulesets, "v1", edited)
+        assert scoring._precomputed_score(record, "food", "v1") is None
+    finally:
+        product_store.close_product_store()
+        scoring._score_memo.clear()
+
+    assert (policy_result, normalized) == expected
+    assert policy_result.flags[0].category == "restricted"
+    assert rescored[1].metrics[0].score == 100
@@ -0,0 +1,58 @@
+from app.ingredients import parse_ingredients
+from app.records import ProductRecord
+from app.scoring import evaluate_ingredients_regulatory
+
+
+def test_parser_flattens_nesting_and_canonicalizes_e_numbers() -> None:
+    tokens = parse_ingredients(
+        "Ingredients: Milk chocolate 45% (sugar, cocoa butter, whole _milk_ powder, "
+        "emulsifier (soya lecithin, E-322)), hazelnuts 12,5 %, colour: E 150d; vanilla*."
+    )
+
+    assert tokens == (
+        "milk chocolate",
+        "sugar",
+        "cocoa butter",
+        "whole milk powder",
+        "emulsifier",
+        "soya lecithin",
+        "e322",
+        "hazelnuts",
+        "colour",
+        "e150d",
+        "vanilla",
+    )
+
+
+def test_parser_handles_localized_separators_and_ignores_lookalikes() -> None:
+    assert parse_ingredients("Zutaten: Wasser; Zucker、Salz • Säuerungsmittel: Citronensäure") == (
+        "wasser",
+        "zucker",
+        "salz",
+        "säuerungsmittel",
+        "citronensäure",
+    )
+    assert parse_ingredients("water, be 250, 100%, e12345") == ("water", "be 250", "e12345")
+    assert parse_ingredients("colour: e102, e 104 and e-110") == ("colour", "e102", "e104", "e110")
+    assert parse_ingredients("Salz und Pfeffer, latte e zucchero, sal y azúcar, Vitamin E and zinc, sand") == (
+        "salz",
+        "pfeffer",
+        "latte",
+        "zucchero",
+        "sal",
+        "azúcar",
+        "vitamin e",
+        "zinc",
+        "sand",
+    )
+    assert parse_ingredients("") == ()
+
+
+def test_spaced_e_numbers_now_reach_exact_policy_rules() -> None:
+    record = ProductRecord.from_payload(
+        {"code": "1", "ingredients_text": "Zucker, Farbstoff: Titandioxid (E 171), Konservierungsstoff E250"}
+    )
+    result = evaluate_ingredients_regulatory("food", list(record.policy_tokens))
+
+    assert {"e171", "e250", "titandioxid", "farbstoff"} <= record.policy_tokens
+    assert [flag.category for flag in result.flags] == ["not_authorized", "restricted"]
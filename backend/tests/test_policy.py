@@ -0,0 +1,182 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+
+import app.main as main_module
+from app import policy
+from app.policy import RULESET_DIR, CompiledRuleset, PatternMatcher, get_ruleset
+from app.policy_reload import reload_policies
+from app.records import ProductRecord
+from app.scoring import evaluate_and_score, evaluate_ingredients_regulatory
+
+
+def test_pattern_matcher_finds_overlapping_patterns_in_one_pass() -> None:
+    matcher = PatternMatcher(
+        {"he": frozenset({0}), "she": frozenset({1}), "his": frozenset({2}), "hers": frozenset({3})}
+    )
+    matched: set[int] = set()
+    matcher.scan("ushers", matched)
+
+    assert matched == {0, 1, 3}
+
+
+def test_v1_ruleset_keeps_exact_and_substring_semantics() -> None:
+    food = evaluate_ingredients_regulatory("food", ["E171", "Sodium Nitrite", "e1710", "E102"])
+    beauty = evaluate_ingredients_regulatory("beauty", ["Aqua", "Sodium Lauryl Sulfate", "LINALOOL"])
+    nothing = evaluate_ingredients_regulatory("food", ["sugar", "e1710"])
+
+    assert [flag.category for flag in food.flags] == ["not_authorized", "warning_required", "restricted"]
+    assert [flag.message_short for flag in beauty.flags] == [
+        "Fragrance allergens detected.",
+        "Strong surfactant may irritate sensitive skin.",
+    ]
+    assert [flag.category for flag in nothing.flags] == ["uncertain"]
+    assert nothing.uncertainty_markers == ["source_fields_incomplete"]
+
+
+def test_large_ruleset_flags_come_back_in_rule_order() -> None:
+    rules = [
+        {
+            "id": f"food.rule_{index}",
+            "category": "restricted",
+            "severity": "medium",
+            "message_short": f"rule {index}",
+            "policy_citation": "test",
+            "contains": [f"marker{index:03d}x"],
+        }
+        for index in range(500)
+    ]
+    rules.append(
+        {
+            "id": "food.exact",
+            "category": "not_authorized",
+            "severity": "critical",
+            "message_short": "exact",
+            "policy_citation": "test",
+            "exact": ["e999"],
+        }
+    )
+    ruleset = CompiledRuleset({"policy_version": "test", "domains": {"food": rules}})
+
+    flags = ruleset.evaluate("food", ["E999", "contains marker420x and marker007x", "marker00"])
+
+    assert [flag.message_short for flag in flags] == ["rule 7", "rule 420", "exact"]
+
+
+def test_unknown_policy_version_falls_back_to_default_rules() -> None:
+    assert get_ruleset("../v1") is get_ruleset("v1")
+    result = evaluate_ingredients_regulatory("food", ["e171"], policy_version="v9")
+
+    assert result.policy_version == "v9"
+    assert result.flags[0].category == "not_authorized"
+
+
+@pytest.fixture
+def ruleset_dir(tmp_path, monkeypatch):
+    (tmp_path / "v1.json").write_bytes((RULESET_DIR / "v1.json").read_bytes())
+    monkeypatch.setattr(policy.settings, "policy_ruleset_dir", str(tmp_path))
+    monkeypatch.setattr(policy, "_rulesets", {})
+    return tmp_path
+
+
+def _drop_rule(directory, version: str, rule_id: str) -> None:
+    path = directory / f"{version}.json"
+    data = json.loads(path.read_text(encoding="utf-8"))
+    data["domains"]["food"] = [rule for rule in data["domains"]["food"] if rule["id"] != rule_id]
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+
+def test_reload_swaps_rulesets_and_drops_only_changed_scores(ruleset_dir) -> None:
+    data = json.loads((ruleset_dir / "v1.json").read_text(encoding="utf-8"))
+    data["policy_version"] = "v2"
+    (ruleset_dir / "v2.json").write_text(json.dumps(data), encoding="utf-8")
+    record = ProductRecord.from_payload({"code": "1", "ingredients_text": "sugar, e171"})
+
+    before_v1 = get_ruleset("v1")
+    scored_v1 = evaluate_and_score(record, domain="food", policy_version="v1")
+    scored_v2 = evaluate_and_score(record, domain="food", policy_version="v2")
+    _drop_rule(ruleset_dir, "v1", next(rule["id"] for rule in data["domains"]["food"] if "e171" in rule.get("exact", [])))
+    report = asyncio.run(reload_policies())
+
+    assert report["changed"] == ["v1"]
+    assert report["invalidated"] == 1
+    # A turn that resolved the old ruleset keeps evaluating against it.
+    assert before_v1.evaluate("food", ["e171"])[0].category == "not_authorized"
+    assert get_ruleset("v1") is not before_v1
+    assert evaluate_and_score(record, domain="food", policy_version="v2") is scored_v2
+    rescored = evaluate_and_score(record, domain="food", policy_version="v1")
+    assert rescored is not scored_v1
+    assert "not_authorized" not in [flag.category for flag in rescored[0].flags]
+
+
+def test_broken_ruleset_keeps_previous_version_and_aliases_survive(ruleset_dir) -> None:
+    default = get_ruleset("v1")
+    assert get_ruleset("v9") is default
+    (ruleset_dir / "v1.json").write_text("{not json", encoding="utf-8")
+
+    report = asyncio.run(reload_policies())
+
+    assert report["changed"] == []
+    assert get_ruleset("v1") is default
+    assert get_ruleset("v9") is default
+
+
+def test_alias_added_while_a_reload_compiles_survives_the_swap(ruleset_dir, monkeypatch) -> None:
+    default = get_ruleset("v1")
+    (ruleset_dir / "v2.json").write_bytes((ruleset_dir / "v1.json").read_bytes() + b"\n")
+    compile_ruleset = policy.CompiledRuleset
+
+    def compile_while_a_turn_resolves_an_alias(*args, **kwargs):
+        # Stands in for a live turn on the event loop resolving an unknown version mid-reload.
+        assert get_ruleset("v9") is default
+        return compile_ruleset(*args, **kwargs)
+
+    monkeypatch.setattr(policy, "CompiledRuleset", compile_while_a_turn_resolves_an_alias)
+    changed = policy.reload_rulesets()
+
+    assert changed == ["v2"]
+    assert policy._rulesets["v9"] is default
+    assert get_ruleset("v1") is default
+
+
+def test_watcher_survives_an_unexpected_reload_error(monkeypatch) -> None:
+    from app import policy_reload
+
+    signatures = iter(range(1000))
+    outcomes = [RuntimeError("dictionary changed size during iteration")]
+
+    async def flaky_reload():
+        if outcomes:
+            raise outcomes.pop()
+        return {}
+
+    monkeypatch.setattr(policy_reload, "ruleset_signature", lambda: next(signatures))
+    monkeypatch.setattr(policy_reload, "reload_policies", flaky_reload)
+    failures_before = policy_reload._stats.failures
+
+    async def scenario():
+        watcher = asyncio.create_task(policy_reload._watch(0.001))
+        await asyncio.sleep(0.05)
+        alive = not watcher.done()
+        watcher.cancel()
+        await asyncio.gather(watcher, return_exceptions=True)
+        return alive
+
+    assert asyncio.run(scenario()) is True
+    assert policy_reload._stats.failures == failures_before + 1
+    assert "dictionary changed size" in policy_reload._stats.last_error
+
+
+def test_admin_reload_requires_the_configured_token(ruleset_dir, monkeypatch) -> None:
+    with pytest.raises(HTTPException) as disabled:
+        asyncio.run(main_module.reload_policy_rulesets(x_admin_token="secret"))
+    monkeypatch.setattr(main_module.settings, "admin_token", "secret")
+    with pytest.raises(HTTPException) as forbidden:
+        asyncio.run(main_module.reload_policy_rulesets(x_admin_token="wrong"))
+    report = asyncio.run(main_module.reload_policy_rulesets(x_admin_token="secret"))
+
+    assert disabled.value.status_code == 404
+    assert forbidden.value.status_code == 403
+    assert report["versions"] == {"v1": get_ruleset("v1").digest}
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+import app.main as main_module
+from app import tools
+from app.ratelimit import BACKGROUND, INTERACTIVE, RateLimitExceeded, TokenBucketLimiter
+
+
+def test_interactive_waiters_jump_ahead_of_background_ones() -> None:
+    limiter = TokenBucketLimiter("test", rate_per_second=50.0, burst=1, max_wait_seconds=1.0)
+    order: list[str] = []
+
+    async def take(label: str, priority: int) -> None:
+        await limiter.acquire(priority)
+        order.append(label)
+
+    async def scenario():
+        await limiter.acquire(INTERACTIVE)
+        background = [asyncio.create_task(take(f"background-{index}", BACKGROUND)) for index in range(2)]
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(take("interactive", INTERACTIVE))
+        await asyncio.gather(*background, interactive)
+        return limiter.snapshot()
+
+    snapshot = asyncio.run(scenario())
+
+    assert order == ["interactive", "background-0", "background-1"]
+    assert snapshot["acquired"] == 4
+    assert snapshot["max_queue_depth"] == 3
+    assert snapshot["queue_depth"] == 0
+    assert snapshot["wait_ms_p95"] > 0
+
+
+def test_waiter_is_rejected_after_max_wait() -> None:
+    limiter = TokenBucketLimiter("test", rate_per_second=0.01, burst=1, max_wait_seconds=0.05)
+
+    async def scenario():
+        await limiter.acquire()
+        with pytest.raises(RateLimitExceeded):
+            await limiter.acquire()
+
+    asyncio.run(scenario())
+    assert limiter.snapshot()["rejected"] == 1
+    assert limiter.queue_depth == 0
+
+
+def test_rate_limited_barcode_lookup_skips_upstream_and_is_not_negative_cached(monkeypatch) -> None:
+    def _no_network(*args, **kwargs):
+        raise AssertionError("rate-limited lookups must not reach the network")
+
+    monkeypatch.setattr(tools.settings, "off_product_burst", 1)
+    monkeypatch.setattr(tools.settings, "off_product_rate_per_minute", 0.01)
+    monkeypatch.setattr(tools.settings, "off_rate_limit_max_wait_seconds", 0.01)
+    monkeypatch.setattr(tools.httpx, "AsyncClient", _no_network)
+    tools._barcode_cache.clear()
+
+    async def scenario():
+        await tools._rate_limiter("food", "product").acquire()
+        return await tools.get_product_by_barcode(
+            barcode="4000000000002",
+            domain="food",
+            locale_country="de",
+            locale_language="de",
+        )
+
+    result = asyncio.run(scenario())
+    health = asyncio.run(main_module.health(verbose=True))
+
+    assert result.found is False
+    assert "barcode:food:de:de:4000000000002" not in tools._negative_cache
+    assert health["rate_limits"][f"{tools.OFF_BASE_URL} product"]["rejected"] == 1
@@ -0,0 +1,56 @@
+from app.main import _needs_backside_prompt, _nutrition_detail_snippet
+from app.models import BarcodeToolResult
+from app.records import ProductRecord
+from app.scoring import evaluate_ingredients_regulatory, normalize_and_score
+
+
+def _payload() -> dict:
+    return {
+        "code": "4000000000001",
+        "product_name": "Demo Product",
+        "brands": "Demo Brand",
+        "nutriments": {
+            "energy-kcal_100g": "512",
+            "sugars_100g": 18.0,
+            "fat_100g": 27.0,
+            "saturated-fat_100g": 6.5,
+            "proteins_100g": 7.5,
+            "salt_100g": None,
+            "iron_100g": 0.002,
+        },
+        "ingredients_text": "Sugar, Cocoa Butter, E171",
+        "ingredients_tags": ["en:sugar"],
+        "additives_tags": ["en:e171"],
+        "nutriscore_grade": "e",
+    }
+
+
+def test_product_record_precomputes_policy_tokens_and_details() -> None:
+    record = ProductRecord.from_payload(_payload())
+
+    assert not hasattr(record, "__dict__")
+    assert record.nutrient("energy-kcal_100g") == 512.0
+    assert record.has_nutrient("salt_100g") is False
+    assert record.policy_tokens == {"en:e171", "en:sugar", "sugar", "cocoa butter", "e171"}
+    assert _nutrition_detail_snippet(record, "en") == (
+        "Known nutrition values: 512 kcal/100g, sugar 18.0 g/100g, fat 27.0 g/100g, protein 7.5 g/100g."
+    )
+    assert _needs_backside_prompt(record) is False
+    assert _needs_backside_prompt(ProductRecord.from_payload({"code": "1", "product_name": "Bare"})) is True
+
+    compact = record.to_payload()
+    assert "iron_100g" not in compact["nutriments"]
+    assert "nutriscore_grade" not in compact
+
+
+def test_scoring_from_record_matches_scoring_from_payload() -> None:
+    payload = _payload()
+    result = BarcodeToolResult(found=True, product_id=payload["code"], raw_payload_ref=payload)
+    record = result.product_record()
+    policy = evaluate_ingredients_regulatory(domain="food", ingredients_or_additives=list(record.policy_tokens))
+
+    from_record = normalize_and_score(product_payload=record, policy_result=policy, domain="food")
+    from_payload = normalize_and_score(product_payload=payload, policy_result=policy, domain="food")
+
+    assert result.product_record() is record
+    assert from_record == from_payload
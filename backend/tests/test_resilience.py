@@ -0,0 +1,346 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+import app.main as main_module
+from app import resilience, tools
+from app.resilience import CircuitBreaker, CircuitOpenError
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 500.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _breaker(**overrides) -> CircuitBreaker:
+    options = {
+        "failure_rate_threshold": 0.5,
+        "min_calls": 4,
+        "window_seconds": 30.0,
+        "open_seconds": 10.0,
+        "timeout_floor_seconds": 0.2,
+        "timeout_ceiling_seconds": 5.0,
+        "timeout_multiplier": 3.0,
+    }
+    options.update(overrides)
+    return CircuitBreaker("https://world.openfoodfacts.org", **options)
+
+
+def test_breaker_opens_then_half_opens_and_closes_on_probe_success(monkeypatch) -> None:
+    clock = _Clock()
+    monkeypatch.setattr(resilience.time, "monotonic", clock)
+    breaker = _breaker()
+
+    breaker.record_success(0.1)
+    for _ in range(3):
+        breaker.record_failure()
+
+    assert breaker.state == resilience.OPEN
+    assert breaker.allow_request() is False
+
+    clock.now += 11
+    assert breaker.state == resilience.HALF_OPEN
+    assert breaker.allow_request() is True
+    assert breaker.allow_request() is False
+
+    breaker.record_success(0.1)
+    assert breaker.state == resilience.CLOSED
+
+
+def test_breaker_timeout_tracks_latency_percentiles() -> None:
+    breaker = _breaker()
+    assert breaker.timeout_seconds() == 5.0
+
+    for latency in (0.1, 0.12, 0.15, 0.2, 0.3):
+        breaker.record_success(latency)
+
+    assert breaker.timeout_seconds() == pytest.approx(0.9)
+    assert breaker.snapshot()["latency_p95_ms"] == 300.0
+
+
+def test_fast_product_reads_do_not_shrink_the_search_timeout() -> None:
+    breaker = _breaker()
+    for _ in range(10):
+        breaker.record_success(0.2)
+
+    async def slow_search() -> None:
+        async with breaker.guard("search"):
+            await asyncio.sleep(0.7)
+
+    asyncio.run(slow_search())
+    snapshot = breaker.snapshot()
+
+    assert breaker.timeout_seconds() == pytest.approx(0.6)
+    assert breaker.timeout_seconds("search") == 5.0
+    assert breaker.state == resilience.CLOSED
+    assert snapshot["endpoints"]["search"]["latency_p50_ms"] >= 700.0
+
+
+def test_breaker_guard_treats_not_found_as_healthy() -> None:
+    breaker = _breaker(min_calls=1)
+    request = httpx.Request("GET", "https://world.openfoodfacts.org/api/v2/product/1.json")
+    not_found = httpx.HTTPStatusError("404", request=request, response=httpx.Response(404, request=request))
+
+    async def scenario():
+        with pytest.raises(httpx.HTTPStatusError):
+            async with breaker.guard():
+                raise not_found
+        with pytest.raises(httpx.ConnectError):
+            async with breaker.guard():
+                raise httpx.ConnectError("down")
+        with pytest.raises(CircuitOpenError):
+            async with breaker.guard():
+                pass
+
+    asyncio.run(scenario())
+    assert breaker.state == resilience.OPEN
+
+
+def test_open_circuit_skips_upstream_and_shows_in_health(monkeypatch) -> None:
+    def _no_network(*args, **kwargs):
+        raise AssertionError("open circuit must not reach the network")
+
+    breaker = tools._breaker("food")
+    for _ in range(tools.settings.breaker_min_calls):
+        breaker.record_failure()
+    monkeypatch.setattr(tools.httpx, "AsyncClient", _no_network)
+    tools._barcode_cache.clear()
+
+    result = asyncio.run(
+        tools.get_product_by_barcode(
+            barcode="4251097401447",
+            domain="food",
+            locale_country="de",
+            locale_language="de",
+        )
+    )
+    health = asyncio.run(main_module.health(verbose=True))
+
+    assert result.found is False
+    assert "barcode:food:de:de:4251097401447" not in tools._negative_cache
+    assert health["upstreams"][tools.OFF_BASE_URL]["state"] == "open"
+
+
+def _status_error(status_code: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "https://world.openfoodfacts.org/api/v2/product/1.json")
+    return httpx.HTTPStatusError(str(status_code), request=request, response=httpx.Response(status_code, request=request))
+
+
+def test_retry_transient_retries_5xx_but_not_404_or_past_deadline(monkeypatch) -> None:
+    monkeypatch.setattr(resilience.random, "uniform", lambda low, high: high)
+    options = {"attempts": 3, "base_delay_seconds": 0.01, "max_delay_seconds": 0.05, "min_budget_seconds": 0.5}
+
+    def flaky(errors: list[Exception]):
+        calls: list[int] = []
+
+        async def call() -> str:
+            calls.append(1)
+            if errors:
+                raise errors.pop(0)
+            return "ok"
+
+        return call, calls
+
+    async def scenario():
+        call, retried = flaky([_status_error(503), httpx.ReadTimeout("slow")])
+        assert await resilience.retry_transient(call, **options) == "ok"
+
+        call, not_found = flaky([_status_error(404)])
+        with pytest.raises(httpx.HTTPStatusError):
+            await resilience.retry_transient(call, **options)
+
+        resilience.set_turn_deadline(0.3)
+        call, out_of_budget = flaky([_status_error(502)])
+        with pytest.raises(httpx.HTTPStatusError):
+            await resilience.retry_transient(call, **options)
+        return len(retried), len(not_found), len(out_of_budget)
+
+    assert asyncio.run(scenario()) == (3, 1, 1)
+
+
+def test_guard_deadline_cut_does_not_count_as_upstream_failure() -> None:
+    breaker = _breaker(min_calls=1)
+
+    async def scenario():
+        resilience.set_turn_deadline(0.01)
+        with pytest.raises(TimeoutError):
+            async with breaker.guard():
+                await asyncio.sleep(1)
+
+    asyncio.run(scenario())
+    assert breaker.state == resilience.CLOSED
+    assert breaker.snapshot()["calls_in_window"] == 0
+
+
+def test_barcode_lookup_retries_transient_errors(monkeypatch) -> None:
+    calls: list[int] = []
+
+    class _FlakyResponse:
+        def __init__(self, status_code: int) -> None:
+            self.status_code = status_code
+
+        def raise_for_status(self) -> None:
+            if self.status_code >= 400:
+                raise _status_error(self.status_code)
+
+        def json(self) -> dict:
+            return {"status": 1, "product": {"code": "4000000000003", "product_name": "Retried"}}
+
+    class _FlakyClient:
+        def __init__(self, *args, **kwargs) -> None:
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, exc_type, exc, tb):
+            return False
+
+        async def get(self, url, params=None, headers=None):
+            calls.append(1)
+            return _FlakyResponse(503 if len(calls) == 1 else 200)
+
+    monkeypatch.setattr(resilience.random, "uniform", lambda low, high: 0.0)
+    monkeypatch.setattr(tools.httpx, "AsyncClient", _FlakyClient)
+    tools._barcode_cache.clear()
+
+    result = asyncio.run(
+        tools.get_product_by_barcode(
+            barcode="4000000000003",
+            domain="food",
+            locale_country="de",
+            locale_language="de",
+        )
+    )
+
+    assert result.found is True
+    assert len(calls) == 2
+    tools._barcode_cache.clear()
+
+
+def test_lookup_after_spent_turn_budget_still_gets_a_fair_attempt(monkeypatch) -> None:
+    delays = [0.01, 0.5, 0.01]
+
+    class _Response:
+        def raise_for_status(self) -> None:
+            return None
+
+        def json(self) -> dict:
+            return {"status": 1, "product": {"code": "4000000000004", "product_name": "Late"}}
+
+    class _Client:
+        def __init__(self, *args, **kwargs) -> None:
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, exc_type, exc, tb):
+            return False
+
+        async def get(self, url, params=None, headers=None):
+            await asyncio.sleep(delays.pop(0))
+            return _Response()
+
+    monkeypatch.setattr(tools.httpx, "AsyncClient", _Client)
+    monkeypatch.setattr(tools.settings, "adaptive_timeout_min_seconds", 0.1)
+
+    async def lookup(barcode: str):
+        # The frame hint and the model call already used up this turn's budget.
+        resilience.set_turn_deadline(0.001)
+        await asyncio.sleep(0.01)
+        return await tools.get_product_by_barcode(
+            barcode=barcode,
+            domain="food",
+            locale_country="de",
+            locale_language="de",
+        )
+
+    tools._barcode_cache.clear()
+    fast = asyncio.run(lookup("4000000000004"))
+    tools._barcode_cache.clear()
+    cut = asyncio.run(lookup("4000000000005"))
+    retried = asyncio.run(lookup("4000000000005"))
+    snapshot = tools._breaker("food").snapshot()
+
+    assert fast.found is True
+    assert cut.found is False
+    assert "barcode:food:de:de:4000000000005" not in tools._negative_cache
+    assert retried.found is True
+    assert snapshot["failure_rate"] == 0.0
+    tools._barcode_cache.clear()
+
+
+def test_shared_flights_and_refreshes_do_not_inherit_a_spent_turn_deadline(monkeypatch) -> None:
+    budgets: list[float | None] = []
+
+    class _Response:
+        def __init__(self, code: str) -> None:
+            self._code = code
+
+        def raise_for_status(self) -> None:
+            return None
+
+        def json(self) -> dict:
+            return {"status": 1, "product": {"code": self._code, "product_name": "Slow"}}
+
+    class _Client:
+        def __init__(self, *args, **kwargs) -> None:
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, exc_type, exc, tb):
+            return False
+
+        async def get(self, url, params=None, headers=None):
+            budgets.append(resilience.remaining_budget())
+            await asyncio.sleep(0.3)
+            return _Response(url.rsplit("/", 1)[-1].removesuffix(".json"))
+
+    monkeypatch.setattr(tools.httpx, "AsyncClient", _Client)
+    monkeypatch.setattr(tools.settings, "adaptive_timeout_min_seconds", 0.1)
+
+    async def lookup(barcode: str):
+        return await tools.get_product_by_barcode(
+            barcode=barcode, domain="food", locale_country="de", locale_language="de"
+        )
+
+    async def warm_lookup(barcode: str):
+        resilience.set_turn_deadline(None)
+        return await lookup(barcode)
+
+    async def scenario():
+        resilience.set_turn_deadline(0.001)
+        await asyncio.sleep(0.01)
+        turn = asyncio.ensure_future(lookup("4000000000006"))
+        await asyncio.sleep(0)
+        # A warm-up caller without a turn budget joins the flight the turn started.
+        warm = asyncio.ensure_future(warm_lookup("4000000000006"))
+        results = await asyncio.gather(turn, warm)
+        stale = tools._barcode_result("4000000000007", {"code": "4000000000007", "product_name": "Old"})
+        tools._cache_set(
+            tools._barcode_cache, "food:de:de:4000000000007", stale, age_seconds=tools.settings.cache_ttl_seconds + 1
+        )
+        served = await lookup("4000000000007")
+        await asyncio.gather(*list(tools._background_tasks))
+        return results, served
+
+    tools._barcode_cache.clear()
+    (turn, warm), served = asyncio.run(scenario())
+    refreshed, _ = tools._barcode_cache.lookup("food:de:de:4000000000007")
+
+    assert turn.found is False
+    assert warm.found is True
+    assert served.canonical_name == "Old"
+    assert refreshed is not None and refreshed.canonical_name == "Slow"
+    assert budgets == [None, None]
+    assert "barcode:food:de:de:4000000000006" not in tools._negative_cache
+    tools._barcode_cache.clear()
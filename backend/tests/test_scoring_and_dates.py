@@ -56,3 +56,29 @@ def test_expiry_guidance_mhd_future_returns_valid_message() -> None:
 
     assert guidance is not None
     assert "MHD noch gueltig" in guidance
+
+
+def test_evaluate_and_score_memoizes_by_scoring_inputs() -> None:
+    from app.records import ProductRecord
+    from app.scoring import evaluate_and_score
+
+    payload = {
+        "code": "1",
+        "product_name": "Memo",
+        "nutriments": {"sugars_100g": 12.0, "salt_100g": 0.4},
+        "ingredients_text": "sugar, e171",
+    }
+    first = evaluate_and_score(ProductRecord.from_payload(payload), domain="food")
+    renamed = evaluate_and_score(ProductRecord.from_payload({**payload, "product_name": "Renamed"}), domain="food")
+    other_version = evaluate_and_score(ProductRecord.from_payload(payload), domain="food", policy_version="v2")
+    changed = evaluate_and_score(
+        ProductRecord.from_payload({**payload, "nutriments": {"sugars_100g": 30.0}}),
+        domain="food",
+    )
+
+    assert renamed is first
+    assert other_version is not first and other_version[1].policy_version == "v2"
+    assert other_version[1].data_sources[-1] == "Policy ruleset v2"
+    assert first[1].data_sources[-1] == "Policy ruleset v1"
+    assert changed is not first
+    assert first[0].flags[0].category == "not_authorized"
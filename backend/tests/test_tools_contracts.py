@@ -4,7 +4,7 @@ import asyncio
 
 import httpx
 
-from app import tools
+from app import shared_cache, tools
 
 
 class _FakeResponse:
@@ -219,3 +219,452 @@ def test_search_product_catalog_retries_query_variants(monkeypatch) -> None:
     assert result.selected_candidate is not None
     assert result.selected_candidate.name == "Lay's Classic Chips"
     assert any((params or {}).get("search_terms") == "lays" for _, params, _ in calls)
+
+
+def test_shared_http_client_is_reused_and_closed(monkeypatch) -> None:
+    calls: list[tuple] = []
+    built: list[_FakeAsyncClient] = []
+    payload = {"status": 1, "product": {"code": "4008400401621", "product_name": "Duplo"}}
+
+    class _PooledAsyncClient(_FakeAsyncClient):
+        is_closed = False
+
+        async def head(self, url: str, headers: dict | None = None):
+            self._calls.append((url, None, headers))
+            return _FakeResponse({})
+
+        async def aclose(self) -> None:
+            self.is_closed = True
+
+    def factory(*args, **kwargs):
+        client = _PooledAsyncClient(payload=payload, calls=calls, *args, **kwargs)
+        built.append(client)
+        return client
+
+    monkeypatch.setattr(tools.httpx, "AsyncClient", factory)
+    tools._barcode_cache.clear()
+
+    async def scenario():
+        await tools.start_http_clients()
+        try:
+            for barcode in ("4008400401621", "4008400401622"):
+                await tools.get_product_by_barcode(
+                    barcode=barcode,
+                    domain="food",
+                    locale_country="de",
+                    locale_language="de",
+                )
+        finally:
+            await tools.close_http_clients()
+
+    _run(scenario())
+
+    assert len(built) == 2
+    assert sum(1 for url, _, _ in calls if url.endswith(".json")) == 2
+    assert all(client.is_closed for client in built)
+    assert tools._http_clients == {}
+
+
+def test_search_fanout_keeps_priority_and_cancels_losers(monkeypatch) -> None:
+    calls: list[tuple] = []
+    in_flight = {"now": 0, "peak": 0}
+    delays = {("lay chips classic", "de"): 0.05, ("lay chips classic", "en"): 0.01}
+
+    class _SlowAsyncClient(_FakeAsyncClient):
+        async def get(self, url: str, params: dict | None = None, headers: dict | None = None):
+            self._calls.append((url, params, headers))
+            term = str((params or {}).get("search_terms") or "")
+            language = str((params or {}).get("lc") or "")
+            in_flight["now"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+            try:
+                await asyncio.sleep(delays.get((term, language), 1.0))
+            finally:
+                in_flight["now"] -= 1
+            return _FakeResponse({"products": [{"code": f"{term}:{language}", "product_name": term.title()}]})
+
+    monkeypatch.setattr(
+        tools.httpx,
+        "AsyncClient",
+        lambda *args, **kwargs: _SlowAsyncClient(calls=calls, *args, **kwargs),
+    )
+    monkeypatch.setattr(tools.settings, "search_max_in_flight", 2)
+    monkeypatch.setattr(tools.settings, "search_hedge_delay_seconds", 0.0)
+    tools._search_cache.clear()
+
+    result = _run(
+        tools.search_product_catalog(
+            query_text="lay chips classic",
+            domain="food",
+            locale_country="de",
+            locale_language="de",
+            max_results=5,
+        )
+    )
+
+    assert result.selected_candidate is not None
+    assert result.selected_candidate.id == "lay chips classic:de"
+    assert in_flight["peak"] <= 2
+    assert in_flight["now"] == 0
+    assert len(calls) < len(tools._search_query_variants("lay chips classic")) * 2
+
+
+def test_barcode_miss_is_negative_cached_separately_from_errors(monkeypatch) -> None:
+    calls: list[tuple] = []
+    monkeypatch.setattr(
+        tools.httpx,
+        "AsyncClient",
+        lambda *args, **kwargs: _FakeAsyncClient(payload={"status": 0}, calls=calls, *args, **kwargs),
+    )
+    tools._barcode_cache.clear()
+
+    for _ in range(3):
+        result = _run(
+            tools.get_product_by_barcode(
+                barcode="0000000000000",
+                domain="food",
+                locale_country="de",
+                locale_language="de",
+            )
+        )
+        assert result.found is False
+
+    assert len(calls) == 1
+    assert tools._negative_cache.get("barcode:food:de:de:0000000000000") == tools.NEGATIVE_NOT_FOUND
+
+    monkeypatch.setattr(
+        tools.httpx,
+        "AsyncClient",
+        lambda *args, **kwargs: _FakeAsyncClient(should_raise=httpx.ConnectError("network down"), *args, **kwargs),
+    )
+    _run(
+        tools.get_product_by_barcode(
+            barcode="1111111111111",
+            domain="food",
+            locale_country="de",
+            locale_language="de",
+        )
+    )
+    assert tools._negative_cache.get("barcode:food:de:de:1111111111111") == tools.NEGATIVE_UPSTREAM_ERROR
+
+
+def test_empty_search_is_negative_cached(monkeypatch) -> None:
+    calls: list[tuple] = []
+    monkeypatch.setattr(
+        tools.httpx,
+        "AsyncClient",
+        lambda *args, **kwargs: _FakeAsyncClient(payload={"products": []}, calls=calls, *args, **kwargs),
+    )
+    tools._search_cache.clear()
+
+    async def search_twice():
+        for _ in range(2):
+            await tools.search_product_catalog(
+                query_text="zzz unknown",
+                domain="food",
+                locale_country="de",
+                locale_language="de",
+                max_results=5,
+            )
+
+    _run(search_twice())
+
+    first_round = len(tools._search_query_variants("zzz unknown")) * len(tools._search_locale_variants("de", "de"))
+    assert len(calls) == first_round
+    assert "food:de:de:5:zzz unknown" not in tools._search_cache
+    assert tools._negative_cache.get("search:food:de:de:5:zzz unknown") == tools.NEGATIVE_NOT_FOUND
+
+
+def test_concurrent_barcode_lookups_share_one_upstream_call(monkeypatch) -> None:
+    calls: list[tuple] = []
+    payload = {"status": 1, "product": {"code": "5000112548167", "product_name": "Coca-Cola"}}
+
+    class _SlowAsyncClient(_FakeAsyncClient):
+        async def get(self, url: str, params: dict | None = None, headers: dict | None = None):
+            self._calls.append((url, params, headers))
+            await asyncio.sleep(0.02)
+            return _FakeResponse(self._payload)
+
+    monkeypatch.setattr(
+        tools.httpx,
+        "AsyncClient",
+        lambda *args, **kwargs: _SlowAsyncClient(payload=payload, calls=calls, *args, **kwargs),
+    )
+    tools._barcode_cache.clear()
+
+    async def scan_many():
+        return await asyncio.gather(
+            *(
+                tools.get_product_by_barcode(
+                    barcode="5000112548167",
+                    domain="food",
+                    locale_country="de",
+                    locale_language="de",
+                )
+                for _ in range(5)
+            )
+        )
+
+    results = _run(scan_many())
+
+    assert len(calls) == 1
+    assert all(result.found and result.canonical_name == "Coca-Cola" for result in results)
+    assert len(tools._barcode_flights) == 0
+
+
+def test_shared_cache_serves_other_instances_and_fails_open(monkeypatch) -> None:
+    calls: list[tuple] = []
+    payload = {"status": 1, "product": {"code": "4000417025005", "product_name": "Ritter Sport"}}
+    monkeypatch.setattr(
+        tools.httpx,
+        "AsyncClient",
+        lambda *args, **kwargs: _FakeAsyncClient(payload=payload, calls=calls, *args, **kwargs),
+    )
+    tools._barcode_cache.clear()
+
+    class _BrokenBackend(shared_cache.InMemoryBackend):
+        async def get(self, key: str) -> tuple[bytes, float] | None:
+            raise ConnectionError("redis unreachable")
+
+    async def lookup():
+        return await tools.get_product_by_barcode(
+            barcode="4000417025005",
+            domain="food",
+            locale_country="de",
+            locale_language="de",
+        )
+
+    async def scenario():
+        await shared_cache.start_shared_cache(shared_cache.InMemoryBackend())
+        try:
+            first = await lookup()
+            tools._barcode_cache.clear()  # a fresh instance only has the shared tier
+            second = await lookup()
+        finally:
+            await shared_cache.close_shared_cache()
+
+        await shared_cache.start_shared_cache(_BrokenBackend())
+        try:
+            tools._barcode_cache.clear()
+            third = await lookup()
+        finally:
+            await shared_cache.close_shared_cache()
+        return first, second, third
+
+    first, second, third = _run(scenario())
+
+    assert first.found and second.found and third.found
+    assert second.raw_payload_ref == first.raw_payload_ref
+    assert len(calls) == 2
+
+
+def test_shared_cache_hits_keep_their_age(monkeypatch) -> None:
+    clock = [1000.0]
+    monkeypatch.setattr(shared_cache.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(tools.settings, "cache_ttl_seconds", 300)
+    monkeypatch.setattr(tools.settings, "cache_stale_ttl_seconds", 1800)
+    monkeypatch.setattr(tools.settings, "shared_cache_ttl_seconds", 3600)
+    backend = shared_cache.InMemoryBackend()
+    result = tools._barcode_result("1001", {"code": "1001", "product_name": "Shared"})
+
+    async def scenario():
+        await shared_cache.start_shared_cache(backend)
+        try:
+            await tools._shared_cache_set("barcode:food:de:de:1001", result)
+            stored_ttl = next(iter(backend._values.values()))[0] - clock[0]
+            clock[0] += 1000
+            aging = await tools._shared_cache_get("barcode:food:de:de:1001", tools.BarcodeToolResult)
+            clock[0] += 1200
+            expired = await tools._shared_cache_get("barcode:food:de:de:1001", tools.BarcodeToolResult)
+        finally:
+            await shared_cache.close_shared_cache()
+        return stored_ttl, aging, expired
+
+    stored_ttl, aging, expired = _run(scenario())
+
+    assert stored_ttl == 2100
+    assert aging is not None and aging[1] == 1000
+    assert expired is None
+
+
+def test_stale_barcode_entry_is_served_while_refreshing(monkeypatch) -> None:
+    calls: list[tuple] = []
+    names = iter(["Old Label", "New Label"])
+
+    class _ChangingAsyncClient(_FakeAsyncClient):
+        async def get(self, url: str, params: dict | None = None, headers: dict | None = None):
+            self._calls.append((url, params, headers))
+            return _FakeResponse({"status": 1, "product": {"code": "123", "product_name": next(names)}})
+
+    monkeypatch.setattr(
+        tools.httpx,
+        "AsyncClient",
+        lambda *args, **kwargs: _ChangingAsyncClient(calls=calls, *args, **kwargs),
+    )
+    monkeypatch.setattr(tools.settings, "cache_ttl_seconds", 0)
+    monkeypatch.setattr(tools.settings, "cache_stale_ttl_seconds", 60)
+    tools._barcode_cache.clear()
+
+    async def lookup():
+        return await tools.get_product_by_barcode(
+            barcode="12345678",
+            domain="food",
+            locale_country="de",
+            locale_language="de",
+        )
+
+    async def scenario():
+        first = await lookup()
+        stale = await lookup()
+        await asyncio.gather(*list(tools._background_tasks))
+        refreshed = tools._barcode_cache.get("food:de:de:12345678")
+        return first, stale, refreshed
+
+    first, stale, refreshed = _run(scenario())
+
+    assert first.canonical_name == "Old Label"
+    assert stale.canonical_name == "Old Label"
+    assert refreshed is not None and refreshed.canonical_name == "New Label"
+    assert len(calls) == 2
+
+
+def test_batch_barcode_lookup_groups_misses_and_keeps_input_order(monkeypatch) -> None:
+    calls: list[tuple] = []
+    payload = {
+        "products": [
+            {"code": "3003", "product_name": "Third", "brands": "C"},
+            {"code": "2002", "product_name": "Second", "brands": "B"},
+        ]
+    }
+    monkeypatch.setattr(
+        tools.httpx,
+        "AsyncClient",
+        lambda *args, **kwargs: _FakeAsyncClient(payload=payload, calls=calls, *args, **kwargs),
+    )
+    monkeypatch.setattr(tools.settings, "off_batch_max_codes", 2)
+    tools._barcode_cache.clear()
+    tools._cache_set(
+        tools._barcode_cache,
+        "food:de:de:1001",
+        tools._barcode_result("1001", {"code": "1001", "product_name": "Cached"}),
+    )
+
+    results = _run(
+        tools.get_products_by_barcodes(
+            barcodes=["3003", "1001", " ", "2002", "4004", "3003"],
+            domain="food",
+            locale_country="de",
+            locale_language="de",
+        )
+    )
+    repeat = _run(
+        tools.get_products_by_barcodes(
+            barcodes=["4004", "2002"],
+            domain="food",
+            locale_country="de",
+            locale_language="de",
+        )
+    )
+
+    assert [result.product_id for result in results] == ["3003", "1001", None, "2002", None, "3003"]
+    assert [result.found for result in repeat] == [False, True]
+    assert len(calls) == 2
+    assert all(url.endswith("/api/v2/search") for url, _, _ in calls)
+    assert sorted(params["code"] for _, params, _ in calls) == ["3003,2002", "4004"]
+    # OFF meters /api/v2/search against the search quota, whatever the query.
+    limits = tools.rate_limit_stats()
+    assert limits[f"{tools.OFF_BASE_URL} search"]["acquired"] == 2
+    assert f"{tools.OFF_BASE_URL} product" not in limits
+    tools._barcode_cache.clear()
+
+
+def test_batch_lookup_checks_shared_tiers_and_shares_its_flights(monkeypatch) -> None:
+    calls: list[tuple] = []
+    release = asyncio.Event()
+    payload = {
+        "products": [
+            {"code": "6006", "product_name": "Sixth"},
+            {"code": "7007", "product_name": "Seventh"},
+        ]
+    }
+
+    class _SlowAsyncClient(_FakeAsyncClient):
+        async def get(self, url: str, params: dict | None = None, headers: dict | None = None):
+            self._calls.append((url, params, headers))
+            await release.wait()
+            return _FakeResponse(self._payload)
+
+    monkeypatch.setattr(
+        tools.httpx,
+        "AsyncClient",
+        lambda *args, **kwargs: _SlowAsyncClient(payload=payload, calls=calls, *args, **kwargs),
+    )
+
+    async def scenario():
+        shared = await shared_cache.start_shared_cache(shared_cache.InMemoryBackend())
+        try:
+            await tools._shared_cache_set(
+                "barcode:food:de:de:5005", tools._barcode_result("5005", {"code": "5005", "product_name": "Fifth"})
+            )
+            batch = asyncio.ensure_future(
+                tools.get_products_by_barcodes(
+                    barcodes=["5005", "6006", "7007"], domain="food", locale_country="de", locale_language="de"
+                )
+            )
+            while not calls:
+                await asyncio.sleep(0)
+            single = asyncio.ensure_future(
+                tools.get_product_by_barcode(barcode="6006", domain="food", locale_country="de", locale_language="de")
+            )
+            overlapping = asyncio.ensure_future(
+                tools.get_products_by_barcodes(
+                    barcodes=["7007", "6006"], domain="food", locale_country="de", locale_language="de"
+                )
+            )
+            await asyncio.sleep(0.01)
+            release.set()
+            results = await asyncio.gather(batch, single, overlapping)
+        finally:
+            await shared_cache.close_shared_cache()
+        return results, shared.snapshot()
+
+    tools._barcode_cache.clear()
+    tools._negative_cache.clear()
+    (batch, single, overlapping), shared_stats = _run(scenario())
+
+    assert [result.product_id for result in batch] == ["5005", "6006", "7007"]
+    assert single.product_id == "6006"
+    assert [result.product_id for result in overlapping] == ["7007", "6006"]
+    assert len(calls) == 1 and calls[0][1]["code"] == "6006,7007"
+    assert shared_stats["hits"] == 1
+    assert len(tools._barcode_flights) == 0
+    tools._barcode_cache.clear()
+
+
+def test_batch_endpoint_returns_results_in_request_order(monkeypatch) -> None:
+    import app.main as main_module
+    from app.models import BarcodeToolResult, BatchBarcodeRequest
+
+    async def _fake_batch(*, barcodes, domain, locale_country, locale_language):
+        assert (domain, locale_country, locale_language) == ("beauty", "de", "de")
+        return [BarcodeToolResult(found=code == "1", product_id=code if code == "1" else None) for code in barcodes]
+
+    monkeypatch.setattr(main_module, "get_products_by_barcodes", _fake_batch)
+    response = _run(main_module.products_batch(BatchBarcodeRequest(barcodes=["2", "1"], domain="beauty")))
+
+    assert [(item.barcode, item.result.found) for item in response.results] == [("2", False), ("1", True)]
+
+
+def test_upstream_bodies_are_decoded_from_bytes_and_projected(monkeypatch) -> None:
+    from app import fastjson
+
+    body = b'{"status": 1, "product": {"code": "5", "product_name": "Bytes", "nutriments": {"sugars_100g": 1.5, "iron_100g": 0.1}, "ingredients": [{"id": "en:sugar"}]}}'
+    response = httpx.Response(200, content=body)
+    payload = fastjson.decode_response(response)
+    result = tools._barcode_result("5", payload["product"])
+
+    assert payload["product"]["product_name"] == "Bytes"
+    assert result.raw_payload_ref["nutriments"] == {"sugars_100g": 1.5}
+    assert "ingredients" not in result.raw_payload_ref
+    assert fastjson.loads(b'{"a": [1, 2]}') == {"a": [1, 2]}
+    assert set(tools.SEARCH_FIELDS.split(",")) == {"code", "product_name", "product_name_de"}
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+from fastapi import Response
+
+import app.main as main_module
+from app import warmup
+from app.models import BarcodeToolResult, SearchCandidate, SearchToolResult
+
+
+def _write_manifest(tmp_path) -> str:
+    path = tmp_path / "warmup.json"
+    path.write_text(
+        json.dumps(
+            {
+                "locales": [
+                    {"domain": "food", "country": "de", "language": "de", "barcodes": ["4001", "4002", "4001"], "queries": ["nutella"]},
+                    {"domain": "beauty", "country": "fr", "language": "fr", "barcodes": ["3001"]},
+                ]
+            }
+        ),
+        encoding="utf-8",
+    )
+    return str(path)
+
+
+def test_load_manifest_dedupes_and_keeps_locales(tmp_path) -> None:
+    items = warmup.load_manifest(_write_manifest(tmp_path))
+
+    assert [(item.kind, item.value, item.domain, item.locale_country) for item in items] == [
+        ("barcode", "4001", "food", "de"),
+        ("barcode", "4002", "food", "de"),
+        ("query", "nutella", "food", "de"),
+        ("barcode", "3001", "beauty", "fr"),
+    ]
+
+
+def test_warmup_prefetches_manifest_and_reports_readiness(monkeypatch, tmp_path) -> None:
+    calls: list[tuple[str, str]] = []
+    monkeypatch.setattr(warmup.settings, "warmup_requests_per_second", 0.0)
+
+    async def scenario():
+        gate = asyncio.Event()
+
+        async def _fake_barcode(*, barcode, domain, locale_country, locale_language):
+            calls.append((barcode, locale_country))
+            await gate.wait()
+            return BarcodeToolResult(found=barcode != "4002", product_id=barcode)
+
+        async def _fake_search(*, query_text, domain, locale_country, locale_language):
+            calls.append((query_text, locale_country))
+            return SearchToolResult(candidates=[SearchCandidate(id="4001", name="Nutella", confidence=0.9)])
+
+        monkeypatch.setattr(warmup, "get_product_by_barcode", _fake_barcode)
+        monkeypatch.setattr(warmup, "search_product_catalog", _fake_search)
+
+        progress = warmup.start_warmup(_write_manifest(tmp_path))
+        await asyncio.sleep(0)
+        warming_response = Response()
+        warming = await main_module.ready(warming_response)
+        gate.set()
+        await warmup._warmup_task
+        response = Response()
+        done = await main_module.ready(response)
+        return progress, warming, warming_response.status_code, done, response.status_code
+
+    progress, warming, warming_status, done, status_code = asyncio.run(scenario())
+
+    assert warming["status"] == "warming"
+    assert warming_status == 503
+    assert done == {
+        "status": "ready",
+        "warmup": {"state": "complete", "total": 4, "completed": 4, "failed": 1, "progress": 1.0, "error": None},
+    }
+    assert status_code == 200
+    assert calls == [("4001", "de"), ("4002", "de"), ("nutella", "de"), ("3001", "fr")]
+    assert progress is warmup.warmup_progress()
+
+
+def test_missing_manifest_does_not_block_readiness(tmp_path) -> None:
+    progress = warmup.start_warmup(str(tmp_path / "missing.json"))
+    response = Response()
+    payload = asyncio.run(main_module.ready(response))
+
+    assert progress.state == warmup.FAILED
+    assert payload["status"] == "ready"
+    assert response.status_code == 200
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+import json
 
 from fastapi import WebSocketDisconnect
 import pytest
@@ -21,13 +22,26 @@ class _MockWebSocket:
         self.accepted = True
 
     async def receive_json(self) -> dict:
+        await asyncio.sleep(0)
         if self._incoming:
             return self._incoming.pop(0)
+        await self._wait_until_quiet()
         raise WebSocketDisconnect(code=1000)
 
+    async def _wait_until_quiet(self) -> None:
+        # Turns run on a separate worker; hang up only once the session has stopped emitting events.
+        quiet_rounds, seen = 0, -1
+        while quiet_rounds < 50:
+            await asyncio.sleep(0)
+            quiet_rounds = quiet_rounds + 1 if len(self.sent) == seen else 0
+            seen = len(self.sent)
+
     async def send_json(self, payload: dict) -> None:
         self.sent.append(payload)
 
+    async def send_text(self, data: str) -> None:
+        self.sent.append(json.loads(data))
+
     async def close(self, code: int = 1000) -> None:
         self.closed = True
         self.close_code = code
@@ -654,3 +668,197 @@ def test_websocket_can_reconnect_after_session_end() -> None:
 
     assert any("stopped" in event.get("message", "").lower() for event in first_state)
     assert any("connected" in event.get("message", "").lower() for event in second_state)
+
+
+def test_event_encoding_matches_the_send_json_wire_format() -> None:
+    from app.fastjson import encode_event
+    from app.models import HudUpdateEvent, MetricItem, ProductIdentity, SpeechAudioEvent, WarningItem
+
+    events = [
+        HudUpdateEvent(
+            session_id="s",
+            turn_id="t",
+            domain="food",
+            product_identity=ProductIdentity(id="1", name="Süßer Brotaufstrich", brand="Ü"),
+            grade_or_tier="C",
+            warnings=[WarningItem(category="restricted", label="Zucker 56 %")],
+            metrics=[MetricItem(name="sugar", value="56.3 g", band="red", score=100)],
+            confidence=0.93,
+        ),
+        SpeechAudioEvent(session_id="s", turn_id="t", audio_b64="data:audio/wav;base64,AAAA", mime_type="audio/wav", language="de"),
+    ]
+
+    for event in events:
+        # Starlette's send_json uses exactly these json.dumps options for text frames.
+        expected = json.dumps(event.model_dump(), separators=(",", ":"), ensure_ascii=False)
+        assert encode_event(event) == expected
+
+
+def test_newer_query_cancels_stale_turn_while_frames_keep_arriving(monkeypatch) -> None:
+    stale_lookup_started = asyncio.Event()
+    refine_frames: list = []
+
+    async def fake_get_product_by_barcode(*, barcode: str, domain: str, locale_country: str, locale_language: str):
+        if barcode == "40000001":
+            stale_lookup_started.set()
+            await asyncio.Event().wait()
+        return BarcodeToolResult(
+            found=True,
+            product_id=barcode,
+            canonical_name="Fresh Product",
+            confidence=0.9,
+            raw_payload_ref={"code": barcode, "product_name": "Fresh Product", "nutriments": {"sugars_100g": 4.0}},
+        )
+
+    async def fake_refine_text(**kwargs):
+        refine_frames.append(kwargs["latest_frame"])
+        return main_module.GeminiLiveResult(text="Fresh.", audio_chunks=[])
+
+    monkeypatch.setattr(main_module, "get_product_by_barcode", fake_get_product_by_barcode)
+    monkeypatch.setattr(main_module, "_gemini_live_refine_text", fake_refine_text)
+
+    class _SlowClient(_MockWebSocket):
+        async def receive_json(self) -> dict:
+            # The frame and the newer query only arrive once the stale turn is blocked upstream.
+            if len(self._incoming) == 2:
+                await stale_lookup_started.wait()
+            return await super().receive_json()
+
+    websocket = _SlowClient(
+        incoming=[
+            {"type": "user_query", "text": "", "barcode": "40000001", "domain": "food"},
+            {"type": "frame", "image_b64": "data:image/jpeg;base64,AAAA"},
+            {"type": "user_query", "text": "", "barcode": "40000002", "domain": "food"},
+        ]
+    )
+
+    _run(main_module.live_session(websocket))
+
+    cancelled = [event for event in websocket.sent if event.get("message") == "Turn cancelled"]
+    huds = _events_by_type(websocket.sent, "hud_update")
+    assert [event["turn_id"] for event in cancelled] == ["T-001"]
+    assert [event["turn_id"] for event in huds] == ["T-002"]
+    assert refine_frames == [("image/jpeg", b"\x00\x00\x00")]
+
+
+def test_barge_in_interrupts_the_turn_in_flight(monkeypatch) -> None:
+    turn_started = asyncio.Event()
+
+    async def fake_get_product_by_barcode(**kwargs):
+        turn_started.set()
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(main_module, "get_product_by_barcode", fake_get_product_by_barcode)
+
+    class _InterruptingClient(_MockWebSocket):
+        async def receive_json(self) -> dict:
+            if len(self._incoming) == 1:
+                await turn_started.wait()
+            return await super().receive_json()
+
+    websocket = _InterruptingClient(
+        incoming=[
+            {"type": "user_query", "text": "", "barcode": "40000001", "domain": "food"},
+            {"type": "barge_in"},
+        ]
+    )
+
+    _run(main_module.live_session(websocket))
+
+    assert _events_by_type(websocket.sent, "barge_ack")
+    assert [event["turn_id"] for event in websocket.sent if event.get("message") == "Turn cancelled"] == ["T-001"]
+    assert not _events_by_type(websocket.sent, "hud_update")
+
+
+def test_repeated_query_does_not_cancel_the_turn_answering_it(monkeypatch) -> None:
+    lookup_started = asyncio.Event()
+    release_lookup = asyncio.Event()
+    lookups: list[str] = []
+
+    async def fake_get_product_by_barcode(*, barcode: str, domain: str, locale_country: str, locale_language: str):
+        lookups.append(barcode)
+        lookup_started.set()
+        await release_lookup.wait()
+        return BarcodeToolResult(
+            found=True,
+            product_id=barcode,
+            canonical_name="Repeat Product",
+            confidence=0.9,
+            raw_payload_ref={"code": barcode, "product_name": "Repeat Product", "nutriments": {"sugars_100g": 4.0}},
+        )
+
+    async def fake_refine_text(**kwargs):
+        return main_module.GeminiLiveResult(text="Repeat.", audio_chunks=[])
+
+    monkeypatch.setattr(main_module, "get_product_by_barcode", fake_get_product_by_barcode)
+    monkeypatch.setattr(main_module, "_gemini_live_refine_text", fake_refine_text)
+
+    class _RepeatingClient(_MockWebSocket):
+        async def receive_json(self) -> dict:
+            if len(self._incoming) == 1:
+                await lookup_started.wait()
+            elif not self._incoming:
+                release_lookup.set()
+            return await super().receive_json()
+
+    websocket = _RepeatingClient(
+        incoming=[
+            {"type": "user_query", "text": "", "barcode": "40000001", "domain": "food"},
+            {"type": "user_query", "text": "", "barcode": "40000001", "domain": "food"},
+        ]
+    )
+
+    _run(main_module.live_session(websocket))
+
+    huds = _events_by_type(websocket.sent, "hud_update")
+    duplicates = [event for event in websocket.sent if event.get("message") == "Duplicate query ignored"]
+    assert not [event for event in websocket.sent if event.get("message") == "Turn cancelled"]
+    assert [event["turn_id"] for event in huds] == ["T-001"]
+    assert [event["turn_id"] for event in duplicates] == ["T-002"]
+    assert lookups == ["40000001"]
+
+
+def test_query_interrupted_by_barge_in_can_be_asked_again(monkeypatch) -> None:
+    lookup_started = asyncio.Event()
+    lookups: list[str] = []
+
+    async def fake_get_product_by_barcode(*, barcode: str, domain: str, locale_country: str, locale_language: str):
+        lookups.append(barcode)
+        if len(lookups) == 1:
+            lookup_started.set()
+            await asyncio.Event().wait()
+        return BarcodeToolResult(
+            found=True,
+            product_id=barcode,
+            canonical_name="Repeat Product",
+            confidence=0.9,
+            raw_payload_ref={"code": barcode, "product_name": "Repeat Product", "nutriments": {"sugars_100g": 4.0}},
+        )
+
+    async def fake_refine_text(**kwargs):
+        return main_module.GeminiLiveResult(text="Repeat.", audio_chunks=[])
+
+    monkeypatch.setattr(main_module, "get_product_by_barcode", fake_get_product_by_barcode)
+    monkeypatch.setattr(main_module, "_gemini_live_refine_text", fake_refine_text)
+
+    class _InterruptingClient(_MockWebSocket):
+        async def receive_json(self) -> dict:
+            if len(self._incoming) == 2:
+                await lookup_started.wait()
+            return await super().receive_json()
+
+    websocket = _InterruptingClient(
+        incoming=[
+            {"type": "user_query", "text": "", "barcode": "40000001", "domain": "food"},
+            {"type": "barge_in"},
+            {"type": "user_query", "text": "", "barcode": "40000001", "domain": "food"},
+        ]
+    )
+
+    _run(main_module.live_session(websocket))
+
+    huds = _events_by_type(websocket.sent, "hud_update")
+    assert [event["turn_id"] for event in websocket.sent if event.get("message") == "Turn cancelled"] == ["T-001"]
+    assert not [event for event in websocket.sent if event.get("message") == "Duplicate query ignored"]
+    assert [event["turn_id"] for event in huds] == ["T-002"]
+    assert lookups == ["40000001", "40000001"]